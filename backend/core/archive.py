@@ -0,0 +1,169 @@
+"""
+Retention: move old rows out of the hot tables into compact archive tables.
+
+Notification, AdminTask and wallet.Transaction only grow. Each ``POLICIES``
+entry names a live model, its archive model (same columns and ids, no FK
+constraints), the timestamp that ages a row and which rows are closed enough
+to move. Ages come from ``settings.RETENTION_DAYS``.
+
+``archive_rows`` moves rows in id order, one short transaction per batch:
+copy the batch into the archive table, or append it to a gzipped JSONL file,
+then delete it from the live table. On PostgreSQL the batch is read with
+``FOR UPDATE SKIP LOCKED``, so rows a request is writing are left for the
+next run instead of blocking it. The delete deliberately skips model signals:
+archiving is a move, and must not touch unread counters, admin workload or
+the daily rollups. That is also why only read notifications and
+completed/cancelled tasks are eligible.
+
+Archived rows stay readable through ``IncludeArchivedMixin`` views
+(``?include_archived=1``). Rows written to JSONL files instead are only on disk,
+which policies with ``jsonl=False`` (wallet transactions) never allow.
+"""
+import gzip
+import json
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+class RetentionPolicy:
+    def __init__(self, name, model, archive_model, age_field, closed=None, jsonl=True):
+        self.name = name
+        self.model_label = model
+        self.archive_label = archive_model
+        self.age_field = age_field
+        self.closed = closed or Q()
+        self.jsonl = jsonl  # may rows leave the database for JSONL files?
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def archive_model(self):
+        return apps.get_model(self.archive_label)
+
+    @property
+    def columns(self):
+        return [field.attname for field in self.model._meta.concrete_fields]
+
+    def cutoff(self, days=None):
+        """Rows older than this are due, or None when the policy is disabled."""
+        days = settings.RETENTION_DAYS.get(self.name, 0) if days is None else days
+        return timezone.now() - timedelta(days=days) if days else None
+
+    def due(self, cutoff):
+        return self.model._default_manager.filter(self.closed, **{f'{self.age_field}__lt': cutoff})
+
+
+POLICIES = {
+    policy.name: policy for policy in [
+        RetentionPolicy('notifications', 'jobs.Notification', 'jobs.NotificationArchive', 'created_at',
+                        closed=Q(is_read=True)),
+        RetentionPolicy('admin_tasks', 'jobs.AdminTask', 'jobs.AdminTaskArchive', 'assigned_at',
+                        closed=Q(status__in=['COMPLETED', 'CANCELLED'])),
+        # Ledger checks and lifetime wallet totals sum Transaction + TransactionArchive,
+        # so transactions must stay in the database
+        RetentionPolicy('transactions', 'wallet.Transaction', 'wallet.TransactionArchive', 'created_at',
+                        jsonl=False),
+    ]
+}
+
+
+class JsonlSink:
+    """Appends archived rows to ``<directory>/<policy>-<timestamp>.jsonl.gz``, one JSON object per line."""
+
+    def __init__(self, directory, policy):
+        self.path = f"{directory.rstrip('/')}/{policy.name}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz"
+
+    def write(self, rows):
+        # One gzip member per batch; readers (gzip, zcat) see a single stream
+        with gzip.open(self.path, 'at', encoding='utf-8') as fh:
+            for row in rows:
+                fh.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+
+
+def archive_batch(policy, cutoff, batch_size=1000, after=0, sink=None):
+    """
+    Move up to ``batch_size`` due rows with ``pk > after`` in one transaction.
+    Returns (rows moved, last pk seen).
+    """
+    if sink is not None and not policy.jsonl:
+        raise ValueError(f"{policy.name} rows can only be archived to {policy.archive_label}")
+    model, archive_model = policy.model, policy.archive_model
+    with transaction.atomic():
+        batch = policy.due(cutoff).filter(pk__gt=after).order_by('pk')
+        if connection.features.has_select_for_update_skip_locked:
+            batch = batch.select_for_update(skip_locked=True)
+        rows = list(batch.values(*policy.columns)[:batch_size])
+        if not rows:
+            return 0, after
+        if sink is not None:
+            sink.write(rows)
+        else:
+            # ignore_conflicts: a batch copied by an interrupted run is not duplicated
+            archive_model.objects.bulk_create([archive_model(**row) for row in rows], ignore_conflicts=True)
+        moved = model._default_manager.filter(pk__in=[row['id'] for row in rows])
+        moved._raw_delete(moved.db)  # no signals, see the module docstring
+    return len(rows), rows[-1]['id']
+
+
+def archive_rows(policy, cutoff, batch_size=1000, sink=None, pause=0):
+    """Move every due row of ``policy``; yields the number moved per batch."""
+    after = 0
+    while True:
+        moved, after = archive_batch(policy, cutoff, batch_size, after, sink)
+        if not moved:
+            return
+        yield moved
+        if pause:
+            time.sleep(pause)
+
+
+def include_archived(request):
+    return request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+
+
+class IncludeArchivedMixin:
+    """
+    For list views over a table with an archive: ``?include_archived=1`` pages
+    through live and archived rows together (one UNION ALL, newest first).
+
+    Views set ``archive_model`` and implement ``scope(queryset)``, which applies
+    their filters to either table; ``get_queryset`` should use it too. Only
+    page-number pagination is available in this mode.
+    """
+    archive_model = None
+    archive_ordering = ('-created_at', '-id')
+
+    def scope(self, queryset):
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if not include_archived(request):
+            return super().list(request, *args, **kwargs)
+        if 'cursor' in request.query_params:
+            raise ValidationError({'cursor': 'Cursor pagination is not available with include_archived.'})
+
+        live = self.get_queryset()
+        model = live.model
+        columns = [field.attname for field in model._meta.concrete_fields]
+        archived = self.scope(self.archive_model.objects.all())
+        rows = live.order_by().values(*columns).union(
+            archived.order_by().values(*columns), all=True,
+        ).order_by(*self.archive_ordering)
+
+        page = self.paginate_queryset(rows)
+        instances = [model(**row) for row in (rows if page is None else page)]
+        serializer = self.get_serializer(instances, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Request threads are not reused under ASGI; close connections after each request
+os.environ['CONN_MAX_AGE'] = '0'
 
 application = get_asgi_application()
@@ -0,0 +1,50 @@
+"""
+Stale-while-revalidate wrapper around Django's cache.
+
+``cached_swr(key, build, ttl, stale_ttl)`` returns the cached value while it
+is fresh. For ``stale_ttl`` seconds after it expires, the stale value is still
+returned immediately while a single background thread (guarded by a cache
+lock) rebuilds it. Past that window, or on a cold cache, the caller builds
+the value inline.
+"""
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+def _store(key, value, ttl, stale_ttl):
+    cache.set(key, {'value': value, 'fresh_until': time.time() + ttl}, ttl + stale_ttl)
+
+
+def _refresh_in_background(key, build, ttl, stale_ttl, lock_key):
+    def run():
+        try:
+            _store(key, build(), ttl, stale_ttl)
+        except Exception:
+            logger.exception("Background refresh of %s failed", key)
+        finally:
+            cache.delete(lock_key)
+            close_old_connections()
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def cached_swr(key, build, ttl, stale_ttl):
+    entry = cache.get(key)
+    if entry is not None:
+        if entry['fresh_until'] > time.time():
+            return entry['value']
+        lock_key = f'{key}:refreshing'
+        # Only one request per key kicks off the rebuild; the rest keep serving stale.
+        if cache.add(lock_key, 1, max(stale_ttl, 30)):
+            _refresh_in_background(key, build, ttl, stale_ttl, lock_key)
+        return entry['value']
+
+    value = build()
+    _store(key, value, ttl, stale_ttl)
+    return value
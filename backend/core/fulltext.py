@@ -0,0 +1,63 @@
+"""
+PostgreSQL full-text search shared by tutor and job search.
+
+TutorProfile and JobPost carry a ``search_vector`` column with a GIN index
+(created by migrations on PostgreSQL only). The vectors are rebuilt from
+Python whenever the source fields change, so they can include text from
+related rows and the canonical subject names from SUBJECT_SYNONYMS.
+
+On any other backend (SQLite in local dev) ``fulltext_enabled()`` is False,
+vectors are left NULL and the views fall back to their icontains filters.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, TextField, Value
+
+SEARCH_CONFIG = 'simple'  # no stemming: names, localities and subjects matter more than English prose
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def fulltext_enabled(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def weighted_search_vector(parts):
+    """Build a SearchVector expression from {'A': text, 'B': text, ...}; empty parts are skipped."""
+    vector = None
+    for weight, text in parts.items():
+        if not text:
+            continue
+        part = SearchVector(Value(text, output_field=TextField()), weight=weight, config=SEARCH_CONFIG)
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_search_vector(model, pk, parts, using='default'):
+    """Write the vector for one row with a single UPDATE."""
+    vector = weighted_search_vector(parts)
+    model._default_manager.using(using).filter(pk=pk).update(search_vector=vector)
+
+
+def prefix_search_query(q):
+    """
+    Turn free text into a prefix tsquery, so "mat phy" matches "Mathematics Physics"
+    the way the old icontains filters did. Returns None if there is nothing to search.
+    """
+    tokens = _TOKEN_RE.findall(q.lower())
+    if not tokens:
+        return None
+    return SearchQuery(' & '.join(f'{token}:*' for token in tokens), search_type='raw', config=SEARCH_CONFIG)
+
+
+def fulltext_search(queryset, q):
+    """Filter on the GIN-indexed search_vector and order by SearchRank, keeping the old order as tie-break."""
+    query = prefix_search_query(q)
+    if query is None:
+        return queryset
+    ordering = queryset.query.order_by
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    ).order_by('-search_rank', *ordering)
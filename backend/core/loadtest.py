@@ -0,0 +1,34 @@
+"""
+Guard for load-test commands that disturb live state while they run (parking
+real admins, draining the shared background task queue).
+
+They refuse to run unless the database is a test database, or the operator
+passes --i-know-this-is-not-production for a disposable staging copy.
+"""
+from django.core.management.base import CommandError
+from django.db import connection
+
+FLAG = '--i-know-this-is-not-production'
+
+
+def add_production_guard(parser):
+    parser.add_argument(FLAG, action='store_true', dest='not_production',
+                        help='Allow running against a database that is not a test database')
+
+
+def is_test_database():
+    settings_dict = connection.settings_dict
+    name = str(settings_dict.get('NAME') or '')
+    if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+        return True
+    return name.startswith('test_') or name == (settings_dict.get('TEST') or {}).get('NAME')
+
+
+def ensure_not_production(options):
+    """Raise CommandError unless on a test database or the guard flag was passed."""
+    if options.get('not_production') or is_test_database():
+        return
+    raise CommandError(
+        f"Refusing to run against database {connection.settings_dict.get('NAME')!r}: this load test "
+        f"changes live data while it runs. Pass {FLAG} if the database is disposable."
+    )
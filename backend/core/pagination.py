@@ -0,0 +1,88 @@
+"""
+Page-number pagination with an opt-in keyset (cursor) mode.
+
+By default these classes behave exactly like PageNumberPagination
+(``?page=N``, with ``count``). Passing ``?cursor=`` (empty for the first page)
+switches to keyset pagination instead. Rows are ordered newest first on
+``(created_at, id)``, or on the view's ``cursor_ordering``, and each page is
+fetched with ``WHERE (created_at, id) < (last seen)``. That avoids both the
+OFFSET scan and the COUNT(*) query, so deep pages cost the same as the first.
+It is backed by the composite ``(created_at, id)`` indexes on the paginated
+tables.
+
+Cursor responses contain ``next`` (a URL, or null on the last page) and
+``results``. They have no ``count`` and cannot go backwards. Cursor mode
+replaces any ordering the view applied, including search rank.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('created_at', 'id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        time_field, id_field = getattr(view, 'cursor_ordering', self.cursor_ordering)
+        queryset = queryset.order_by(f'-{time_field}', f'-{id_field}')
+
+        position = self.decode_cursor(request, queryset.model, time_field)
+        if position is not None:
+            last_time, last_id = position
+            queryset = queryset.filter(
+                Q(**{f'{time_field}__lt': last_time}) | Q(**{time_field: last_time, f'{id_field}__lt': last_id})
+            )
+
+        rows = list(queryset[:page_size + 1])
+        self.next_position = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            last = rows[-1]
+            self.next_position = (getattr(last, time_field), getattr(last, id_field))
+        return rows
+
+    def decode_cursor(self, request, model, time_field):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw_time, last_id = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            return model._meta.get_field(time_field).to_python(raw_time), int(last_id)
+        except (TypeError, ValueError, ValidationError, UnicodeEncodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        last_time, last_id = position
+        payload = json.dumps([last_time.isoformat(), last_id]).encode('ascii')
+        return base64.urlsafe_b64encode(payload).decode('ascii')
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
@@ -96,10 +96,14 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'core.wsgi.application'
 
+# Under ASGI (core/asgi.py) Django runs each request's sync code in a fresh
+# thread, so a persistent connection is never reused and only piles up.
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', 600))
+
 DATABASES = {
     'default': dj_database_url.config(
         default=f'sqlite:///{BASE_DIR / "db.sqlite3"}',
-        conn_max_age=600,
+        conn_max_age=CONN_MAX_AGE,
         ssl_require=False,
     )
 }
@@ -107,7 +111,7 @@ DATABASES = {
 if os.environ.get('DATABASE_URL'):
     DATABASES['default'] = dj_database_url.config(
         default=os.environ.get('DATABASE_URL'),
-        conn_max_age=600,
+        conn_max_age=CONN_MAX_AGE,
         ssl_require=True,
     )
 
@@ -144,6 +148,15 @@ if CLOUDINARY_STORAGE['CLOUD_NAME']:
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880
 
+# Local memory by default; set CACHE_BACKEND/CACHE_LOCATION (e.g. FileBasedCache and a
+# shared directory) so invalidations reach every gunicorn worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'thtpro'),
+    }
+}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.User'
 
@@ -235,4 +248,17 @@ DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'The Home Tuitions <su
 FRONTEND_URL = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
 
 if DEBUG and not EMAIL_HOST_USER:
-    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
\ No newline at end of file
+    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# ==================== WALLET ====================
+# Seconds a cached wallet snapshot (wallet/snapshot.py) may live. Ledger writes
+# invalidate it; with the per-process cache this also bounds cross-worker staleness.
+WALLET_SNAPSHOT_TIMEOUT = int(os.environ.get('WALLET_SNAPSHOT_TIMEOUT', '300'))
+
+# ==================== RETENTION ====================
+# Age in days after which `manage.py archive_old_rows` moves rows to the archive
+# tables (see core/archive.py). 0 keeps a table's rows live forever.
+RETENTION_DAYS = {
+    'notifications': int(os.environ.get('RETENTION_NOTIFICATION_DAYS', '180')),  # read notifications only
+    'admin_tasks': int(os.environ.get('RETENTION_ADMIN_TASK_DAYS', '365')),  # completed / cancelled only
+    'transactions': int(os.environ.get('RETENTION_TRANSACTION_DAYS', '730')),
+}
@@ -1,6 +1,7 @@
 from django.contrib import admin
 from .models import JobPost, Application
 from .admin_models import AdminTask, Notification
+from .task_models import BackgroundTask
 
 @admin.register(JobPost)
 class JobPostAdmin(admin.ModelAdmin):
@@ -25,3 +26,13 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'title', 'notification_type', 'is_read', 'created_at')
     list_filter = ('notification_type', 'is_read', 'created_at')
     readonly_fields = ('created_at',)
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('sensitive', 'created_at', 'finished_at', 'locked_at', 'locked_by', 'last_error')
+
+    def get_exclude(self, request, obj=None):
+        # Sensitive payloads (OTPs) are never shown
+        return ('payload',) if obj is not None and obj.sensitive else ()
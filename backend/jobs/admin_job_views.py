@@ -11,7 +11,9 @@ from django.db.models import Q
 from .models import JobPost, Application
 from .admin_models import AdminTask
 from .serializers import JobPostSerializer, AdminJobUpdateSerializer
-from .utils import send_notification
+from .prefetch import prefetch_jobs
+from .utils import close_admin_tasks, send_notification
+from .rollup import job_status_totals, update_with_rollup
 from users.models import TutorProfile, TutorKYC
 from django.contrib.auth import get_user_model
 from core.roles import ADMIN_ROLES, COUNSELLOR, SUPERADMIN, TUTOR_ADMIN
@@ -35,20 +37,19 @@ class AdminDashboardStatsView(APIView):
         is_counsellor = request.user.role == COUNSELLOR
         
         # Base querysets
-        jobs_qs = JobPost.objects.all()
         tutors_qs = TutorProfile.objects.all()
         kyc_qs = TutorKYC.objects.all()
-        
-        if is_counsellor:
-            jobs_qs = jobs_qs.filter(assigned_admin=request.user)
-            # We keep jobs_qs filtered by counsellor, but we show TOTAL tutors and parents 
-            # so the dashboard feels active and they know the total pool they can work with.
+
+        # Job counts come from the daily rollup (see rollup.py). Counsellors only see their
+        # own jobs, but we show TOTAL tutors and parents so the dashboard feels active and
+        # they know the total pool they can work with.
+        job_totals = job_status_totals(admin_id=request.user.id if is_counsellor else None)
 
         stats = {
             "total_tutors": TutorProfile.objects.count(),
             "total_parents": User.objects.filter(role='PARENT').count(),
-            "active_jobs": jobs_qs.filter(status__in=['APPROVED', 'ACTIVE', 'ASSIGNED']).count(),
-            "pending_jobs": jobs_qs.filter(status='PENDING_APPROVAL').count(),
+            "active_jobs": sum(job_totals.get(s, 0) for s in ['APPROVED', 'ACTIVE', 'ASSIGNED']),
+            "pending_jobs": job_totals.get('PENDING_APPROVAL', 0),
             "pending_kyc": kyc_qs.filter(status='SUBMITTED').count(),
             "total_revenue": 0,
             "department": department,
@@ -68,12 +69,12 @@ class AdminPendingJobsView(generics.ListAPIView):
         # If it's a superadmin or admin, maybe they should see all pending jobs?
         # Or if the system strictly assigns jobs to specific admins:
         if self.request.user.role == SUPERADMIN:
-            return JobPost.objects.filter(status='PENDING_APPROVAL').select_related('posted_by', 'assigned_admin').prefetch_related('applications', 'applications__tutor', 'applications__tutor__user').order_by('-created_at')
+            return prefetch_jobs(JobPost.objects.filter(status='PENDING_APPROVAL'), self.request.user).order_by('-created_at')
 
-        return JobPost.objects.filter(
+        return prefetch_jobs(JobPost.objects.filter(
             status='PENDING_APPROVAL',
             assigned_admin=self.request.user,
-        ).select_related('posted_by', 'assigned_admin').prefetch_related('applications', 'applications__tutor', 'applications__tutor__user').order_by('-created_at')
+        ), self.request.user).order_by('-created_at')
 
 class AdminJobListView(generics.ListAPIView):
     """Admin views jobs strictly filtered by an optional status parameter."""
@@ -86,7 +87,7 @@ class AdminJobListView(generics.ListAPIView):
             
         status_param = self.request.query_params.get('status')
         admin_id = self.request.query_params.get('admin_id')
-        queryset = JobPost.objects.all().select_related('posted_by', 'assigned_admin').prefetch_related('applications', 'applications__tutor', 'applications__tutor__user').order_by('-created_at')
+        queryset = prefetch_jobs(JobPost.objects.all(), self.request.user).order_by('-created_at')
         
         if status_param:
             queryset = queryset.filter(status=status_param.upper())
@@ -110,21 +111,17 @@ class AdminInstitutionJobListView(generics.ListAPIView):
         user = self.request.user
         if user.role not in [TUTOR_ADMIN, SUPERADMIN, COUNSELLOR]:
             return JobPost.objects.none()
-        return JobPost.objects.filter(
+        return prefetch_jobs(JobPost.objects.filter(
             status='PENDING_APPROVAL',
             posted_by__role='INSTITUTION',
-        ).select_related('posted_by', 'assigned_admin').prefetch_related('applications', 'applications__tutor', 'applications__tutor__user').order_by('-created_at')
+        ), user).order_by('-created_at')
 
 
 def _complete_admin_task(job_post, admin_user):
-    """Helper to mark an admin task as completed."""
-    try:
-        task = AdminTask.objects.get(job_post=job_post, admin=admin_user, status='PENDING')
-        task.status = 'COMPLETED'
-        task.completed_at = timezone.now()
-        task.save()
-    except AdminTask.DoesNotExist:
-        pass
+    """Helper to mark an admin task as completed (and cancel other admins' open tasks for the job)."""
+    tasks = AdminTask.objects.filter(job_post=job_post)
+    close_admin_tasks(tasks.filter(admin=admin_user))
+    close_admin_tasks(tasks.exclude(admin=admin_user), status='CANCELLED')
 
 
 class AdminApproveJobView(APIView):
@@ -498,7 +495,7 @@ class TransferClientView(APIView):
         new_admin = get_object_or_404(User, id=new_admin_id)
         
         # Update all JobPosts
-        jobs_updated = JobPost.objects.filter(parent=parent).update(assigned_admin=new_admin)
+        jobs_updated = update_with_rollup('JOB', JobPost.objects.filter(parent=parent), assigned_admin=new_admin)
         
         # Update all Enquiries
         from users.models import Enquiry
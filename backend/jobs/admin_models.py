@@ -109,6 +109,29 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='notification_user_created_idx'),
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notification_user_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.username} - {self.title}"
+
+
+class NotificationCounter(models.Model):
+    """Denormalized unread notification count per user; see jobs/notification_counts.py"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='notification_counter')
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
+
+
+class NotificationStreamTicket(models.Model):
+    """Single-use key that opens one notification stream; see jobs/notification_stream.py"""
+    key = models.CharField(max_length=64, primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_stream_tickets')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id}: stream ticket"
@@ -0,0 +1,48 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+class NotificationArchive(models.Model):
+    """
+    Read notifications moved out of Notification by ``archive_old_rows``
+    (core/archive.py). Same columns and ids as the live row; foreign keys carry
+    no database constraint, so deleting a user or job never touches history.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    notification_type = models.CharField(max_length=50)
+    related_job = models.ForeignKey('JobPost', null=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    related_kyc = models.ForeignKey('users.TutorKYC', null=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    is_read = models.BooleanField(default=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'created_at', 'id'], name='notif_archive_user_idx')]
+
+    def __str__(self):
+        return f"{self.user_id} - {self.title} (archived)"
+
+
+class AdminTaskArchive(models.Model):
+    """Completed or cancelled AdminTasks moved out of AdminTask; see NotificationArchive."""
+    id = models.BigIntegerField(primary_key=True)
+    admin = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    task_type = models.CharField(max_length=30)
+    job_post = models.ForeignKey('JobPost', null=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    related_kyc = models.ForeignKey('users.TutorKYC', null=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    status = models.CharField(max_length=20)
+    assigned_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True)
+    notes = models.TextField(blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['admin', 'task_type', 'status'], name='task_archive_admin_idx')]
+
+    def __str__(self):
+        return f"{self.task_type} - {self.admin_id} - {self.status} (archived)"
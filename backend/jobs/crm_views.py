@@ -5,18 +5,21 @@ Handles job pipeline, lead management, and admin assignment
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Sum
 from django.contrib.auth import get_user_model
+from core.pagination import KeysetPagination
 from core.roles import ADMIN_ROLES, COUNSELLOR, SUPERADMIN, TUTOR_ADMIN
-from .models import JobPost, Application
+from .models import JobPost, Application, DailyMetric
+from .prefetch import prefetch_applications, prefetch_jobs
+from .rollup import job_status_totals
 from .serializers import JobPostSerializer
+from .search_index import job_subject_text_q, search_jobs
 from users.admin_views import IsSuperAdmin, IsAdminOrSuperAdmin
 
 User = get_user_model()
 
 
-class StandardPagination(PageNumberPagination):
+class StandardPagination(KeysetPagination):
     page_size = 20
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -32,7 +35,7 @@ class CRMJobListView(generics.ListAPIView):
     pagination_class = StandardPagination
 
     def get_queryset(self):
-        queryset = JobPost.objects.all().prefetch_related('applications', 'applications__tutor', 'applications__tutor__user').order_by('-created_at')
+        queryset = prefetch_jobs(JobPost.objects.all(), self.request.user).order_by('-created_at')
         
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -71,26 +74,26 @@ class CRMJobListView(generics.ListAPIView):
         # Search by student name or subjects
         search = self.request.query_params.get('q')
         if search:
-            queryset = queryset.filter(
+            queryset = search_jobs(queryset, search, (
                 Q(student_name__icontains=search) |
                 Q(locality__icontains=search) |
                 Q(class_grade__icontains=search)
-            )
+            ))
         
         return queryset
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
         
-        # Add summary stats
-        all_jobs = JobPost.objects.all()
+        # Add summary stats (from the daily rollup, see rollup.py)
+        totals = job_status_totals()
         response.data['stats'] = {
-            'total': all_jobs.count(),
-            'pending': all_jobs.filter(status='PENDING_APPROVAL').count(),
-            'approved': all_jobs.filter(status='APPROVED').count(),
-            'rejected': all_jobs.filter(status='REJECTED').count(),
-            'assigned': all_jobs.filter(status='ASSIGNED').count(),
-            'closed': all_jobs.filter(status='CLOSED').count(),
+            'total': sum(totals.values()),
+            'pending': totals.get('PENDING_APPROVAL', 0),
+            'approved': totals.get('APPROVED', 0),
+            'rejected': totals.get('REJECTED', 0),
+            'assigned': totals.get('ASSIGNED', 0),
+            'closed': totals.get('CLOSED', 0),
         }
         
         return response
@@ -250,30 +253,45 @@ class CRMPipelineStatsView(APIView):
         this_week = today - timedelta(days=7)
         this_month = today - timedelta(days=30)
 
-        jobs = JobPost.objects.all()
+        # Read from the daily rollup (see rollup.py): cost scales with days, not rows
+        jobs = DailyMetric.objects.filter(kind='JOB').aggregate(
+            pending=Sum('count', filter=Q(status='PENDING_APPROVAL')),
+            approved=Sum('count', filter=Q(status='APPROVED')),
+            assigned=Sum('count', filter=Q(status='ASSIGNED')),
+            closed=Sum('count', filter=Q(status='CLOSED')),
+            rejected=Sum('count', filter=Q(status='REJECTED')),
+            today=Sum('count', filter=Q(day=today)),
+            this_week=Sum('count', filter=Q(day__gte=this_week)),
+            this_month=Sum('count', filter=Q(day__gte=this_month)),
+            unassigned_pending=Sum('count', filter=Q(status='PENDING_APPROVAL', admin_id=0)),
+        )
+        applications = DailyMetric.objects.filter(kind='APPLICATION').aggregate(
+            total=Sum('count'),
+            hired=Sum('count', filter=Q(status='HIRED')),
+        )
+        jobs = {key: value or 0 for key, value in jobs.items()}
+        total_applications = applications['total'] or 0
+        hired_applications = applications['hired'] or 0
         
         return Response({
             # Pipeline stages
             'pipeline': {
-                'pending': jobs.filter(status='PENDING_APPROVAL').count(),
-                'approved': jobs.filter(status='APPROVED').count(),
-                'assigned': jobs.filter(status='ASSIGNED').count(),
-                'closed': jobs.filter(status='CLOSED').count(),
-                'rejected': jobs.filter(status='REJECTED').count(),
+                'pending': jobs['pending'],
+                'approved': jobs['approved'],
+                'assigned': jobs['assigned'],
+                'closed': jobs['closed'],
+                'rejected': jobs['rejected'],
             },
             # Time-based metrics
-            'today': jobs.filter(created_at__date=today).count(),
-            'this_week': jobs.filter(created_at__date__gte=this_week).count(),
-            'this_month': jobs.filter(created_at__date__gte=this_month).count(),
+            'today': jobs['today'],
+            'this_week': jobs['this_week'],
+            'this_month': jobs['this_month'],
             # Conversion metrics
-            'total_applications': Application.objects.count(),
-            'hired_applications': Application.objects.filter(status='HIRED').count(),
-            'conversion_rate': round(
-                (Application.objects.filter(status='HIRED').count() / max(Application.objects.count(), 1)) * 100, 
-                1
-            ),
+            'total_applications': total_applications,
+            'hired_applications': hired_applications,
+            'conversion_rate': round((hired_applications / max(total_applications, 1)) * 100, 1),
             # Unassigned jobs needing attention
-            'unassigned_pending': jobs.filter(status='PENDING_APPROVAL', assigned_admin__isnull=True).count(),
+            'unassigned_pending': jobs['unassigned_pending'],
         })
 
 
@@ -287,7 +305,7 @@ class AdminApplicationListView(generics.ListAPIView):
     pagination_class = StandardPagination
 
     def get_queryset(self):
-        queryset = Application.objects.all().select_related('tutor', 'job').order_by('-created_at')
+        queryset = prefetch_applications(Application.objects.all(), self.request.user).order_by('-created_at')
         
         # If user is a COUNSELLOR, show applications for jobs assigned to them
         # Except for HIRED applications, which are shared across all counsellors for visibility
@@ -309,7 +327,7 @@ class AdminApplicationListView(generics.ListAPIView):
                 Q(tutor__user__username__icontains=q) |
                 Q(tutor__user__email__icontains=q) |
                 Q(job__class_grade__icontains=q) |
-                Q(job__subjects__icontains=q)
+                job_subject_text_q(q, job_field='job_id', subjects_field='job__subjects')
             )
             
         return queryset
@@ -0,0 +1,69 @@
+"""
+Move old notifications, admin tasks and wallet transactions to their archive
+tables (core/archive.py), or to gzipped JSONL files.
+
+USAGE:
+  python manage.py archive_old_rows                    # every policy, ages from settings.RETENTION_DAYS
+  python manage.py archive_old_rows --policy notifications --days 90
+  python manage.py archive_old_rows --to-jsonl /var/backups/thtpro
+  python manage.py archive_old_rows --dry-run
+
+Each batch is its own short transaction, so the command can run alongside
+traffic and be interrupted safely. Rows written with --to-jsonl leave the
+database entirely and no longer show up under ?include_archived=1. Wallet
+transactions always go to their archive table: the ledger check and wallet
+totals need them, so --to-jsonl with --policy transactions is refused.
+"""
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.archive import POLICIES, JsonlSink, archive_rows
+
+
+class Command(BaseCommand):
+    help = 'Archive rows older than the retention policy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--policy', action='append', choices=sorted(POLICIES), default=None,
+                            help='Only run this policy (repeatable; default: all)')
+        parser.add_argument('--days', type=int, default=None,
+                            help='Override the retention age in days for the selected policies')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows moved per transaction (default: 1000)')
+        parser.add_argument('--pause', type=float, default=0,
+                            help='Seconds to sleep between batches (default: 0)')
+        parser.add_argument('--to-jsonl', metavar='DIR', default=None,
+                            help='Write rows to DIR/<policy>-<timestamp>.jsonl.gz instead of the archive tables')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows are due')
+
+    def handle(self, *args, **options):
+        if options['to_jsonl'] and not os.path.isdir(options['to_jsonl']):
+            raise CommandError(f"{options['to_jsonl']} is not a directory")
+        if options['to_jsonl'] and options['policy']:
+            table_only = [name for name in options['policy'] if not POLICIES[name].jsonl]
+            if table_only:
+                raise CommandError(f"--to-jsonl is not allowed for: {', '.join(table_only)}")
+
+        for name in options['policy'] or POLICIES:
+            policy = POLICIES[name]
+            cutoff = policy.cutoff(options['days'])
+            if cutoff is None:
+                self.stdout.write(f"{name}: retention disabled, skipped.")
+                continue
+            if options['dry_run']:
+                due = policy.due(cutoff).count()
+                self.stdout.write(f"{name}: {due} row(s) older than {cutoff:%Y-%m-%d} would be archived.")
+                continue
+
+            sink = JsonlSink(options['to_jsonl'], policy) if options['to_jsonl'] and policy.jsonl else None
+            started = time.monotonic()
+            moved = 0
+            for count in archive_rows(policy, cutoff, options['batch_size'], sink, options['pause']):
+                moved += count
+            target = sink.path if sink else policy.archive_model._meta.db_table
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: archived {moved} row(s) to {target} in {time.monotonic() - started:.1f}s"
+            ))
@@ -0,0 +1,108 @@
+"""
+Benchmark import_tutors: row-by-row writes against --bulk.
+
+USAGE:
+  python manage.py benchmark_import_tutors
+  python manage.py benchmark_import_tutors --rows 50000 --legacy-rows 1000
+  python manage.py benchmark_import_tutors --workers 4
+
+A synthetic Google Form export is written to a temp directory and imported
+inside a transaction that is rolled back at the end, so the command is safe
+to run against a dev database. The row-by-row path hashes a password and
+runs several queries per tutor, so it is timed on a smaller sample
+(--legacy-rows) and compared per row.
+"""
+
+import csv
+import os
+import random
+import tempfile
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+HEADERS = [
+    'Email Address', 'NAME', 'Gender', 'Date of Birth',
+    'CALLING NUMBER , WHATSAPP NUMBER , ALTERNATE NUMBER', 'MARITAL STATUS',
+    'HIGHEST QUALIFICATION', 'Classes and Subjects',
+    'Which Subjects you can teach in class 9th and 10th',
+    'IN WHICH LOCATIONS YOU CAN TEACH', 'TEACHING EXPERIENCE IN YEARS',
+    'LOCAL ADDRESS', 'APPROVED OR NOT',
+]
+SAMPLE_SUBJECTS = [
+    'Class 1 to 5 - All Subjects', 'Class 6-8, Maths, Science', 'Class 9th, 10th - Mathematics, Science',
+    'Physics, Chemistry', 'English, Hindi, SST', 'Accounts, Economics, Business Studies', 'Computer Science, IT',
+]
+SAMPLE_LOCALITIES = ['Gomti Nagar', 'Indira Nagar', 'Aliganj', 'Hazratganj', 'Alambagh']
+
+
+class Command(BaseCommand):
+    help = 'Time import_tutors row-by-row vs --bulk on a synthetic CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000,
+                            help='Rows to import in --bulk mode (default: 50000)')
+        parser.add_argument('--legacy-rows', type=int, default=500,
+                            help='Rows to import row by row for comparison; 0 skips it (default: 500)')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Passed to import_tutors for the --bulk run')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with tempfile.TemporaryDirectory() as tmp:
+            bulk_csv = self._write_csv(os.path.join(tmp, 'bulk.csv'), options['rows'], phone_prefix='9')
+            legacy_csv = None
+            if options['legacy_rows']:
+                legacy_csv = self._write_csv(os.path.join(tmp, 'legacy.csv'), options['legacy_rows'], phone_prefix='8')
+
+            with transaction.atomic():
+                results = [('bulk', options['rows']) + self._run(
+                    bulk_csv, bulk=True, chunk_size=options['chunk_size'], workers=options['workers'])]
+                if legacy_csv:
+                    results.append(('row-by-row', options['legacy_rows']) + self._run(legacy_csv))
+                transaction.set_rollback(True)
+
+        self.stdout.write(f"\n{'mode':<12}{'rows':>8}{'seconds':>10}{'rows/s':>10}{'queries':>10}{'q/row':>8}")
+        for mode, rows, elapsed, queries in results:
+            self.stdout.write(
+                f'{mode:<12}{rows:>8}{elapsed:>10.1f}{rows / elapsed:>10.0f}{queries:>10}{queries / rows:>8.2f}'
+            )
+        if len(results) == 2:
+            speedup = (results[0][1] / results[0][2]) / (results[1][1] / results[1][2])
+            self.stdout.write(f'\n--bulk imports {speedup:.1f}x more rows per second.')
+        self.stdout.write(self.style.SUCCESS('Benchmark data rolled back.'))
+
+    def _write_csv(self, path, count, phone_prefix):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            for i in range(count):
+                writer.writerow([
+                    f'bench{phone_prefix}{i}@example.com',
+                    f'Tutor {i} Benchmark',
+                    random.choice(['Male', 'Female']),
+                    f'{random.randint(1, 12)}/{random.randint(1, 28)}/{random.randint(1975, 2002)}',
+                    f'{phone_prefix}{i:09d}',
+                    random.choice(['Single', 'Married']),
+                    random.choice(['B.Sc', 'M.Sc', 'B.Tech', 'MA', 'B.Com']),
+                    random.choice(SAMPLE_SUBJECTS),
+                    random.choice(['', 'Maths, Science', 'English']),
+                    random.choice(SAMPLE_LOCALITIES),
+                    f'{random.randint(0, 15)} years',
+                    f'House {i}, Lucknow',
+                    random.choice(['Approved', '']),
+                ])
+        return path
+
+    def _run(self, path, **import_options):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            call_command('import_tutors', path, stdout=StringIO(), **import_options)
+            elapsed = time.perf_counter() - start
+        return elapsed, len(queries)
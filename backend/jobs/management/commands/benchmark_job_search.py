@@ -0,0 +1,103 @@
+"""
+Benchmark legacy JSON-scan job search against the normalized subject index.
+
+USAGE:
+  python manage.py benchmark_job_search
+  python manage.py benchmark_job_search --jobs 100000 --repeat 5
+
+Synthetic jobs are created inside a transaction that is rolled back at the
+end, so the command is safe to run against a dev database.
+"""
+
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.models import JobPost
+from jobs.search_index import filter_jobs_by_subject, rebuild_job_search_index
+from jobs.utils import filter_by_subject
+
+User = get_user_model()
+
+SAMPLE_SUBJECTS = [
+    'Maths', 'Mathematics', 'Physics', 'Chemistry', 'Biology', 'English', 'Hindi',
+    'SST', 'Computer Science', 'Accounts', 'Economics', 'EVS', 'Science', 'French',
+]
+SEARCH_SUBJECTS = ['Mathematics', 'Physics', 'Computer Science', 'Accountancy', 'French']
+
+
+class Command(BaseCommand):
+    help = 'Compare legacy icontains job search with the normalized subject index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=100000,
+                            help='Number of synthetic approved jobs to create (default: 100000)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed runs per subject; the best run is reported')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        with transaction.atomic():
+            self._seed(options['jobs'])
+            self._compare(options['repeat'])
+            transaction.set_rollback(True)
+        self.stdout.write(self.style.SUCCESS('Benchmark data rolled back.'))
+
+    def _seed(self, count):
+        start = time.perf_counter()
+        poster = User.objects.create(username='benchmark_job_search_poster', role='PARENT')
+        batch = []
+        for i in range(count):
+            batch.append(JobPost(
+                posted_by=poster,
+                student_name=f'Student {i}',
+                class_grade=f'Class {random.randint(1, 12)}',
+                board='CBSE',
+                subjects=random.sample(SAMPLE_SUBJECTS, random.randint(1, 3)),
+                locality='Gomti Nagar',
+                status='APPROVED',
+            ))
+            if len(batch) >= 5000:
+                JobPost.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            JobPost.objects.bulk_create(batch)
+
+        # bulk_create skips post_save, so index the synthetic rows explicitly.
+        indexed = rebuild_job_search_index(
+            JobPost.objects.filter(posted_by=poster).only('id', 'subjects').iterator(chunk_size=5000),
+            batch_size=5000,
+        )
+        self.stdout.write(f'Seeded and indexed {indexed} jobs in {time.perf_counter() - start:.1f}s')
+
+    def _time(self, build_queryset, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = build_queryset().order_by('-created_at')
+            total = queryset.count()
+            list(queryset.values_list('id', flat=True)[:20])
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, total
+
+    def _compare(self, repeat):
+        base = JobPost.objects.filter(status='APPROVED')
+        self.stdout.write(f"\n{'subject':<20}{'legacy ms':>12}{'index ms':>12}{'speedup':>10}{'legacy n':>10}{'index n':>10}")
+        for subject in SEARCH_SUBJECTS:
+            legacy_time, legacy_count = self._time(lambda: filter_by_subject(base, subject), repeat)
+            index_time, index_count = self._time(lambda: filter_jobs_by_subject(base, subject), repeat)
+            speedup = legacy_time / index_time if index_time else float('inf')
+            self.stdout.write(
+                f'{subject:<20}{legacy_time * 1000:>12.1f}{index_time * 1000:>12.1f}'
+                f'{speedup:>9.1f}x{legacy_count:>10}{index_count:>10}'
+            )
+        self.stdout.write(
+            '\nCounts can differ: the legacy filter matches synonyms as substrings '
+            '(e.g. "CS" inside "Physics"), '
+            'the index matches whole canonical subjects.'
+        )
@@ -0,0 +1,78 @@
+"""
+Micro-benchmark the precompiled vocabulary matcher in jobs/vocabulary.py.
+
+USAGE:
+  python manage.py benchmark_vocabulary
+  python manage.py benchmark_vocabulary --strings 20000 --repeat 5
+
+Compares, on synthetic Google Form subject strings, the per-pattern loops the
+importer and search used before (one substring test per CLASS_NORMALIZE key,
+one regex per synonym) with a single scan_vocabulary() pass. No database
+access.
+"""
+
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.vocabulary import CLASS_NORMALIZE, SUBJECT_SYNONYMS, class_mentions, scan_vocabulary
+
+SAMPLE_WORDS = list(CLASS_NORMALIZE) + [syn for synonyms in SUBJECT_SYNONYMS.values() for syn in synonyms] + [
+    'All Subjects', 'Class 1 to 5', 'LKG', 'primary', 'French', 'Spoken English', 'Vedic Maths',
+]
+SEPARATORS = [', ', '; ', '\n', ' - ', ' and ', ' ']
+
+_PER_SYNONYM_RES = [
+    (re.compile(r'\b' + re.escape(syn) + r'\b', re.IGNORECASE), canonical)
+    for canonical, synonyms in SUBJECT_SYNONYMS.items()
+    for syn in synonyms + [canonical]
+]
+
+
+def loop_classes(text):
+    lower = text.lower()
+    return {normalized for raw_class, normalized in CLASS_NORMALIZE.items() if raw_class in lower}
+
+
+def loop_subjects(text):
+    return {canonical for pattern, canonical in _PER_SYNONYM_RES if pattern.search(text)}
+
+
+class Command(BaseCommand):
+    help = 'Compare per-pattern subject/class matching with the single-pass vocabulary regex'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strings', type=int, default=20000,
+                            help='Synthetic subject strings to match (default: 20000)')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Timed runs per matcher; the best run is reported')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        texts = [
+            ''.join(random.choice(SAMPLE_WORDS) + random.choice(SEPARATORS) for _ in range(random.randint(1, 8)))
+            for _ in range(options['strings'])
+        ]
+
+        mismatches = sum(loop_classes(text) != class_mentions(text) for text in texts)
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{mismatches} strings matched different classes'))
+
+        rows = [
+            ('classes, loop over CLASS_NORMALIZE', loop_classes),
+            ('subjects, one regex per synonym', loop_subjects),
+            ('both, scan_vocabulary()', scan_vocabulary),
+        ]
+        self.stdout.write(f"\n{'matcher':<40}{'us/string':>12}")
+        for label, matcher in rows:
+            best = None
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                for text in texts:
+                    matcher(text)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write(f'{label:<40}{best / len(texts) * 1e6:>12.1f}')
@@ -5,6 +5,8 @@ USAGE:
   python manage.py import_tutors path/to/*.csv
   python manage.py import_tutors *.csv --dry-run
   python manage.py import_tutors *.csv --status ACTIVE --report report.csv
+  python manage.py import_tutors *.csv --bulk --chunk-size 2000
+  python manage.py import_tutors *.csv --bulk --workers 4
 
 KEY FIXES (v2):
   - Per-row savepoints: one bad row never kills the rest
@@ -12,18 +14,28 @@ KEY FIXES (v2):
   - Extracts subjects AND classes from CSV columns
   - Populates about_me from school experience field
   - Better phone & subject parsing
+  - Rows are streamed, never loaded into memory all at once
+  - --bulk: bulk_create per chunk instead of ~7 queries per tutor
+    (see benchmark_import_tutors)
+  - --workers N: row cleaning runs in a process pool, merged back in input order
 """
 
 import csv
 import os
 import re
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, date
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
 from django.db import transaction
 
+from jobs.vocabulary import CLASS_NORMALIZE, IMPORT_SUBJECT_NORMALIZE, class_mentions
 from users.models import TutorProfile, TutorStatus, TutorKYC
+from users.ranking import refresh_tutor_rankings
+from users.search_index import rebuild_tutor_search_index
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -162,24 +174,9 @@ CLASS_PATTERNS = [
     r'\b1[0-2](?:th)?\b',
 ]
 
-# Map raw class mentions to normalized values
-CLASS_NORMALIZE = {
-    'nursery': 'Nursery/Preschool', 'preschool': 'Nursery/Preschool',
-    'pre school': 'Nursery/Preschool', 'pre-school': 'Nursery/Preschool',
-    'kg': 'Nursery/Preschool', 'lkg': 'Nursery/Preschool', 'ukg': 'Nursery/Preschool',
-    'pre primary': 'Nursery/Preschool', 'pre-primary': 'Nursery/Preschool',
-    'class 1 to 5': 'Class 1-5', 'class 1-5': 'Class 1-5',
-    'class 6 to 8': 'Class 6-8', 'class 6-8': 'Class 6-8',
-    'class 9': 'Class 9', 'class 9th': 'Class 9', '9th': 'Class 9',
-    'class 10': 'Class 10', 'class 10th': 'Class 10', '10th': 'Class 10',
-    'class 11': 'Class 11', 'class 11th': 'Class 11', '11th': 'Class 11',
-    'class 12': 'Class 12', 'class 12th': 'Class 12', '12th': 'Class 12',
-    'iit jee': 'IIT-JEE/NEET', 'iit-jee': 'IIT-JEE/NEET',
-    'neet': 'IIT-JEE/NEET', 'competitive': 'IIT-JEE/NEET',
-    '1st': 'Class 1-5', '2nd': 'Class 1-5', '3rd': 'Class 1-5',
-    '4th': 'Class 1-5', '5th': 'Class 1-5',
-    '6th': 'Class 6-8', '7th': 'Class 6-8', '8th': 'Class 6-8',
-}
+_TOKEN_SPLIT_RE = re.compile(r'[,\n;]+')
+_ORDINAL_RE = re.compile(r'^\d{1,2}(?:st|nd|rd|th)?$')
+_CLASS_TOKEN_RE = re.compile(r'class\s')
 
 
 def clean_subjects_and_classes(parts):
@@ -190,82 +187,26 @@ def clean_subjects_and_classes(parts):
     subjects = []
     classes = set()
 
-    # Known subject keywords (case-insensitive matching)
-    SUBJECT_KEYWORDS = {
-        'mathematics', 'maths', 'math', 'physics', 'chemistry', 'biology',
-        'science', 'english', 'hindi', 'sanskrit', 'social science', 'sst',
-        'social studies', 'history', 'geography', 'civics', 'political science',
-        'computer science', 'computer', 'computers', 'cs', 'it',
-        'information technology', 'coding', 'programming',
-        'accountancy', 'accounts', 'accounting', 'business studies', 'business',
-        'economics', 'commerce', 'evs', 'environmental studies',
-        'environmental science', 'psychology', 'sociology',
-        'physical education', 'pe', 'general knowledge', 'gk',
-        'reasoning', 'aptitude', 'drawing', 'art', 'music',
-    }
-
-    # Normalized subject names
-    SUBJECT_NORMALIZE = {
-        'maths': 'Mathematics', 'math': 'Mathematics', 'mathematics': 'Mathematics',
-        'physics': 'Physics', 'chemistry': 'Chemistry', 'biology': 'Biology',
-        'science': 'Science', 'english': 'English', 'hindi': 'Hindi',
-        'sanskrit': 'Sanskrit', 'social science': 'Social Science',
-        'sst': 'Social Science', 'social studies': 'Social Science',
-        'history': 'History', 'geography': 'Geography', 'civics': 'Civics',
-        'political science': 'Political Science',
-        'computer science': 'Computer Science', 'computer': 'Computer Science',
-        'computers': 'Computer Science', 'cs': 'Computer Science',
-        'it': 'Information Technology', 'information technology': 'Information Technology',
-        'coding': 'Coding', 'programming': 'Coding',
-        'accountancy': 'Accountancy', 'accounts': 'Accountancy',
-        'accounting': 'Accountancy', 'business studies': 'Business Studies',
-        'business': 'Business Studies', 'economics': 'Economics',
-        'commerce': 'Commerce', 'evs': 'EVS',
-        'environmental studies': 'EVS', 'environmental science': 'EVS',
-        'psychology': 'Psychology', 'sociology': 'Sociology',
-        'physical education': 'Physical Education', 'pe': 'Physical Education',
-        'general knowledge': 'General Knowledge', 'gk': 'General Knowledge',
-        'reasoning': 'Reasoning', 'aptitude': 'Aptitude',
-        'drawing': 'Drawing', 'art': 'Art', 'music': 'Music',
-    }
-
     for part in parts:
         if not part:
             continue
-        # Check for class mentions and extract them
-        lower_part = part.lower()
-        for raw_class, normalized in CLASS_NORMALIZE.items():
-            if raw_class in lower_part:
-                classes.add(normalized)
+        # Class mentions anywhere in the part, in one pass (see jobs/vocabulary.py).
+        # Tokens are substrings of the part, so this also covers every token below.
+        classes |= class_mentions(part)
 
         # Split by comma, newline, semicolon, and
-        for s in re.split(r'[,\n;]+', part):
+        for s in _TOKEN_SPLIT_RE.split(part):
             s = s.strip()
             if not s or len(s) <= 1 or s.lower() in ('none', 'na', 'n/a', '-', 'no'):
                 continue
 
-            # Check if this token is a class reference (skip adding to subjects)
             s_lower = s.lower().strip()
-            if s_lower in CLASS_NORMALIZE:
-                classes.add(CLASS_NORMALIZE[s_lower])
-                continue
-
-            # Check if it's a pure number like "9th", "10th"
-            if re.match(r'^\d{1,2}(?:st|nd|rd|th)?$', s_lower):
-                if s_lower in CLASS_NORMALIZE:
-                    classes.add(CLASS_NORMALIZE[s_lower])
-                continue
-
-            # Check if it looks like "Class X" pattern
-            if re.match(r'class\s', s_lower):
-                # It's a class, not a subject
-                for raw_class, normalized in CLASS_NORMALIZE.items():
-                    if raw_class in s_lower:
-                        classes.add(normalized)
+            # Class references ("10th", "Class 9", "LKG") are not subjects
+            if s_lower in CLASS_NORMALIZE or _ORDINAL_RE.match(s_lower) or _CLASS_TOKEN_RE.match(s_lower):
                 continue
 
             # Otherwise treat as subject — normalize if known
-            normalized_subj = SUBJECT_NORMALIZE.get(s_lower)
+            normalized_subj = IMPORT_SUBJECT_NORMALIZE.get(s_lower)
             if normalized_subj:
                 subjects.append(normalized_subj)
             elif len(s) > 2:
@@ -301,6 +242,124 @@ def make_unique_email(email, phone):
     return f"{phone}@imported.thtpro.in"
 
 
+
+def parse_row(row, lookup):
+    """
+    Clean one CSV row into everything the import stages need.
+    Pure function: no DB access, so it is safe to run ahead of the writes.
+    """
+    phone_raw = get(row, lookup, 'phone')
+
+    # Parse subjects AND classes
+    classes_subjects_raw = get(row, lookup, 'classes_subjects')
+    subjects_9_10_raw = get(row, lookup, 'subjects_9_10')
+    subjects_11_12_raw = get(row, lookup, 'subjects_11_12')
+    subjects_extra_raw = get(row, lookup, 'subjects_extra')
+
+    subjects, classes = clean_subjects_and_classes([
+        classes_subjects_raw,
+        subjects_9_10_raw,
+        subjects_11_12_raw,
+        subjects_extra_raw,
+    ])
+
+    # Infer classes from which column had data
+    if subjects_9_10_raw and subjects_9_10_raw.lower() not in ('', 'na', 'n/a', 'none', 'no', '-'):
+        classes = list(set(classes) | {'Class 9', 'Class 10'})
+    if subjects_11_12_raw and subjects_11_12_raw.lower() not in ('', 'na', 'n/a', 'none', 'no', '-'):
+        classes = list(set(classes) | {'Class 11', 'Class 12'})
+    if classes_subjects_raw and any(kw in classes_subjects_raw.lower() for kw in ['1-5', '1 to 5', 'primary']):
+        classes = list(set(classes) | {'Class 1-5'})
+    if classes_subjects_raw and any(kw in classes_subjects_raw.lower() for kw in ['6-8', '6 to 8', 'middle']):
+        classes = list(set(classes) | {'Class 6-8'})
+
+    # Build about_me from school experience if available
+    exp_school = get(row, lookup, 'exp_school')
+    about_me = ''
+    if exp_school and exp_school.lower() not in ('', 'na', 'n/a', 'none', 'no', '-'):
+        about_me = exp_school
+
+    return {
+        'full_name': get(row, lookup, 'name'),
+        'phone_raw': phone_raw,
+        'phone': clean_phone(phone_raw),
+        'email_raw': get(row, lookup, 'email'),
+        'approved': is_approved(row, lookup),
+        'gender': clean_gender(get(row, lookup, 'gender')),
+        'dob': clean_dob(get(row, lookup, 'dob')),
+        'marital': clean_marital(get(row, lookup, 'marital_status')),
+        'qualification': get(row, lookup, 'qualification'),
+        'locations': get(row, lookup, 'locations'),
+        'exp_years': clean_experience(get(row, lookup, 'exp_years')),
+        'local_address': get(row, lookup, 'local_address'),
+        'perm_address': get(row, lookup, 'perm_address'),
+        'photo_url': get(row, lookup, 'photo'),
+        'subjects': subjects,
+        'classes': sorted(set(classes)),
+        'about_me': about_me,
+    }
+
+
+def parse_rows(rows):
+    """Process-pool entry point: parse a chunk of (row, lookup) pairs, keeping their order."""
+    return [parse_row(row, lookup) for row, lookup in rows]
+
+
+def new_user_fields(parsed, email):
+    full_name = parsed['full_name']
+    return {
+        'username': parsed['phone'],
+        'email': email,
+        'first_name': (full_name or '').split()[0][:30] if full_name else '',
+        'last_name': ' '.join((full_name or '').split()[1:])[:150] if full_name else '',
+        'role': User.Role.TEACHER,
+        'phone': parsed['phone'],
+    }
+
+
+def fill_new_profile(profile, parsed):
+    """Copy parsed values onto a freshly created profile."""
+    profile.full_name = parsed['full_name'] or ''
+    profile.gender = parsed['gender']
+    profile.dob = parsed['dob']
+    profile.marital_status = parsed['marital']
+    profile.whatsapp_number = parsed['phone']
+    profile.highest_qualification = parsed['qualification']
+    profile.subjects = parsed['subjects']
+    profile.classes = parsed['classes']
+    profile.locality = parsed['locations']
+    profile.teaching_experience_years = parsed['exp_years']
+    profile.local_address = parsed['local_address']
+    profile.permanent_address = parsed['perm_address']
+    profile.teaching_mode = 'BOTH'
+    profile.state = 'Uttar Pradesh'
+    profile.city = 'Lucknow'
+    if parsed['about_me']:
+        profile.about_me = parsed['about_me']
+    if parsed['photo_url'].startswith('http'):
+        profile.external_profile_image_url = parsed['photo_url']
+
+
+def fill_empty_fields(profile, parsed):
+    """--update-existing: only fill empty fields, never overwrite. Returns the changed field names."""
+    photo_url = parsed['photo_url']
+    candidates = [
+        ('subjects', parsed['subjects']),
+        ('classes', parsed['classes']),
+        ('about_me', parsed['about_me']),
+        ('external_profile_image_url', photo_url if photo_url.startswith('http') else ''),
+        ('gender', parsed['gender']),
+        ('dob', parsed['dob']),
+        ('locality', parsed['locations']),
+    ]
+    changed = []
+    for field, value in candidates:
+        if not getattr(profile, field) and value:
+            setattr(profile, field, value)
+            changed.append(field)
+    return changed
+
+
 # ─────────────────────────────────────────────────────────
 # Django Management Command
 # ─────────────────────────────────────────────────────────
@@ -326,295 +385,131 @@ class Command(BaseCommand):
                             help='Default password for created accounts')
         parser.add_argument('--update-existing', action='store_true',
                             help='Update profiles for existing users (fill empty fields)')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Write users/profiles/statuses/KYC with bulk_create per chunk '
+                                 '(signals bypassed, search index rebuilt per chunk)')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows per bulk write in --bulk mode (default: 1000)')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Processes used to clean rows (default: 1, no pool)')
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         approved_only = options['approved_only']
-        target_status = options['status']
         report_path = options['report']
-        default_password = options['default_password']
         update_existing = options['update_existing']
+        bulk = options['bulk']
+        chunk_size = max(options['chunk_size'], 1)
+        self.target_status = options['status']
+        self.default_password = options['default_password']
 
         if dry_run:
             self.stdout.write(self.style.WARNING(
                 '🔍 DRY RUN — no database changes.\n'))
 
-        # ── Load all CSV rows ────────────────────────────────────────
-        all_rows = []
-        for csv_path in options['csv_files']:
-            if not os.path.exists(csv_path):
-                self.stdout.write(self.style.ERROR(f'❌ Not found: {csv_path}'))
-                continue
-            fname = os.path.basename(csv_path)
-            try:
-                with open(csv_path, encoding='utf-8', errors='replace') as f:
-                    reader = csv.DictReader(f)
-                    if not reader.fieldnames:
-                        self.stdout.write(self.style.ERROR(f'❌ Empty CSV: {fname}'))
-                        continue
-                    reader.fieldnames = [
-                        n.strip().replace('\n', '') for n in reader.fieldnames
-                    ]
-                    lookup = build_lookup(reader.fieldnames)
-                    rows = list(reader)
-                self.stdout.write(f'📄 {fname}: {len(rows)} rows. '
-                                  f'Mapped columns: {list(lookup.keys())}')
-                for row in rows:
-                    all_rows.append((row, fname, lookup))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'❌ Read error {fname}: {e}'))
-
-        if not all_rows:
-            self.stdout.write(self.style.ERROR('No rows. Exiting.'))
-            return
-
-        self.stdout.write(f'\n📊 Total rows: {len(all_rows)}\n')
-
         # ── Pre-fetch for speed ──────────────────────────────────────
         self.stdout.write("🔍 Pre-fetching existing users...")
-        existing_usernames = set(
+        self.existing_usernames = set(
             User.objects.values_list('username', flat=True))
-        existing_emails = set(
+        self.existing_emails = set(
             User.objects.values_list('email', flat=True))
-        self.stdout.write(f"   {len(existing_usernames)} existing users.\n")
+        self.stdout.write(f"   {len(self.existing_usernames)} existing users.\n")
 
-        stats = {
+        self.stats = {
             'created': 0, 'updated': 0,
             'skipped_dup': 0, 'skipped_no_phone': 0,
             'skipped_not_approved': 0, 'skipped_existing': 0,
             'errors': 0,
         }
-        report_rows = []
+        self.report_rows = []
+        self.batch_count = 0
+        # Hash the shared default password once; create_user runs a full PBKDF2 per row.
+        self.password_hash = make_password(self.default_password) if bulk and not dry_run else None
         seen_phones = set()
-        batch_count = 0
+        total_rows = 0
+        pending_creates = []
+        pending_updates = []
 
-        for row, source, lookup in all_rows:
-            full_name = get(row, lookup, 'name')
-            phone_raw = get(row, lookup, 'phone')
-            phone = clean_phone(phone_raw)
-            email_raw = get(row, lookup, 'email')
+        for parsed, source in self.iter_parsed(options['csv_files'], options['workers'], chunk_size):
+            total_rows += 1
+            phone = parsed['phone']
 
             # ── Approval filter ──────────────────────────────────────
-            if approved_only and not is_approved(row, lookup):
-                stats['skipped_not_approved'] += 1
-                report_rows.append({
-                    'source': source, 'name': full_name, 'phone': phone,
-                    'result': 'SKIPPED_NOT_APPROVED', 'reason': ''
-                })
+            if approved_only and not parsed['approved']:
+                self.stats['skipped_not_approved'] += 1
+                self.report(source, parsed, 'SKIPPED_NOT_APPROVED')
                 continue
 
             # ── Must have phone ──────────────────────────────────────
             if not phone:
-                stats['skipped_no_phone'] += 1
-                report_rows.append({
-                    'source': source, 'name': full_name, 'phone': '',
-                    'result': 'SKIPPED_NO_PHONE',
-                    'reason': f'Raw: "{phone_raw}"'
-                })
+                self.stats['skipped_no_phone'] += 1
+                self.report(source, parsed, 'SKIPPED_NO_PHONE',
+                            f'Raw: "{parsed["phone_raw"]}"')
                 continue
 
             # ── Cross-file dedup ─────────────────────────────────────
             if phone in seen_phones:
-                stats['skipped_dup'] += 1
-                report_rows.append({
-                    'source': source, 'name': full_name, 'phone': phone,
-                    'result': 'SKIPPED_DUPLICATE', 'reason': 'Dup in batch'
-                })
+                self.stats['skipped_dup'] += 1
+                self.report(source, parsed, 'SKIPPED_DUPLICATE', 'Dup in batch')
                 continue
             seen_phones.add(phone)
 
             # ── Already in DB ────────────────────────────────────────
-            if phone in existing_usernames and not update_existing:
-                stats['skipped_existing'] += 1
-                report_rows.append({
-                    'source': source, 'name': full_name, 'phone': phone,
-                    'result': 'SKIPPED_EXISTING', 'reason': 'Already in DB'
-                })
+            if phone in self.existing_usernames and not update_existing:
+                self.stats['skipped_existing'] += 1
+                self.report(source, parsed, 'SKIPPED_EXISTING', 'Already in DB')
                 continue
 
-            # ── Parse fields ─────────────────────────────────────────
-            gender = clean_gender(get(row, lookup, 'gender'))
-            dob = clean_dob(get(row, lookup, 'dob'))
-            marital = clean_marital(get(row, lookup, 'marital_status'))
-            qualification = get(row, lookup, 'qualification')
-            locations = get(row, lookup, 'locations')
-            exp_years = clean_experience(get(row, lookup, 'exp_years'))
-            exp_school = get(row, lookup, 'exp_school')
-            local_address = get(row, lookup, 'local_address')
-            perm_address = get(row, lookup, 'perm_address')
-            photo_url = get(row, lookup, 'photo')
-
-            # Parse subjects AND classes
-            classes_subjects_raw = get(row, lookup, 'classes_subjects')
-            subjects_9_10_raw = get(row, lookup, 'subjects_9_10')
-            subjects_11_12_raw = get(row, lookup, 'subjects_11_12')
-            subjects_extra_raw = get(row, lookup, 'subjects_extra')
-
-            subjects, classes = clean_subjects_and_classes([
-                classes_subjects_raw,
-                subjects_9_10_raw,
-                subjects_11_12_raw,
-                subjects_extra_raw,
-            ])
-
-            # Infer classes from which column had data
-            if subjects_9_10_raw and subjects_9_10_raw.lower() not in ('', 'na', 'n/a', 'none', 'no', '-'):
-                classes = list(set(classes) | {'Class 9', 'Class 10'})
-            if subjects_11_12_raw and subjects_11_12_raw.lower() not in ('', 'na', 'n/a', 'none', 'no', '-'):
-                classes = list(set(classes) | {'Class 11', 'Class 12'})
-            if classes_subjects_raw and any(kw in classes_subjects_raw.lower() for kw in ['1-5', '1 to 5', 'primary']):
-                classes = list(set(classes) | {'Class 1-5'})
-            if classes_subjects_raw and any(kw in classes_subjects_raw.lower() for kw in ['6-8', '6 to 8', 'middle']):
-                classes = list(set(classes) | {'Class 6-8'})
-
-            classes = sorted(set(classes))
-
-            # Build about_me from school experience if available
-            about_me = ''
-            if exp_school and exp_school.lower() not in ('', 'na', 'n/a', 'none', 'no', '-'):
-                about_me = exp_school
-
-            email = make_unique_email(email_raw, phone)
-            if email in existing_emails:
+            email = make_unique_email(parsed['email_raw'], phone)
+            if email in self.existing_emails:
                 email = make_unique_email('', phone)
 
             # ── Dry run ──────────────────────────────────────────────
             if dry_run:
-                stats['created'] += 1
-                report_rows.append({
-                    'source': source, 'name': full_name, 'phone': phone,
-                    'result': 'WOULD_CREATE', 'reason': ''
-                })
+                self.stats['created'] += 1
+                self.report(source, parsed, 'WOULD_CREATE')
                 continue
 
+            # The report row is filled in once the write has happened,
+            # so bulk mode keeps the report in input order.
+            entry = self.report(source, parsed, '')
+
             # ── Handle existing user update ───────────────────────────
-            if phone in existing_usernames and update_existing:
-                try:
-                    with transaction.atomic():
-                        user = User.objects.get(username=phone)
-                        profile = user.tutor_profile
-                        updated = False
-
-                        # Only fill empty fields, don't overwrite existing data
-                        if not profile.subjects and subjects:
-                            profile.subjects = subjects
-                            updated = True
-                        if not profile.classes and classes:
-                            profile.classes = classes
-                            updated = True
-                        if not profile.about_me and about_me:
-                            profile.about_me = about_me
-                            updated = True
-                        if not profile.external_profile_image_url and photo_url and photo_url.startswith('http'):
-                            profile.external_profile_image_url = photo_url
-                            updated = True
-                        if not profile.gender and gender:
-                            profile.gender = gender
-                            updated = True
-                        if not profile.dob and dob:
-                            profile.dob = dob
-                            updated = True
-                        if not profile.locality and locations:
-                            profile.locality = locations
-                            updated = True
-
-                        if updated:
-                            profile.save()
-                            stats['updated'] += 1
-                            report_rows.append({
-                                'source': source, 'name': full_name,
-                                'phone': phone, 'result': 'UPDATED',
-                                'reason': ''
-                            })
-                        else:
-                            stats['skipped_existing'] += 1
-                            report_rows.append({
-                                'source': source, 'name': full_name,
-                                'phone': phone, 'result': 'SKIPPED_EXISTING',
-                                'reason': 'No empty fields to update'
-                            })
-                except Exception as e:
-                    stats['errors'] += 1
-                    report_rows.append({
-                        'source': source, 'name': full_name,
-                        'phone': phone, 'result': 'ERROR',
-                        'reason': str(e)[:200]
-                    })
+            if phone in self.existing_usernames and update_existing:
+                if bulk:
+                    pending_updates.append((parsed, entry))
+                    if len(pending_updates) >= chunk_size:
+                        self.flush_updates(pending_updates)
+                        pending_updates = []
+                else:
+                    self.update_one(parsed, entry)
                 continue
 
-            # ── Create new user (PER-ROW SAVEPOINT) ──────────────────
-            try:
-                with transaction.atomic():
-                    user = User.objects.create_user(
-                        username=phone,
-                        email=email,
-                        password=default_password,
-                        first_name=(full_name or '').split()[0][:30] if full_name else '',
-                        last_name=' '.join((full_name or '').split()[1:])[:150] if full_name else '',
-                        role=User.Role.TEACHER,
-                        phone=phone,
-                    )
-
-                    profile = user.tutor_profile
-                    profile.full_name = full_name or ''
-                    profile.gender = gender
-                    profile.dob = dob
-                    profile.marital_status = marital
-                    profile.whatsapp_number = phone
-                    profile.highest_qualification = qualification
-                    profile.subjects = subjects
-                    profile.classes = classes
-                    profile.locality = locations
-                    profile.teaching_experience_years = exp_years
-                    profile.local_address = local_address
-                    profile.permanent_address = perm_address
-                    profile.teaching_mode = 'BOTH'
-                    profile.state = 'Uttar Pradesh'
-                    profile.city = 'Lucknow'
-                    if about_me:
-                        profile.about_me = about_me
-                    if photo_url and photo_url.startswith('http'):
-                        profile.external_profile_image_url = photo_url
-                    profile.save()
-
-                    # Update status
-                    status_obj = profile.status_record
-                    status_obj.status = target_status
-                    status_obj.save(update_fields=['status'])
-
-                    # KYC for approved rows
-                    if is_approved(row, lookup):
-                        TutorKYC.objects.get_or_create(
-                            tutor=profile,
-                            defaults={'status': TutorKYC.Status.VERIFIED}
-                        )
-
-                    # Track in memory to avoid duplicate attempts
-                    existing_usernames.add(phone)
-                    existing_emails.add(email)
-
-                stats['created'] += 1
-                report_rows.append({
-                    'source': source, 'name': full_name, 'phone': phone,
-                    'result': 'CREATED', 'reason': ''
-                })
+            # ── Create new user ──────────────────────────────────────
+            if bulk:
+                # Claim phone/email now so later rows in the same chunk see them
+                self.existing_usernames.add(phone)
+                self.existing_emails.add(email)
+                pending_creates.append((parsed, entry, email))
+                if len(pending_creates) >= chunk_size:
+                    self.flush_creates(pending_creates)
+                    pending_creates = []
+            else:
+                self.create_one(parsed, entry, email)
+
+        if pending_updates:
+            self.flush_updates(pending_updates)
+        if pending_creates:
+            self.flush_creates(pending_creates)
+
+        if not total_rows:
+            self.stdout.write(self.style.ERROR('No rows. Exiting.'))
+            return
 
-            except Exception as e:
-                stats['errors'] += 1
-                msg = str(e)[:200]
-                report_rows.append({
-                    'source': source, 'name': full_name, 'phone': phone,
-                    'result': 'ERROR', 'reason': msg
-                })
-
-            # Progress indicator every 500 rows
-            batch_count += 1
-            if batch_count % 500 == 0:
-                self.stdout.write(
-                    f'  ⏳ Processed {batch_count} rows... '
-                    f'({stats["created"]} created, {stats["errors"]} errors)')
+        self.stdout.write(f'\n📊 Total rows: {total_rows}\n')
 
         # ── Summary ──────────────────────────────────────────────────
+        stats = self.stats
         self.stdout.write('\n' + '─' * 60)
         self.stdout.write(self.style.SUCCESS(
             f'✅ Created:            {stats["created"]}'))
@@ -640,9 +535,228 @@ class Command(BaseCommand):
                     w = csv.DictWriter(rf, fieldnames=[
                         'source', 'name', 'phone', 'result', 'reason'])
                     w.writeheader()
-                    w.writerows(report_rows)
+                    w.writerows(self.report_rows)
                 self.stdout.write(self.style.SUCCESS(
                     f'📋 Report: {report_path}'))
             except Exception as e:
                 self.stdout.write(self.style.ERROR(
                     f'Report write error: {e}'))
+
+    # ── Input ────────────────────────────────────────────────────────
+
+    def iter_rows(self, csv_files):
+        """Yield (row, source, lookup) one row at a time, so large exports never sit in memory."""
+        for csv_path in csv_files:
+            if not os.path.exists(csv_path):
+                self.stdout.write(self.style.ERROR(f'❌ Not found: {csv_path}'))
+                continue
+            fname = os.path.basename(csv_path)
+            try:
+                with open(csv_path, encoding='utf-8', errors='replace') as f:
+                    reader = csv.DictReader(f)
+                    if not reader.fieldnames:
+                        self.stdout.write(self.style.ERROR(f'❌ Empty CSV: {fname}'))
+                        continue
+                    reader.fieldnames = [
+                        n.strip().replace('\n', '') for n in reader.fieldnames
+                    ]
+                    lookup = build_lookup(reader.fieldnames)
+                    self.stdout.write(f'📄 {fname}: '
+                                      f'Mapped columns: {list(lookup.keys())}')
+                    count = 0
+                    for row in reader:
+                        count += 1
+                        yield row, fname, lookup
+                self.stdout.write(f'   {fname}: {count} rows.')
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'❌ Read error {fname}: {e}'))
+
+    def iter_parsed(self, csv_files, workers, chunk_size):
+        """
+        Yield (parsed, source) in input order. With workers > 1, chunks of rows
+        are cleaned in a process pool; only a few chunks are in flight at a time
+        so input is still streamed, and results are consumed in submission order,
+        so dedup and the DB writes see exactly the sequence a single process would.
+        """
+        if workers <= 1:
+            for row, source, lookup in self.iter_rows(csv_files):
+                yield parse_row(row, lookup), source
+            return
+
+        def chunks():
+            chunk = []
+            for row, source, lookup in self.iter_rows(csv_files):
+                chunk.append((row, source, lookup))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            for chunk in chunks():
+                sources = [source for _, source, _ in chunk]
+                in_flight.append((sources, pool.submit(parse_rows, [(row, lookup) for row, _, lookup in chunk])))
+                if len(in_flight) >= workers * 2:
+                    sources, future = in_flight.popleft()
+                    yield from zip(future.result(), sources)
+            while in_flight:
+                sources, future = in_flight.popleft()
+                yield from zip(future.result(), sources)
+
+    def report(self, source, parsed, result, reason=''):
+        entry = {
+            'source': source, 'name': parsed['full_name'],
+            'phone': parsed['phone'], 'result': result, 'reason': reason,
+        }
+        self.report_rows.append(entry)
+        return entry
+
+    def progress(self, rows=1):
+        # Progress indicator every 500 rows
+        before = self.batch_count
+        self.batch_count += rows
+        if self.batch_count // 500 > before // 500:
+            self.stdout.write(
+                f'  ⏳ Processed {self.batch_count} rows... '
+                f'({self.stats["created"]} created, {self.stats["errors"]} errors)')
+
+    # ── Row-by-row writes (default) ──────────────────────────────────
+
+    def update_one(self, parsed, entry):
+        try:
+            with transaction.atomic():
+                user = User.objects.get(username=parsed['phone'])
+                profile = user.tutor_profile
+                if fill_empty_fields(profile, parsed):
+                    profile.save()
+                    self.stats['updated'] += 1
+                    entry['result'] = 'UPDATED'
+                else:
+                    self.stats['skipped_existing'] += 1
+                    entry.update(result='SKIPPED_EXISTING', reason='No empty fields to update')
+        except Exception as e:
+            self.stats['errors'] += 1
+            entry.update(result='ERROR', reason=str(e)[:200])
+
+    def create_one(self, parsed, entry, email):
+        # PER-ROW SAVEPOINT: one bad row never kills the rest
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    password=self.default_password, **new_user_fields(parsed, email))
+
+                profile = user.tutor_profile
+                fill_new_profile(profile, parsed)
+                profile.save()
+
+                # Update status
+                status_obj = profile.status_record
+                status_obj.status = self.target_status
+                status_obj.save(update_fields=['status'])
+
+                # KYC for approved rows
+                if parsed['approved']:
+                    TutorKYC.objects.get_or_create(
+                        tutor=profile,
+                        defaults={'status': TutorKYC.Status.VERIFIED}
+                    )
+
+                # Track in memory to avoid duplicate attempts
+                self.existing_usernames.add(parsed['phone'])
+                self.existing_emails.add(email)
+
+            self.stats['created'] += 1
+            entry['result'] = 'CREATED'
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            entry.update(result='ERROR', reason=str(e)[:200])
+
+        self.progress()
+
+    # ── Chunked writes (--bulk) ──────────────────────────────────────
+
+    def flush_creates(self, chunk):
+        """
+        Create a chunk of tutors with one bulk_create per table. post_save does not
+        fire, so completion is computed here and the search index rebuilt explicitly.
+        If the chunk fails (e.g. a unique clash) it is retried row by row.
+        """
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(password=self.password_hash, **new_user_fields(parsed, email))
+                    for parsed, _, email in chunk
+                ])
+                profiles = []
+                for user, (parsed, _, _) in zip(users, chunk):
+                    profile = TutorProfile(user=user)
+                    fill_new_profile(profile, parsed)
+                    profile.profile_completion_percentage = profile.calculate_completion_percentage()
+                    profiles.append(profile)
+                TutorProfile.objects.bulk_create(profiles)
+                TutorStatus.objects.bulk_create([
+                    TutorStatus(tutor=profile, status=self.target_status) for profile in profiles
+                ])
+                TutorKYC.objects.bulk_create([
+                    TutorKYC(tutor=profile, status=TutorKYC.Status.VERIFIED)
+                    for profile, (parsed, _, _) in zip(profiles, chunk) if parsed['approved']
+                ])
+                rebuild_tutor_search_index(profiles, batch_size=len(profiles))
+                refresh_tutor_rankings([profile.id for profile in profiles])
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(
+                f'  ⚠️  Bulk insert of {len(chunk)} rows failed ({str(e)[:200]}); retrying row by row'))
+            for parsed, entry, email in chunk:
+                self.create_one(parsed, entry, email)
+            return
+
+        for _, entry, _ in chunk:
+            entry['result'] = 'CREATED'
+        self.stats['created'] += len(chunk)
+        self.progress(len(chunk))
+
+    def flush_updates(self, chunk):
+        """--update-existing for a chunk: one read, one bulk_update, one index rebuild."""
+        phones = [parsed['phone'] for parsed, _ in chunk]
+        profiles = {
+            profile.user.username: profile
+            for profile in TutorProfile.objects.filter(user__username__in=phones).select_related('user')
+        }
+        changed_fields = set()
+        updated = []
+        for parsed, entry in chunk:
+            profile = profiles.get(parsed['phone'])
+            if profile is None:
+                self.stats['errors'] += 1
+                entry.update(result='ERROR', reason='User has no tutor_profile.')
+                continue
+            changed = fill_empty_fields(profile, parsed)
+            if not changed:
+                self.stats['skipped_existing'] += 1
+                entry.update(result='SKIPPED_EXISTING', reason='No empty fields to update')
+                continue
+            profile.profile_completion_percentage = profile.calculate_completion_percentage()
+            changed_fields.update(changed)
+            updated.append((profile, entry))
+
+        if not updated:
+            return
+        try:
+            with transaction.atomic():
+                TutorProfile.objects.bulk_update(
+                    [profile for profile, _ in updated],
+                    sorted(changed_fields) + ['profile_completion_percentage'],
+                )
+                rebuild_tutor_search_index([profile for profile, _ in updated], batch_size=len(updated))
+                refresh_tutor_rankings([profile.id for profile, _ in updated])
+        except Exception as e:
+            for _, entry in updated:
+                self.stats['errors'] += 1
+                entry.update(result='ERROR', reason=str(e)[:200])
+            return
+        for _, entry in updated:
+            entry['result'] = 'UPDATED'
+        self.stats['updated'] += len(updated)
@@ -0,0 +1,120 @@
+"""
+Load test for job assignment under concurrent submissions.
+
+USAGE:
+  python manage.py loadtest_admin_assignment
+  python manage.py loadtest_admin_assignment --jobs 500 --workers 32 --admins 5
+  python manage.py loadtest_admin_assignment --i-know-this-is-not-production   # staging copy
+
+Creates throwaway counsellors and parents, submits jobs from a thread pool
+(each thread on its own DB connection), then checks that the counters match
+the AdminTask rows and reports the spread. Everything it created is deleted
+at the end. Run against PostgreSQL to exercise SKIP LOCKED; SQLite fails
+concurrent writers with "database is locked", so there it runs one worker.
+
+While it runs every real counsellor is parked (is_available=False), so real
+submissions would go to the throwaway counsellors and lose their assignment
+when those are deleted. It therefore refuses to run outside a test database
+unless --i-know-this-is-not-production is passed (core/loadtest.py).
+"""
+
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+
+from core.loadtest import add_production_guard, ensure_not_production
+from jobs.admin_models import AdminProfile, AdminTask
+from jobs.models import JobPost
+from jobs.utils import assign_job_to_admin
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Fire parallel job submissions at assign_job_to_admin and check the workload spread'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=300)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--admins', type=int, default=4)
+        parser.add_argument('--max-spread', type=int, default=2,
+                            help='Fail if busiest and idlest admin differ by more than this')
+        add_production_guard(parser)
+
+    def handle(self, *args, **options):
+        ensure_not_production(options)
+        if connection.vendor == 'sqlite' and options['workers'] > 1:
+            self.stdout.write(self.style.WARNING('SQLite cannot take concurrent writers; using 1 worker.'))
+            options['workers'] = 1
+        run = uuid.uuid4().hex[:8]
+        # Other counsellors would also receive jobs; park them while the test runs.
+        parked = list(AdminProfile.objects.filter(is_available=True).values_list('id', flat=True))
+        AdminProfile.objects.filter(id__in=parked).update(is_available=False)
+        try:
+            admins = self._make_admins(run, options['admins'])
+            parents = [
+                User.objects.create(username=f'loadtest_{run}_parent_{i}', role='PARENT')
+                for i in range(options['jobs'])
+            ]
+            failures = self._submit(parents, options['workers'])
+            self._report(admins, failures, options['max_spread'])
+        finally:
+            User.objects.filter(username__startswith=f'loadtest_{run}_').delete()
+            AdminProfile.objects.filter(id__in=parked).update(is_available=True)
+
+    def _make_admins(self, run, count):
+        admins = []
+        for i in range(count):
+            user = User.objects.create(username=f'loadtest_{run}_counsellor_{i}', role='COUNSELLOR')
+            AdminProfile.objects.create(user=user, department='COUNSELLOR')
+            admins.append(user)
+        return admins
+
+    def _submit_one(self, parent):
+        close_old_connections()
+        try:
+            job = JobPost.objects.create(
+                posted_by=parent, student_name='Load test', class_grade='Class 10',
+                board='CBSE', subjects=['Mathematics'], locality='Gomti Nagar',
+            )
+            assign_job_to_admin(job)
+            return None
+        except Exception as e:
+            return str(e)
+        finally:
+            connections.close_all()
+
+    def _submit(self, parents, workers):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self._submit_one, parents))
+        elapsed = time.perf_counter() - start
+        failures = [r for r in results if r]
+        self.stdout.write(f"Submitted {len(parents)} jobs with {workers} workers in {elapsed:.1f}s "
+                          f"({len(failures)} failed)")
+        return failures
+
+    def _report(self, admins, failures, max_spread):
+        counts = []
+        mismatched = []
+        for admin in admins:
+            counter = AdminProfile.objects.get(user=admin).pending_job_count
+            tasks = AdminTask.objects.filter(admin=admin, task_type='JOB_APPROVAL', status='PENDING').count()
+            counts.append(tasks)
+            self.stdout.write(f"  {admin.username}: counter={counter} tasks={tasks}")
+            if counter != tasks:
+                mismatched.append(admin.username)
+
+        spread = max(counts) - min(counts)
+        self.stdout.write(f"Spread: {spread} (min {min(counts)}, max {max(counts)})")
+        if failures:
+            raise CommandError(f"{len(failures)} submission(s) failed, first: {failures[0]}")
+        if mismatched:
+            raise CommandError(f"Counters lost updates for: {', '.join(mismatched)}")
+        if spread > max_spread:
+            raise CommandError(f"Spread {spread} exceeds --max-spread {max_spread}")
+        self.stdout.write(self.style.SUCCESS("Assignment counters consistent and balanced."))
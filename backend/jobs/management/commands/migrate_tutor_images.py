@@ -1,28 +1,219 @@
+"""
+Download tutor photos from their Google Drive links into profile_image.
 
-import requests
+USAGE:
+  python manage.py migrate_tutor_images
+  python manage.py migrate_tutor_images --workers 16 --rate 10
+  python manage.py migrate_tutor_images --force    # ignore checkpoints, re-download everything
+
+Downloads run on a bounded thread pool sharing one pooled requests.Session.
+Requests to each host are spaced to at most --rate per second, and
+connection errors, timeouts and 429/5xx responses are retried with
+exponential backoff. Each response is streamed in chunks into a spooled temp
+file that is handed to the storage backend, so a photo is never held in
+memory whole. Listing-card thumbnails (users/thumbnails.py) are built from
+the same temp file, so the photo is not read back from storage.
+
+Every processed profile gets a TutorImageMigration checkpoint. Reruns skip
+profiles that are DONE for their current URL, so an interrupted run picks up
+where it stopped and only FAILED or changed profiles are fetched again.
+"""
+
+import random
 import re
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from django.core.files import File
 from django.core.management.base import BaseCommand
-from django.core.files.base import ContentFile
-from users.models import TutorProfile
+from django.db.models import F
+from PIL import Image
+from requests.adapters import HTTPAdapter
+
+from users.models import TutorImageMigration, TutorProfile
+from users.thumbnails import build_thumbnails, delete_thumbnail_files
+
+DRIVE_DOWNLOAD_URL = 'https://docs.google.com/uc?export=download'
+CHUNK_SIZE = 32768
+SPOOL_MAX_SIZE = 1024 * 1024  # larger photos spill to disk
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    pass
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, host):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def drive_file_id(url):
+    match = re.search(r'id=([a-zA-Z0-9_-]+)', url or '') or re.search(r'/d/([a-zA-Z0-9_-]+)', url or '')
+    return match.group(1) if match else None
+
 
 class Command(BaseCommand):
     help = 'Download images from external Google Drive URLs and save to profile_image field'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Concurrent downloads (default: 8)')
+        parser.add_argument('--rate', type=float, default=5.0,
+                            help='Max requests per second to each host; 0 disables the limit (default: 5)')
+        parser.add_argument('--retries', type=int, default=3,
+                            help='Retries per file on connection errors, timeouts and 429/5xx (default: 3)')
+        parser.add_argument('--backoff', type=float, default=1.0,
+                            help='Base delay in seconds, doubled on each retry (default: 1.0)')
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument('--limit', type=int, default=None,
+                            help='Process at most this many profiles')
+        parser.add_argument('--force', action='store_true',
+                            help='Ignore checkpoints and re-download every Drive photo')
+        parser.add_argument('--base-url', default=DRIVE_DOWNLOAD_URL,
+                            help='Download endpoint (override to point at a mirror or test server)')
 
-    def download_file_from_google_drive(self, id, destination_file_handle):
-        URL = "https://docs.google.com/uc?export=download"
+    def handle(self, *args, **options):
+        self.base_url = options['base_url']
+        self.host = urlsplit(self.base_url).netloc
+        self.retries = max(options['retries'], 0)
+        self.backoff = options['backoff']
+        self.timeout = options['timeout']
+        self.limiter = HostRateLimiter(options['rate'])
+        self.field = TutorProfile._meta.get_field('profile_image')
 
-        session = requests.Session()
+        workers = max(options['workers'], 1)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
-        response = session.get(URL, params = { 'id' : id }, stream = True)
-        token = self.get_confirm_token(response)
+        profiles = TutorProfile.objects.filter(external_profile_image_url__icontains='drive.google.com')
+        if not options['force']:
+            done = TutorImageMigration.objects.filter(
+                status=TutorImageMigration.Status.DONE,
+                source_url=F('tutor__external_profile_image_url'),
+            )
+            profiles = profiles.exclude(pk__in=done.values('tutor_id'))
+        profiles = profiles.order_by('pk').values_list('pk', 'user_id', 'external_profile_image_url')
+        if options['limit']:
+            profiles = profiles[:options['limit']]
 
+        total = profiles.count()
+        self.stdout.write(f"Found {total} profiles with Google Drive images to migrate.")
+
+        self.success_count = self.fail_count = self.total_bytes = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for task in profiles.iterator():
+                pending.add(executor.submit(self.migrate_one, *task))
+                if len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self.record(future.result())
+            for future in pending:
+                self.record(future.result())
+        self.session.close()
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        processed = self.success_count + self.fail_count
+        megabytes = self.total_bytes / (1024 * 1024)
+        self.stdout.write(
+            f"{processed} profiles in {elapsed:.1f}s: {processed / elapsed:.1f} files/s, "
+            f"{megabytes:.1f} MB ({megabytes / elapsed:.2f} MB/s)"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Migration Complete. Success: {self.success_count}, Failed: {self.fail_count}"
+        ))
+
+    def migrate_one(self, profile_id, user_id, url):
+        """Runs on a worker thread: download and store one photo. No database access."""
+        result = {
+            'profile_id': profile_id, 'url': url, 'attempts': 0, 'bytes': 0,
+            'name': None, 'thumbnails': None, 'error': '',
+        }
+        file_id = drive_file_id(url)
+        if not file_id:
+            result['error'] = 'No Drive file id in URL'
+            return result
+
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+                result['bytes'] = self.download(file_id, buffer, result)
+                filename = self.field.generate_filename(None, f"tutor_{user_id}_{file_id}.jpg")
+                buffer.seek(0)
+                result['name'] = self.field.storage.save(filename, File(buffer, name=filename))
+                buffer.seek(0)
+                try:
+                    result['thumbnails'] = build_thumbnails(buffer, result['name'], self.field.storage)
+                except (OSError, ValueError, Image.DecompressionBombError):
+                    pass  # left stale; generate_tutor_thumbnails reports it
+        except Exception as e:
+            result['error'] = str(e) or e.__class__.__name__
+        return result
+
+    def download(self, file_id, buffer, result):
+        """Stream the file into ``buffer``, retrying transient failures. Returns the byte count."""
+        for attempt in range(self.retries + 1):
+            result['attempts'] = attempt + 1
+            try:
+                return self.fetch(file_id, buffer)
+            except (requests.ConnectionError, requests.Timeout, RetryableError):
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay / 2))
+
+    def fetch(self, file_id, buffer):
+        response = self.get({'id': file_id})
+        token = self.get_confirm_token(response)
         if token:
-            params = { 'id' : id, 'confirm' : token }
-            response = session.get(URL, params = params, stream = True)
+            response.close()
+            response = self.get({'id': file_id, 'confirm': token})
+
+        with response:
+            if response.status_code in RETRY_STATUSES:
+                raise RetryableError(f"HTTP {response.status_code}")
+            response.raise_for_status()
+
+            content_type = response.headers.get('content-type', '')
+            if 'image' not in content_type and 'application/octet-stream' not in content_type:
+                raise ValueError(f"Not an image ({content_type})")
 
-        self.save_response_content(response, destination_file_handle)
-        return response
+            buffer.seek(0)
+            buffer.truncate()
+            size = 0
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if chunk:  # filter out keep-alive new chunks
+                    buffer.write(chunk)
+                    size += len(chunk)
+        if not size:
+            raise ValueError("Empty file")
+        return size
+
+    def get(self, params):
+        self.limiter.wait(self.host)
+        return self.session.get(self.base_url, params=params, stream=True, timeout=self.timeout)
 
     def get_confirm_token(self, response):
         for key, value in response.cookies.items():
@@ -30,75 +221,34 @@ class Command(BaseCommand):
                 return value
         return None
 
-    def save_response_content(self, response, destination_file_handle):
-        CHUNK_SIZE = 32768
-        for chunk in response.iter_content(CHUNK_SIZE):
-            if chunk: # filter out keep-alive new chunks
-                destination_file_handle.write(chunk)
+    def record(self, result):
+        """Runs on the main thread: point the profile at the stored file and write its checkpoint."""
+        if result['name']:
+            profile = TutorProfile.objects.filter(pk=result['profile_id'])
+            thumbnails = result['thumbnails']
+            previous = profile.values_list('thumbnails', flat=True).first() if thumbnails is not None else None
+            fields = {'profile_image': result['name']}
+            if thumbnails is not None:
+                fields.update(thumbnails=thumbnails, thumbnails_source=result['name'])
+            profile.update(**fields)
+            # As in generate_tutor_thumbnails: the replaced derivatives would otherwise stay in storage
+            if thumbnails is not None:
+                delete_thumbnail_files(previous, self.field.storage, keep=thumbnails['files'])
+            status = TutorImageMigration.Status.DONE
+            self.success_count += 1
+            self.total_bytes += result['bytes']
+        else:
+            status = TutorImageMigration.Status.FAILED
+            self.fail_count += 1
+            self.stdout.write(self.style.WARNING(f"Profile {result['profile_id']}: {result['error']}"))
 
-    def handle(self, *args, **options):
-        # Filter profiles that have an external URL but no internal image yet
-        profiles = TutorProfile.objects.filter(external_profile_image_url__icontains='drive.google.com').exclude(profile_image__isnull=False).exclude(profile_image='')
-        
-        # Or if re-running, maybe just filter external_profile_image_url__isnull=False
-        # Let's target only those without profile_image first to save time, or just all.
-        # Given previous failure, some might be empty files.
-        
-        # Re-fetch query
-        profiles = TutorProfile.objects.filter(external_profile_image_url__icontains='drive.google.com')
-        
-        total = profiles.count()
-        self.stdout.write(f"Found {total} profiles with Google Drive images.")
-        
-        success_count = 0
-        fail_count = 0
-        
-        for profile in profiles:
-            url = profile.external_profile_image_url
-            if not url: 
-                continue
-                
-            # Extract File ID
-            file_id = None
-            match = re.search(r'id=([a-zA-Z0-9_-]+)', url)
-            if match:
-                file_id = match.group(1)
-            else:
-                match = re.search(r'/d/([a-zA-Z0-9_-]+)', url)
-                if match:
-                    file_id = match.group(1)
-            
-            if not file_id:
-                fail_count += 1
-                continue
-            
-            try:
-                self.stdout.write(f"Downloading for {profile.full_name} ({file_id})...")
-                
-                # Use a temporary buffer or file
-                # Since ContentFile expects content, we can download to memory (BytesIO)
-                # But for large files, temp file is better. 
-                # Django ContentFile accepts bytes or open file.
-                
-                import io
-                buffer = io.BytesIO()
-                
-                response = self.download_file_from_google_drive(file_id, buffer)
-                
-                # Verify content type
-                content_type = response.headers.get('content-type', '')
-                if 'image' not in content_type and 'application/octet-stream' not in content_type:
-                     self.stdout.write(self.style.WARNING(f"Not an image ({content_type}). Skipping."))
-                     fail_count += 1
-                     continue
-
-                filename = f"tutor_{profile.user.id}_{file_id}.jpg"
-                buffer.seek(0)
-                profile.profile_image.save(filename, ContentFile(buffer.read()), save=True)
-                
-                success_count += 1
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"Error {str(e)}"))
-                fail_count += 1
-                
-        self.stdout.write(self.style.SUCCESS(f"Migration Complete. Success: {success_count}, Failed: {fail_count}"))
+        TutorImageMigration.objects.update_or_create(
+            tutor_id=result['profile_id'],
+            defaults={
+                'source_url': result['url'],
+                'status': status,
+                'attempts': result['attempts'],
+                'bytes_downloaded': result['bytes'],
+                'error': result['error'],
+            },
+        )
@@ -4,13 +4,17 @@ Management command: notify_demo_feedback
 Finds completed demos where 1 hour has passed since the tutor marked
 the demo as completed, and sends a notification to the parent asking
 for their review and whether they want to finalize the tutor.
+
+Works in batches (--batch-size): each batch costs one SELECT, one bulk
+notification INSERT and one flag UPDATE, however many applications it holds.
 """
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 
 from jobs.models import Application
-from jobs.utils import send_notification
+from jobs.utils import send_notifications_bulk
 
 import logging
 logger = logging.getLogger(__name__)
@@ -19,8 +23,13 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = 'Send delayed feedback notifications to parents after demo completion (1 hour delay).'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Applications handled per transaction: one notification INSERT and one flag UPDATE each')
+
     def handle(self, *args, **options):
         one_hour_ago = timezone.now() - timedelta(hours=1)
+        batch_size = options['batch_size']
 
         # Find applications where:
         # - demo is COMPLETED
@@ -33,10 +42,24 @@ class Command(BaseCommand):
             demo_completed_at__lte=one_hour_ago,
             parent_notified_for_review=False,
             is_confirmed=False,
-        ).select_related('job', 'tutor')
+        ).select_related('job__parent', 'job__posted_by', 'tutor').order_by('id')
 
         count = 0
-        for app in pending_reviews:
+        last_id = 0
+        while True:
+            # Keyset by id: skipped rows stay unflagged and must not be fetched again
+            batch = list(pending_reviews.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            count += self.notify_batch(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully sent {count} feedback notification(s).'))
+
+    def notify_batch(self, applications):
+        notifications = []
+        notified = []
+        for app in applications:
             job = app.job
             parent_user = job.parent or job.posted_by
 
@@ -46,21 +69,24 @@ class Command(BaseCommand):
 
             tutor_name = app.tutor.full_name if app.tutor else 'Your tutor'
 
-            send_notification(
-                user=parent_user,
-                title='How was the demo? Share your feedback!',
-                message=(
+            notifications.append({
+                'user': parent_user,
+                'title': 'How was the demo? Share your feedback!',
+                'message': (
                     f"{tutor_name} completed a demo for {job.class_grade} ({job.subjects}). "
                     f"Please review the demo and let us know if you'd like to finalize this tutor "
                     f"or request a different one. Visit your dashboard to take action."
                 ),
-                notification_type='SYSTEM',
-                related_job=job,
-            )
-
+                'notification_type': 'SYSTEM',
+                'related_job': job,
+            })
             app.parent_notified_for_review = True
-            app.save(update_fields=['parent_notified_for_review'])
-            count += 1
-            logger.info(f"Sent feedback notification for application {app.id} to {parent_user.username}")
+            notified.append(app)
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully sent {count} feedback notification(s).'))
+        if notified:
+            # Flags and notifications commit together, so a crash cannot notify twice or not at all
+            with transaction.atomic():
+                send_notifications_bulk(notifications, batch_size=len(notifications))
+                Application.objects.bulk_update(notified, ['parent_notified_for_review'])
+            logger.info(f"Sent {len(notified)} feedback notification(s) up to application {notified[-1].id}")
+        return len(notified)
@@ -0,0 +1,14 @@
+"""Recompute the DailyMetric rollup from JobPost, Application and wallet Transaction rows."""
+
+from django.core.management.base import BaseCommand
+
+from jobs.rollup import rebuild_daily_metrics
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily metrics rollup used by the CRM and analytics dashboards'
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding daily metrics...")
+        total = rebuild_daily_metrics()
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} rollup row(s) written."))
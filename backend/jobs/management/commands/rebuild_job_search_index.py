@@ -0,0 +1,22 @@
+"""Backfill the normalized job subject search index (and full-text vectors on PostgreSQL)."""
+
+from django.core.management.base import BaseCommand
+
+from jobs.models import JobPost
+from jobs.search_index import rebuild_job_search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the normalized job subject search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of jobs to re-index per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        jobs = JobPost.objects.only('id', 'subjects', 'student_name', 'class_grade', 'locality').order_by('id')
+
+        self.stdout.write(f"Indexing {jobs.count()} job post(s)...")
+        total = rebuild_job_search_index(jobs.iterator(chunk_size=batch_size), batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} job post(s) indexed."))
@@ -0,0 +1,21 @@
+"""Recompute AdminProfile workload counters from open AdminTask rows."""
+
+from django.core.management.base import BaseCommand
+
+from jobs.utils import reconcile_workload_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute pending_job_count / pending_kyc_count from open AdminTasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted counters without fixing them')
+
+    def handle(self, *args, **options):
+        changes = reconcile_workload_counters(dry_run=options['dry_run'])
+        for username, counter, old, new in changes:
+            self.stdout.write(f"{username}: {counter} {old} -> {new}")
+
+        verb = 'would be fixed' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f"Done. {len(changes)} counter(s) {verb}."))
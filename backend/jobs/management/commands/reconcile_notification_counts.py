@@ -0,0 +1,20 @@
+"""Recompute the denormalized unread notification counters from the Notification table."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.notification_counts import recount_unread
+
+
+class Command(BaseCommand):
+    help = 'Rebuild per-user unread notification counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, action='append', default=None,
+                            help='Only recount the given user id (repeatable)')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Recounting unread notifications...")
+        with transaction.atomic():
+            total = recount_unread(options['user_id'])
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} counter(s) written."))
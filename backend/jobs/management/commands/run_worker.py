@@ -0,0 +1,79 @@
+"""
+Run queued BackgroundTasks (jobs/tasks.py): emails, OTP sends and other
+third-party calls moved out of the request cycle.
+
+USAGE:
+  python manage.py run_worker
+  python manage.py run_worker --batch-size 20 --poll-interval 2
+  python manage.py run_worker --once      # drain what is due now, then exit (cron / tests)
+
+Several workers may run at once on PostgreSQL; due rows are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED. Each worker also checks for tasks left
+RUNNING by a dead worker every --stale-check-interval seconds, so the
+survivors pick them up. SIGTERM/SIGINT finish the current batch before exiting.
+"""
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.tasks import default_worker_id, purge_finished_tasks, requeue_stale_tasks, run_pending
+
+
+class Command(BaseCommand):
+    help = 'Process queued background tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Tasks claimed per round (default: 10)')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when nothing is due (default: 1)')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no task is due instead of polling')
+        parser.add_argument('--stale-check-interval', type=float, default=60.0,
+                            help='Seconds between checks for tasks abandoned by a dead worker (default: 60)')
+        parser.add_argument('--purge-after-days', type=int, default=7,
+                            help='Delete DONE tasks older than this on startup; 0 keeps them (default: 7)')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        if not options['once']:
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+
+        worker_id = default_worker_id()
+        self.recover_stale_tasks()
+        next_stale_check = time.monotonic() + options['stale_check_interval']
+        if options['purge_after_days']:
+            purge_finished_tasks(timedelta(days=options['purge_after_days']))
+
+        self.stdout.write(f"Worker {worker_id} started.")
+        total_ok = total_failed = 0
+        while not self.stopping:
+            close_old_connections()
+            if time.monotonic() >= next_stale_check:
+                self.recover_stale_tasks()
+                next_stale_check = time.monotonic() + options['stale_check_interval']
+            succeeded, failed = run_pending(worker_id, options['batch_size'])
+            total_ok += succeeded
+            total_failed += failed
+            if not succeeded and not failed:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Worker {worker_id} stopped. Succeeded: {total_ok}, Failed attempts: {total_failed}"
+        ))
+
+    def recover_stale_tasks(self):
+        requeued, failed = requeue_stale_tasks()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"Requeued {requeued} task(s) abandoned by a dead worker."))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"Marked {failed} abandoned task(s) FAILED: no attempts left."))
+
+    def stop(self, signum, frame):
+        self.stopping = True
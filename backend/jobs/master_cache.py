@@ -0,0 +1,59 @@
+"""
+Cache for the public master data payload (Subject, Board, ClassLevel, Location).
+
+The payload is stored in Django's default cache under a version number. Any
+save/delete of a master model bumps the version (see jobs/signals.py), so the
+next request rebuilds it. Works with any cache backend; with the per-process
+local-memory cache, MASTER_DATA_CACHE_TIMEOUT bounds how long another worker
+can serve the previous version.
+
+Each cached payload carries a content hash used as its ETag.
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+
+MASTER_DATA_VERSION_KEY = 'master_data:version'
+MASTER_DATA_CACHE_TIMEOUT = 60 * 10
+
+
+def get_master_data_version():
+    version = cache.get(MASTER_DATA_VERSION_KEY)
+    if version is None:
+        # Time-based so a cache flush never reuses a version from before the flush.
+        cache.add(MASTER_DATA_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(MASTER_DATA_VERSION_KEY)
+    return version
+
+
+def bump_master_data_version():
+    """Invalidate the cached payload. Called on commit after any master data change."""
+    cache.set(MASTER_DATA_VERSION_KEY, time.time_ns(), None)
+
+
+def build_master_data():
+    from .master_serializers import BoardSerializer, ClassLevelSerializer, LocationSerializer, SubjectSerializer
+    from .models import Board, ClassLevel, Location, Subject
+
+    locations = Location.objects.filter(is_active=True).prefetch_related('localities')
+    return {
+        'subjects': SubjectSerializer(Subject.objects.filter(is_active=True), many=True).data,
+        'boards': BoardSerializer(Board.objects.filter(is_active=True), many=True).data,
+        'class_levels': ClassLevelSerializer(ClassLevel.objects.filter(is_active=True), many=True).data,
+        'locations': LocationSerializer(locations, many=True).data,
+    }
+
+
+def get_master_data():
+    """Return (data, etag) for the current version, building and caching it on a miss."""
+    key = f'master_data:payload:{get_master_data_version()}'
+    entry = cache.get(key)
+    if entry is None:
+        data = json.loads(json.dumps(build_master_data(), cls=DjangoJSONEncoder))
+        body = json.dumps(data, sort_keys=True)
+        entry = {'data': data, 'etag': '"%s"' % hashlib.md5(body.encode()).hexdigest()}
+        cache.set(key, entry, MASTER_DATA_CACHE_TIMEOUT)
+    return entry['data'], entry['etag']
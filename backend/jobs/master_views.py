@@ -5,8 +5,10 @@ Handles Subject, Board, ClassLevel, Location management
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from django.utils.http import parse_etags
 from .models import Subject, Board, ClassLevel, Location, Locality
 from .master_serializers import SubjectSerializer, BoardSerializer, ClassLevelSerializer, LocationSerializer
+from .master_cache import get_master_data
 from users.admin_views import IsSuperAdmin
 
 
@@ -16,21 +18,19 @@ class PublicMasterDataView(APIView):
     """
     Public endpoint to get all active master data for dropdowns.
     Used by JobWizard, Signup, etc.
+    Served from cache (see master_cache.py) with an ETag so browsers can revalidate with a 304.
     """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        subjects = Subject.objects.filter(is_active=True)
-        boards = Board.objects.filter(is_active=True)
-        class_levels = ClassLevel.objects.filter(is_active=True)
-        locations = Location.objects.filter(is_active=True)
-
-        return Response({
-            'subjects': SubjectSerializer(subjects, many=True).data,
-            'boards': BoardSerializer(boards, many=True).data,
-            'class_levels': ClassLevelSerializer(class_levels, many=True).data,
-            'locations': LocationSerializer(locations, many=True).data,
-        })
+        data, etag = get_master_data()
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+
+        if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+        if '*' in if_none_match or etag in if_none_match or f'W/{etag}' in if_none_match:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        return Response(data, headers=headers)
 
 
 # ==================== SUPERADMIN CRUD ENDPOINTS ====================
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_search_index(apps, schema_editor):
+    from jobs.utils import normalize_search_key, subject_index_keys
+
+    JobPost = apps.get_model('jobs', 'JobPost')
+    JobSubjectIndex = apps.get_model('jobs', 'JobSubjectIndex')
+    Subject = apps.get_model('jobs', 'Subject')
+
+    subject_map = {normalize_search_key(name): pk for pk, name in Subject.objects.values_list('id', 'name')}
+
+    rows = []
+    for job in JobPost.objects.only('id', 'subjects').iterator(chunk_size=1000):
+        keys = set()
+        for value in job.subjects if isinstance(job.subjects, list) else [job.subjects]:
+            keys.update(subject_index_keys(value))
+        rows.extend(JobSubjectIndex(job_id=job.id, key=key, subject_id=subject_map.get(key)) for key in keys)
+    JobSubjectIndex.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_add_payment_completion_to_application'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobSubjectIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=150)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_index', to='jobs.jobpost')),
+                ('subject', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='job_index', to='jobs.subject')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'job'], name='job_subject_key_idx')],
+                'unique_together': {('job', 'key')},
+            },
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:33
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from core.fulltext import update_search_vector
+    from jobs.search_index import job_search_parts
+
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS job_search_vector_gin ON jobs_jobpost USING gin (search_vector)'
+    )
+    JobPost = apps.get_model('jobs', 'JobPost')
+    jobs = JobPost.objects.only('id', 'student_name', 'subjects', 'class_grade', 'locality')
+    for job in jobs.iterator(chunk_size=1000):
+        parts = job_search_parts(job.student_name, job.subjects, job.class_grade, job.locality)
+        update_search_vector(JobPost, job.id, parts, using=schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS job_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_job_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobpost',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        # GIN indexes are PostgreSQL-only, so build it (and backfill the vectors) outside the model state.
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
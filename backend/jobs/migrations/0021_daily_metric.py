@@ -0,0 +1,44 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+def backfill_daily_metrics(apps, schema_editor):
+    from jobs.rollup import rollup_rows
+
+    DailyMetric = apps.get_model('jobs', 'DailyMetric')
+    rows = rollup_rows(
+        apps.get_model('jobs', 'JobPost'),
+        apps.get_model('jobs', 'Application'),
+        apps.get_model('wallet', 'Transaction'),
+        metric_model=DailyMetric,
+    )
+    DailyMetric.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0020_search_vector'),
+        ('wallet', '0004_alter_subscriptionpackage_target_role_paymentrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('kind', models.CharField(choices=[('JOB', 'Job posts'), ('APPLICATION', 'Applications'), ('CREDIT', 'Wallet credits')], max_length=20)),
+                ('status', models.CharField(blank=True, max_length=30)),
+                ('admin_id', models.PositiveIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'day'], name='daily_metric_kind_day_idx')],
+                'unique_together': {('day', 'kind', 'status', 'admin_id')},
+            },
+        ),
+        migrations.RunPython(backfill_daily_metrics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_unread_counts(apps, schema_editor):
+    Notification = apps.get_model('jobs', 'Notification')
+    NotificationCounter = apps.get_model('jobs', 'NotificationCounter')
+    counts = (
+        Notification.objects.filter(is_read=False).order_by()
+        .values('user_id').annotate(unread=models.Count('id')).values_list('user_id', 'unread')
+    )
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id, unread=unread) for user_id, unread in counts], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0022_tutor_thumbnails'),
+        ('jobs', '0023_background_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='notification_user_unread_idx'),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0025_archive_tables'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='sensitive',
+            field=models.BooleanField(default=False),
+        ),
+    ]
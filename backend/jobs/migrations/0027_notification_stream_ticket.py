@@ -0,0 +1,24 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jobs', '0026_background_task_sensitive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationStreamTicket',
+            fields=[
+                ('key', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_stream_tickets', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
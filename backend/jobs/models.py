@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth import get_user_model
 
@@ -49,9 +50,31 @@ class JobPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search over student name, subjects, grade and locality (PostgreSQL only,
+    # see core/fulltext.py). The GIN index is created in migration 0020.
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    class Meta:
+        # Keyset pagination order, see core/pagination.py
+        indexes = [models.Index(fields=['created_at', 'id'], name='job_created_id_idx')]
+
     def __str__(self):
         return f"{self.student_name} ({self.class_grade}) - {self.locality}"
 
+
+class JobSubjectIndex(models.Model):
+    """Normalized job↔subject rows so job search is an indexed join instead of a JSON scan."""
+    job = models.ForeignKey(JobPost, on_delete=models.CASCADE, related_name='subject_index')
+    key = models.CharField(max_length=150)  # canonical, lower-cased subject name
+    subject = models.ForeignKey('Subject', on_delete=models.SET_NULL, null=True, blank=True, related_name='job_index')
+
+    class Meta:
+        unique_together = ('job', 'key')
+        indexes = [models.Index(fields=['key', 'job'], name='job_subject_key_idx')]
+
+    def __str__(self):
+        return f"{self.job_id}: {self.key}"
+
 class Application(models.Model):
     STATUS_CHOICES = (
         ('APPLIED', 'Applied'),
@@ -107,6 +130,7 @@ class Application(models.Model):
 
     class Meta:
         unique_together = ('job', 'tutor') # One application per job per tutor
+        indexes = [models.Index(fields=['created_at', 'id'], name='application_created_id_idx')]
 
     def __str__(self):
         return f"App by {self.tutor.user.username} for {self.job.student_name}"
@@ -227,8 +251,10 @@ class Locality(models.Model):
 
 
 # Import additional models
-from .admin_models import AdminTask, Notification, AdminProfile
+from .admin_models import AdminTask, Notification, NotificationCounter, NotificationStreamTicket, AdminProfile
 from .followup_models import FollowUp
+from .task_models import BackgroundTask
+from .archive_models import AdminTaskArchive, NotificationArchive
 
 
 class InstituteJob(models.Model):
@@ -258,3 +284,30 @@ class InstituteJob(models.Model):
 
     def __str__(self):
         return f"{self.title} at {self.institution.institution_profile.institution_name if hasattr(self.institution, 'institution_profile') else self.institution.username}"
+
+
+class DailyMetric(models.Model):
+    """
+    Materialized per-day counts for the CRM and analytics dashboards (see jobs/rollup.py).
+    JOB/APPLICATION rows count records created on ``day`` by their *current* status,
+    so summing over days gives the live pipeline and filtering by day gives time series.
+    """
+    KIND_CHOICES = (
+        ('JOB', 'Job posts'),
+        ('APPLICATION', 'Applications'),
+        ('CREDIT', 'Wallet credits'),
+    )
+
+    day = models.DateField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    status = models.CharField(max_length=30, blank=True)  # '' for CREDIT
+    admin_id = models.PositiveIntegerField(default=0)  # JobPost.assigned_admin, 0 = unassigned / not applicable
+    count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # CREDIT only
+
+    class Meta:
+        unique_together = ('day', 'kind', 'status', 'admin_id')
+        indexes = [models.Index(fields=['kind', 'day'], name='daily_metric_kind_day_idx')]
+
+    def __str__(self):
+        return f"{self.day} {self.kind} {self.status}: {self.count}"
@@ -0,0 +1,79 @@
+"""
+Denormalized unread notification counts.
+
+NotificationCounter.unread mirrors ``COUNT(*)`` of a user's unread
+notifications, so the badge (the unread-count endpoint and the SSE stream)
+reads one row instead of counting on every poll. Signals in jobs/signals.py
+adjust it when a notification is created, read or deleted.
+send_notifications_bulk and BulkMarkNotificationsReadView bypass signals, so
+they adjust it themselves. ``recount_unread`` (and the
+reconcile_notification_counts command) recompute it from the source table to
+repair drift from other ``QuerySet.update()`` calls.
+"""
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .admin_models import Notification, NotificationCounter
+
+# Attribute set by post_init holding whether a notification was loaded as read
+READ_STATE_ATTR = '_loaded_is_read'
+
+
+def adjust_unread_counts(deltas):
+    """
+    Apply ``{user_id: delta}`` in two queries whatever the number of users: an
+    INSERT that creates missing counters and one UPDATE for all of them.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id) for user_id in deltas], ignore_conflicts=True,
+    )
+    if len(deltas) == 1:
+        delta = next(iter(deltas.values()))
+    else:
+        delta = Case(
+            *[When(user_id=user_id, then=Value(d)) for user_id, d in deltas.items()],
+            default=Value(0), output_field=IntegerField(),
+        )
+    # Clamped: drift must not trip the PositiveIntegerField check
+    NotificationCounter.objects.filter(user_id__in=deltas).update(unread=Greatest(F('unread') + delta, 0))
+
+
+def unread_count(user):
+    return NotificationCounter.objects.filter(user=user).values_list('unread', flat=True).first() or 0
+
+
+def remember_read_state(instance):
+    setattr(instance, READ_STATE_ATTR, vars(instance).get('is_read') if instance.pk else None)
+
+
+def read_state_changed(instance, created):
+    """Unread delta (+1, -1 or 0) for a notification that was just saved."""
+    if created:
+        return 0 if instance.is_read else 1
+    was_read = getattr(instance, READ_STATE_ATTR, None)
+    if was_read is None or was_read == instance.is_read:
+        return 0
+    return -1 if instance.is_read else 1
+
+
+def recount_unread(user_ids=None):
+    """Recompute counters from Notification (call inside a transaction). Returns how many were written."""
+    notifications = Notification.objects.order_by()
+    if user_ids is not None:
+        notifications = notifications.filter(user_id__in=user_ids)
+    counts = dict(
+        notifications.values('user_id').annotate(unread=Count('id', filter=Q(is_read=False)))
+        .values_list('user_id', 'unread')
+    )
+    if user_ids is not None:
+        counts = {user_id: counts.get(user_id, 0) for user_id in user_ids}
+        NotificationCounter.objects.filter(user_id__in=user_ids).delete()
+    else:
+        NotificationCounter.objects.all().delete()
+    NotificationCounter.objects.bulk_create(
+        [NotificationCounter(user_id=user_id, unread=unread) for user_id, unread in counts.items()], batch_size=1000,
+    )
+    return len(counts)
@@ -0,0 +1,176 @@
+"""
+Pub/sub behind the notification SSE endpoint (NotificationStreamView).
+
+Publishers (the Notification post_save signal, send_notifications_bulk and
+the mark-read views) call ``publish_notifications`` / ``publish_unread_delta``.
+Events are released once the surrounding transaction commits:
+
+  - On PostgreSQL each event is sent with ``pg_notify``. One listener thread
+    per server process (started with its first subscriber) hands the events
+    to local subscribers. A notification created by any gunicorn worker, or by
+    run_worker, therefore reaches streams held open by any other process.
+  - Elsewhere (SQLite in development and tests) events go straight to the
+    in-process broker, which only reaches streams in the same process.
+
+Payloads carry ids, not rows (pg_notify is capped at 8000 bytes), so each
+stream loads and serialises the notification itself.
+
+EventSource cannot send an Authorization header, and a token in the query
+string ends up in server and proxy access logs. Clients therefore trade their
+access token for a NotificationStreamTicket (``issue_stream_ticket``), which
+opens one stream within TICKET_SECONDS and is deleted when it is redeemed.
+"""
+import asyncio
+import json
+import logging
+import secrets
+import select
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = 'thtpro_notifications'
+SUBSCRIBER_QUEUE_SIZE = 100
+TICKET_SECONDS = 30
+
+
+class NotificationBroker:
+    """Per-process fan-out from user ids to the asyncio queues of their open streams."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = defaultdict(set)  # user_id -> {(loop, queue)}
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[user_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self.lock:
+            self.subscribers[user_id] = {entry for entry in self.subscribers[user_id] if entry[1] is not queue}
+            if not self.subscribers[user_id]:
+                del self.subscribers[user_id]
+
+    def dispatch(self, user_id, event):
+        """Thread-safe: queue ``event`` for every stream of ``user_id`` in this process."""
+        with self.lock:
+            targets = list(self.subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(_put_nowait, queue, event)
+
+
+def _put_nowait(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # The client is not reading; it re-syncs its unread count when it reconnects
+        pass
+
+
+broker = NotificationBroker()
+
+
+def _uses_pg_notify():
+    return connection.vendor == 'postgresql'
+
+
+def _send(events):
+    if _uses_pg_notify():
+        payloads = [json.dumps({'user': user_id, **event}) for user_id, event in events]
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload', [PG_CHANNEL, payloads])
+    else:
+        for user_id, event in events:
+            broker.dispatch(user_id, event)
+
+
+def publish(events):
+    """Deliver (user_id, event) pairs to the users' streams once the current transaction commits."""
+    events = list(events)
+    if events:
+        transaction.on_commit(lambda: _send(events))
+
+
+def publish_notifications(notifications):
+    publish((notification.user_id, {'type': 'notification', 'id': notification.id}) for notification in notifications)
+
+
+def publish_unread_delta(user_id, delta):
+    if delta:
+        publish([(user_id, {'type': 'unread', 'delta': delta})])
+
+
+def issue_stream_ticket(user):
+    """Create a single-use stream ticket for ``user`` and return its key."""
+    from .admin_models import NotificationStreamTicket
+
+    # Expired tickets are never redeemed; clear them out as new ones are issued
+    NotificationStreamTicket.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=TICKET_SECONDS)).delete()
+    return NotificationStreamTicket.objects.create(key=secrets.token_urlsafe(32), user=user).key
+
+
+def redeem_stream_ticket(key):
+    """Consume the ticket ``key``; returns its active user, or None if it is unknown, expired or already used."""
+    from .admin_models import NotificationStreamTicket
+
+    cutoff = timezone.now() - timedelta(seconds=TICKET_SECONDS)
+    ticket = NotificationStreamTicket.objects.select_related('user').filter(key=key, created_at__gte=cutoff).first()
+    # The delete decides between two concurrent redemptions of the same key
+    if ticket is None or not NotificationStreamTicket.objects.filter(pk=ticket.pk).delete()[0]:
+        return None
+    return ticket.user if ticket.user.is_active else None
+
+
+class PostgresListener(threading.Thread):
+    """LISTENs on PG_CHANNEL on a dedicated connection and feeds the local broker."""
+
+    def __init__(self):
+        super().__init__(name='notification-listener', daemon=True)
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:  # noqa: BLE001 - reconnect on any driver/network error
+                logger.exception('Notification listener lost its connection; reconnecting')
+                time.sleep(5)
+
+    def listen(self):
+        wrapper = connections['default']
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN {PG_CHANNEL}')
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    event = json.loads(conn.notifies.pop(0).payload)
+                    broker.dispatch(event.pop('user'), event)
+        finally:
+            conn.close()
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """Start this process's LISTEN thread on first use (PostgreSQL only)."""
+    global _listener
+    if not _uses_pg_notify():
+        return
+    with _listener_lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = PostgresListener()
+            _listener.start()
@@ -1,22 +1,44 @@
 """
-Notification views: list and mark-as-read.
+Notification views: list, mark-as-read (single and bulk), unread count and the live SSE stream.
 """
-from rest_framework import generics, permissions
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 from django.shortcuts import get_object_or_404
 
+from core.archive import IncludeArchivedMixin
+from core.pagination import KeysetPagination
+
 from .admin_models import Notification
+from .archive_models import NotificationArchive
+from .notification_counts import adjust_unread_counts, unread_count
+from .notification_stream import (
+    TICKET_SECONDS, broker, ensure_listener, issue_stream_ticket, publish_unread_delta, redeem_stream_ticket,
+)
 from .serializers import NotificationSerializer
 
 
-class NotificationListView(generics.ListAPIView):
-    """List all notifications for the current user."""
+class NotificationListView(IncludeArchivedMixin, generics.ListAPIView):
+    """List all notifications for the current user (``?include_archived=1`` adds archived ones)."""
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    archive_model = NotificationArchive
+
+    def scope(self, queryset):
+        return queryset.filter(user=self.request.user)
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by('-created_at')
+        return self.scope(Notification.objects.all()).order_by('-created_at')
 
 
 class MarkNotificationReadView(APIView):
@@ -28,3 +50,131 @@ class MarkNotificationReadView(APIView):
         notification.is_read = True
         notification.save()
         return Response({"message": "Notification marked as read"})
+
+
+class BulkMarkNotificationsReadView(APIView):
+    """
+    Mark several notifications (``mark-read/?ids=1,2,3`` or ``{"ids": [...]}``)
+    or all of them (``mark-all-read/``) as read with a single UPDATE.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    mark_all = False
+
+    def post(self, request):
+        unread = Notification.objects.filter(user=request.user, is_read=False)
+        if not self.mark_all:
+            ids = request.data.get('ids') if hasattr(request.data, 'get') else None
+            if ids is None:
+                ids = request.query_params.get('ids', '')
+            if isinstance(ids, str):
+                ids = [part for part in ids.split(',') if part.strip()]
+            try:
+                ids = [int(pk) for pk in ids]
+            except (TypeError, ValueError):
+                return Response({"error": "ids must be a list of notification ids"}, status=status.HTTP_400_BAD_REQUEST)
+            if not ids:
+                return Response({"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+            unread = unread.filter(id__in=ids)
+
+        # QuerySet.update() skips signals, so adjust the counter and streams here
+        updated = unread.update(is_read=True)
+        adjust_unread_counts({request.user.id: -updated})
+        publish_unread_delta(request.user.id, -updated)
+        return Response({"updated": updated, "unread_count": unread_count(request.user)})
+
+
+class UnreadNotificationCountView(APIView):
+    """Unread badge count, read from the denormalized NotificationCounter."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response({"unread_count": unread_count(request.user)})
+
+
+class NotificationStreamTicketView(APIView):
+    """Single-use ticket for opening NotificationStreamView from an EventSource."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        return Response({"ticket": issue_stream_ticket(request.user), "expires_in": TICKET_SECONDS},
+                        status=status.HTTP_201_CREATED)
+
+
+class NotificationStreamView(View):
+    """
+    Server-Sent Events feed of the current user's notifications; replaces polling
+    NotificationListView. Needs the ASGI app (core.asgi).
+
+    EventSource cannot set headers, so it authenticates with ``?ticket=``, a
+    single-use ticket from NotificationStreamTicketView; other clients may send
+    the usual ``Authorization: Bearer`` header. Events:
+      event: unread        data: {"unread_count": N}                  (once, on connect)
+      event: notification  data: {"notification": {...}, "unread_delta": 1}
+      event: unread        data: {"unread_delta": -N}                 (after mark-read)
+    A comment line is sent every KEEPALIVE_SECONDS so proxies keep the connection open.
+
+    Django 4.2 does not notice a client disconnecting mid-stream, so a stream
+    for a closed tab would otherwise stay subscribed for the life of the
+    worker. Streams end after MAX_STREAM_SECONDS instead and EventSource
+    reconnects by itself, getting a fresh unread count.
+    """
+    KEEPALIVE_SECONDS = 25
+    MAX_STREAM_SECONDS = 300
+
+    async def get(self, request):
+        user = await sync_to_async(self.authenticate)(request)
+        if user is None:
+            return HttpResponse(status=401)
+
+        ensure_listener()
+        response = StreamingHttpResponse(self.events(user), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # stop nginx from buffering the stream
+        return response
+
+    def authenticate(self, request):
+        auth = JWTAuthentication()
+        header = auth.get_header(request)
+        if header is None:
+            key = request.GET.get('ticket')
+            return redeem_stream_ticket(key) if key else None
+        raw_token = auth.get_raw_token(header)
+        if not raw_token:
+            return None
+        try:
+            return auth.get_user(auth.get_validated_token(raw_token))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+
+    async def events(self, user):
+        # Subscribed inside the generator so the finally clause always pairs with it
+        queue = broker.subscribe(user.id)
+        try:
+            unread = await sync_to_async(unread_count)(user)
+            yield self.format('unread', {'unread_count': unread})
+            deadline = time.monotonic() + self.MAX_STREAM_SECONDS
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=min(self.KEEPALIVE_SECONDS, remaining))
+                except asyncio.TimeoutError:
+                    if time.monotonic() < deadline:
+                        yield ': keep-alive\n\n'
+                    continue
+                if event['type'] == 'unread':
+                    yield self.format('unread', {'unread_delta': event['delta']})
+                    continue
+                data = await sync_to_async(self.serialize)(user, event['id'])
+                if data is not None:
+                    yield self.format('notification', {'notification': data, 'unread_delta': 1})
+        finally:
+            broker.unsubscribe(user.id, queue)
+
+    def serialize(self, user, notification_id):
+        notification = Notification.objects.filter(pk=notification_id, user=user).first()
+        return NotificationSerializer(notification).data if notification else None
+
+    def format(self, event, data):
+        return f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
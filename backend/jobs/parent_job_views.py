@@ -8,15 +8,20 @@ from rest_framework import generics, permissions, status, viewsets
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.utils import timezone
-from django.db.models import Q, Case, When, Value, IntegerField, CharField
-from django.db.models.functions import Cast
+from django.db.models import Q
 
 from .models import JobPost, Application, InstituteJob
 from .serializers import JobPostSerializer, InstituteJobSerializer
-from .utils import filter_by_subject, send_notification
-from users.models import TutorProfile, User
+from .utils import send_notification, send_notifications_bulk
+from .prefetch import prefetch_jobs
+from .rollup import update_with_rollup
+from .search_index import filter_jobs_by_subject, job_subject_text_q, search_jobs
+from users.models import User
+from users.ranking import top_ranked_tutors
 from users.utils import get_tutor_image_url
+from wallet.ledger import InsufficientFunds
 from wallet.models import Wallet
+from wallet.snapshot import get_wallet_snapshot
 from decimal import Decimal
 
 import logging
@@ -32,9 +37,10 @@ def _deduct_teacher_rejection_credit(application):
     try:
         tutor_user = application.tutor.user
         wallet, _ = Wallet.objects.get_or_create(user=tutor_user)
-        if wallet.balance >= Decimal('1'):
-            wallet.debit(Decimal('1'), f'Rejection credit used: {application.job.class_grade}')
-            logger.info(f'Deducted 1 rejection credit from {tutor_user.username}')
+        wallet.debit(Decimal('1'), f'Rejection credit used: {application.job.class_grade}')
+        logger.info(f'Deducted 1 rejection credit from {tutor_user.username}')
+    except InsufficientFunds:
+        pass  # no credit left to take
     except Exception as exc:
         logger.error(f'Error deducting rejection credit: {exc}')
 
@@ -47,9 +53,7 @@ class ParentJobListView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
-        return JobPost.objects.filter(
-            status='APPROVED'
-        ).select_related('posted_by', 'assigned_admin').prefetch_related('applications', 'applications__tutor', 'applications__tutor__user').order_by('-created_at')
+        return prefetch_jobs(JobPost.objects.filter(status='APPROVED'), self.request.user).order_by('-created_at')
 
 
 class JobDetailView(generics.RetrieveAPIView):
@@ -60,10 +64,10 @@ class JobDetailView(generics.RetrieveAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return JobPost.objects.filter(
+            return prefetch_jobs(JobPost.objects.filter(
                 Q(status='APPROVED') | Q(posted_by=user) | Q(parent=user)
-            ).prefetch_related('applications', 'applications__tutor', 'applications__tutor__user')
-        return JobPost.objects.filter(status='APPROVED').prefetch_related('applications', 'applications__tutor', 'applications__tutor__user')
+            ), user)
+        return prefetch_jobs(JobPost.objects.filter(status='APPROVED'))
 
 
 class JobSearchFilterView(generics.ListAPIView):
@@ -72,25 +76,21 @@ class JobSearchFilterView(generics.ListAPIView):
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
-        queryset = JobPost.objects.filter(
-            status='APPROVED'
-        ).select_related('posted_by', 'assigned_admin').prefetch_related('applications', 'applications__tutor', 'applications__tutor__user').order_by('-created_at')
+        queryset = prefetch_jobs(JobPost.objects.filter(status='APPROVED'), self.request.user).order_by('-created_at')
 
         params = self.request.query_params
 
-        queryset = queryset.annotate(subjects_str=Cast('subjects', CharField()))
-
         q = params.get('q')
         if q:
-            queryset = queryset.filter(
-                Q(subjects_str__icontains=q) |
+            queryset = search_jobs(queryset, q, (
+                job_subject_text_q(q) |
                 Q(class_grade__icontains=q) |
                 Q(locality__icontains=q)
-            )
+            ))
 
         subject = params.get('subject')
         if subject:
-            queryset = filter_by_subject(queryset, subject)
+            queryset = filter_jobs_by_subject(queryset, subject)
 
 
         grade = params.get('grade')
@@ -163,7 +163,7 @@ class ParentStatsView(APIView):
         recommended_tutors = self._get_recommended_tutors(user)
         activities = self._build_activity_feed(user)
         recent_jobs_data = JobPostSerializer(
-            JobPost.objects.filter(Q(posted_by=user) | Q(parent=user)).order_by('-created_at')[:3],
+            prefetch_jobs(JobPost.objects.filter(Q(posted_by=user) | Q(parent=user))).order_by('-created_at')[:3],
             many=True,
         ).data
 
@@ -194,13 +194,8 @@ class ParentStatsView(APIView):
         return {'active_jobs': active_jobs, 'applications_received': applications_received, 'hired_count': hired_count}
 
     def _get_wallet_balance(self, user):
-        """Get users wallet balance safely."""
-        try:
-            if hasattr(user, 'wallet'):
-                return user.wallet.balance
-        except Exception:
-            pass
-        return 0.00
+        """Get users wallet balance from the cached wallet snapshot."""
+        return get_wallet_snapshot(user)['balance']
 
     def _get_assigned_tutor(self, user):
         """Get the most recently hired tutor info."""
@@ -217,36 +212,21 @@ class ParentStatsView(APIView):
         return None
 
     def _get_recommended_tutors(self, user, limit=5):
-        """Recommend active tutors, prioritizing locality match."""
+        """Top-ranked active tutors (users/ranking.py), locality matches first."""
         last_job = JobPost.objects.filter(Q(posted_by=user) | Q(parent=user)).order_by('-created_at').first()
         parent_locality = last_job.locality if last_job else None
 
-        qs = TutorProfile.objects.filter(
-            status_record__status='ACTIVE'
-        ).select_related('user')
-
-        if parent_locality:
-            qs = qs.annotate(
-                locality_match=Case(
-                    When(locality__icontains=parent_locality, then=Value(2)),
-                    default=Value(0),
-                    output_field=IntegerField(),
-                )
-            ).order_by('-locality_match', '-teaching_experience_years')
-        else:
-            qs = qs.order_by('-teaching_experience_years')
-
         return [
             {
-                "id": t.id,
-                "name": t.full_name or t.user.first_name,
-                "subjects": t.subjects,
-                "locality": t.locality,
-                "rating": 4.8,
-                "image": get_tutor_image_url(t),
-                "experience": t.teaching_experience_years,
+                "id": ranking.tutor.id,
+                "name": ranking.tutor.full_name or ranking.tutor.user.first_name,
+                "subjects": ranking.tutor.subjects,
+                "locality": ranking.tutor.locality,
+                "rating": ranking.rating_avg,
+                "image": get_tutor_image_url(ranking.tutor),
+                "experience": ranking.tutor.teaching_experience_years,
             }
-            for t in qs[:limit]
+            for ranking in top_ranked_tutors(limit, locality=parent_locality)
         ]
 
     def _build_activity_feed(self, user, limit=5):
@@ -290,19 +270,14 @@ class ParentStatsView(APIView):
                 "timestamp": app.created_at.isoformat(), "icon": "user-plus",
             })
 
-        # Wallet transactions
-        try:
-            if hasattr(user, 'wallet'):
-                from wallet.models import Transaction
-                for tx in Transaction.objects.filter(wallet=user.wallet).order_by('-created_at')[:3]:
-                    verb = 'Debited' if tx.transaction_type == 'DEBIT' else 'Credited'
-                    activities.append({
-                        "type": "wallet", "title": "Wallet Update",
-                        "description": f"{verb} ₹{tx.amount}",
-                        "timestamp": tx.created_at.isoformat(), "icon": "credit-card",
-                    })
-        except Exception:
-            pass
+        # Wallet transactions (from the cached wallet snapshot)
+        for tx in get_wallet_snapshot(user)['recent'][:3]:
+            verb = 'Debited' if tx['transaction_type'] == 'DEBIT' else 'Credited'
+            activities.append({
+                "type": "wallet", "title": "Wallet Update",
+                "description": f"{verb} ₹{tx['amount']}",
+                "timestamp": tx['created_at'].isoformat(), "icon": "credit-card",
+            })
 
         activities.sort(key=lambda x: x['timestamp'], reverse=True)
         return activities[:limit]
@@ -343,6 +318,23 @@ class InstituteJobViewSet(viewsets.ModelViewSet):
 
 from django.shortcuts import get_object_or_404
 
+def _reject_other_applications(job, hired_pk):
+    """Reject the job's other applications and notify those tutors with one bulk insert."""
+    others = Application.objects.filter(job=job).exclude(pk=hired_pk)
+    tutor_user_ids = list(others.exclude(status='REJECTED').values_list('tutor__user_id', flat=True))
+    update_with_rollup('APPLICATION', others, status='REJECTED')
+    send_notifications_bulk(
+        {
+            'user_id': user_id,
+            'title': 'Position Filled',
+            'message': f"The parent has hired another tutor for {job.class_grade} ({job.subjects}). Thank you for applying.",
+            'notification_type': 'SYSTEM',
+            'related_job': job,
+        }
+        for user_id in tutor_user_ids
+    )
+
+
 class ParentApplicationActionView(APIView):
     """Parent accepts or rejects a tutor's application."""
     permission_classes = [permissions.IsAuthenticated]
@@ -367,7 +359,7 @@ class ParentApplicationActionView(APIView):
             job.status = 'ASSIGNED'
             job.save()
             # Reject all other applications for this job
-            Application.objects.filter(job=job).exclude(pk=pk).update(status='REJECTED')
+            _reject_other_applications(job, pk)
             return Response({"message": "Application accepted successfully!"})
             
         elif action == 'REJECT':
@@ -511,7 +503,7 @@ class ParentConfirmTutorView(APIView):
         # Update Job status and reject other applications
         job.status = 'ASSIGNED'
         job.save()
-        Application.objects.filter(job=job).exclude(pk=pk).update(status='REJECTED')
+        _reject_other_applications(job, pk)
         
         # Notify tutor they are hired
         if application.tutor and application.tutor.user:
@@ -0,0 +1,47 @@
+"""
+Shared select/prefetch setup for JobPost and Application list views.
+
+JobPostSerializer.get_assigned_tutor and ApplicationSerializer.get_tutor_details
+render PublicTutorProfileSerializer for each row, which reads ``tutor.user`` and
+looks up FavouriteTutor / ContactUnlock for the viewer unless the profile carries
+the ``favourited_by_current_user`` / ``unlocked_by_current_user`` prefetches.
+These helpers load everything the serializers touch up front, so a page costs
+the same number of queries however many rows it holds.
+"""
+from django.db.models import Prefetch
+
+from core.roles import ADMIN_ROLES
+from users.models import ContactUnlock, FavouriteTutor
+from .models import Application
+
+
+def viewer_tutor_prefetches(user, prefix=''):
+    """Per-viewer favourite/unlock prefetches for the TutorProfiles reached through ``prefix``."""
+    if user is None or not user.is_authenticated:
+        return []
+    prefetches = [
+        Prefetch(f'{prefix}favourited_by_parents', queryset=FavouriteTutor.objects.filter(parent=user),
+                 to_attr='favourited_by_current_user'),
+    ]
+    if user.role not in ADMIN_ROLES:  # admins always see contacts, see get_is_unlocked
+        prefetches.append(
+            Prefetch(f'{prefix}unlocked_by', queryset=ContactUnlock.objects.filter(parent=user),
+                     to_attr='unlocked_by_current_user')
+        )
+    return prefetches
+
+
+def prefetch_jobs(queryset, user=None):
+    """Attach what JobPostSerializer reads: usernames, applications with their tutors, viewer flags."""
+    return queryset.select_related('posted_by', 'parent', 'assigned_admin').prefetch_related(
+        # Ordered by id so the in-memory HIRED lookup picks the same row as .first() did
+        Prefetch('applications', queryset=Application.objects.select_related('tutor__user').order_by('id')),
+        *viewer_tutor_prefetches(user, 'applications__tutor__'),
+    )
+
+
+def prefetch_applications(queryset, user=None):
+    """Attach what ApplicationSerializer reads: the tutor and its user, the job and its poster, viewer flags."""
+    return queryset.select_related('tutor__user', 'job__posted_by', 'job__parent').prefetch_related(
+        *viewer_tutor_prefetches(user, 'tutor__'),
+    )
@@ -0,0 +1,164 @@
+"""
+Daily metrics rollup for the CRM and analytics dashboards.
+
+DailyMetric holds, per creation day, how many JobPosts / Applications are
+currently in each status (jobs also per assigned admin), plus the number and
+sum of wallet credits. Signals in jobs/signals.py keep it current as rows are
+created, change status/admin or are deleted. Views that change many rows at
+once go through ``update_with_rollup``, since ``QuerySet.update()`` bypasses
+signals. ``rebuild_daily_metrics`` (and the rebuild_daily_metrics command)
+recompute it from the source tables to repair any other drift.
+
+Dashboards then aggregate over days instead of over the full history.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyMetric
+
+# Attribute set by post_init holding the (day, status, admin_id) bucket a row was loaded in
+ROLLUP_STATE_ATTR = '_rollup_bucket'
+
+
+def metric_day(created_at):
+    return timezone.localtime(created_at).date() if timezone.is_aware(created_at) else created_at.date()
+
+
+def bump(day, kind, status='', admin_id=0, count=1, amount=0):
+    """Add ``count``/``amount`` to one rollup bucket with an F() update, creating it if needed."""
+    key = {'day': day, 'kind': kind, 'status': status or '', 'admin_id': admin_id or 0}
+    delta = {'count': F('count') + count, 'amount': F('amount') + amount}
+    with transaction.atomic():
+        if DailyMetric.objects.filter(**key).update(**delta):
+            return
+        try:
+            with transaction.atomic():
+                DailyMetric.objects.create(**key, count=count, amount=amount)
+        except IntegrityError:
+            # Another request created the bucket first
+            DailyMetric.objects.filter(**key).update(**delta)
+
+
+def job_bucket(job):
+    """(day, status, admin_id) for a loaded JobPost, or None if any field is deferred."""
+    values = vars(job)
+    if any(values.get(f) is None for f in ('created_at', 'status')) or 'assigned_admin_id' not in values:
+        return None
+    return (metric_day(values['created_at']), values['status'], values['assigned_admin_id'] or 0)
+
+
+def application_bucket(application):
+    values = vars(application)
+    if values.get('created_at') is None or values.get('status') is None:
+        return None
+    return (metric_day(values['created_at']), values['status'], 0)
+
+
+def remember_bucket(instance, bucket_fn):
+    setattr(instance, ROLLUP_STATE_ATTR, bucket_fn(instance) if instance.pk else None)
+
+
+def rollup_saved(kind, instance, created, bucket_fn):
+    """Move a saved row from the bucket it was loaded in to its current one."""
+    old = None if created else getattr(instance, ROLLUP_STATE_ATTR, None)
+    new = bucket_fn(instance)
+    if not created and (old is None or new is None):
+        return  # saved from a partially loaded instance; rebuild_daily_metrics repairs it
+    move(kind, old, new)
+    setattr(instance, ROLLUP_STATE_ATTR, new)
+
+
+def rollup_deleted(kind, instance, bucket_fn):
+    move(kind, getattr(instance, ROLLUP_STATE_ATTR, None) or bucket_fn(instance), None)
+
+
+def move(kind, old, new):
+    """Move one row from bucket ``old`` to ``new`` (either may be None)."""
+    if old == new:
+        return
+    if old is not None:
+        bump(old[0], kind, old[1], old[2], count=-1)
+    if new is not None:
+        bump(new[0], kind, new[1], new[2], count=1)
+
+
+def update_with_rollup(kind, queryset, **changes):
+    """
+    ``queryset.update(**changes)`` for JobPosts (kind 'JOB') or Applications
+    ('APPLICATION') that also moves the updated rows between rollup buckets.
+    Request paths that change status or assigned admin in bulk use this
+    instead of a bare update(). Returns the number of rows updated.
+    """
+    fields = {'day': TruncDate('created_at'), 'bucket_status': F('status')}
+    if kind == 'JOB':
+        fields['admin'] = F('assigned_admin_id')
+    with transaction.atomic():
+        ids = list(queryset.select_for_update().values_list('pk', flat=True))
+        rows = queryset.model.objects.filter(pk__in=ids)
+        groups = list(rows.values(**fields).annotate(total=Count('id')).order_by())
+        updated = rows.update(**changes)
+        for group in groups:
+            admin = group.get('admin') or 0
+            new_admin = admin
+            if 'assigned_admin' in changes:
+                new_admin = getattr(changes['assigned_admin'], 'pk', changes['assigned_admin']) or 0
+            elif 'assigned_admin_id' in changes:
+                new_admin = changes['assigned_admin_id'] or 0
+            old = (group['day'], group['bucket_status'], admin)
+            new = (group['day'], changes.get('status', group['bucket_status']), new_admin)
+            if old != new:
+                bump(old[0], kind, old[1], old[2], count=-group['total'])
+                bump(new[0], kind, new[1], new[2], count=group['total'])
+    return updated
+
+
+def rollup_rows(job_model, application_model, transaction_model, metric_model=DailyMetric, archive_model=None):
+    """
+    Unsaved rollup rows computed from the source tables with grouped queries.
+    Credits moved to ``archive_model`` (TransactionArchive) still count.
+    """
+    rows = []
+    for row in job_model.objects.values(
+        day=TruncDate('created_at'), bucket_status=F('status'), admin=F('assigned_admin_id')
+    ).annotate(total=Count('id')).order_by():
+        rows.append(metric_model(
+            day=row['day'], kind='JOB', status=row['bucket_status'], admin_id=row['admin'] or 0, count=row['total']
+        ))
+    for row in application_model.objects.values(
+        day=TruncDate('created_at'), bucket_status=F('status')
+    ).annotate(total=Count('id')).order_by():
+        rows.append(metric_model(
+            day=row['day'], kind='APPLICATION', status=row['bucket_status'], count=row['total']
+        ))
+    credits = {}
+    for model in filter(None, (transaction_model, archive_model)):
+        for row in model.objects.filter(transaction_type='CREDIT').values(
+            day=TruncDate('created_at')
+        ).annotate(total=Count('id'), credited=Sum('amount')).order_by():
+            count, amount = credits.get(row['day'], (0, 0))
+            credits[row['day']] = (count + row['total'], amount + (row['credited'] or 0))
+    for day, (count, amount) in credits.items():
+        rows.append(metric_model(day=day, kind='CREDIT', count=count, amount=amount))
+    return rows
+
+
+def job_status_totals(admin_id=None):
+    """{status: live job count}, optionally for one assigned admin, from the rollup."""
+    metrics = DailyMetric.objects.filter(kind='JOB')
+    if admin_id is not None:
+        metrics = metrics.filter(admin_id=admin_id)
+    return dict(metrics.values('status').annotate(total=Sum('count')).order_by().values_list('status', 'total'))
+
+
+def rebuild_daily_metrics():
+    """Replace the whole rollup with freshly computed rows. Returns the number of rows written."""
+    from wallet.models import Transaction, TransactionArchive
+    from .models import Application, JobPost
+
+    rows = rollup_rows(JobPost, Application, Transaction, archive_model=TransactionArchive)
+    with transaction.atomic():
+        DailyMetric.objects.all().delete()
+        DailyMetric.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
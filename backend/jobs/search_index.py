@@ -0,0 +1,129 @@
+"""
+Normalized subject index for job search.
+
+JobPost.subjects is a free-form JSON list. Job search used to cast it to
+text and OR an icontains per synonym, which scans every approved job. We
+mirror it into JobSubjectIndex rows keyed on canonical subject names and
+filter with indexed IN (SELECT job_id ...) semi-joins.
+
+Free-text ``q`` search goes through JobPost.search_vector on PostgreSQL
+(see core/fulltext.py) and falls back to icontains elsewhere.
+"""
+from django.db import transaction
+from django.db.models import Q
+
+from core.fulltext import fulltext_enabled, fulltext_search, update_search_vector
+from .models import JobPost, JobSubjectIndex, Subject
+from .vocabulary import normalize_search_key, subject_index_keys, subject_search_keys
+
+
+def load_subject_map():
+    """Return {subject key: Subject id} for the Subject master table."""
+    return {normalize_search_key(name): pk for pk, name in Subject.objects.values_list('id', 'name')}
+
+
+def job_subject_keys(job):
+    """All index keys for a job's subjects list."""
+    subjects = job.subjects if isinstance(job.subjects, list) else [job.subjects]
+    keys = set()
+    for value in subjects:
+        keys.update(subject_index_keys(value))
+    return keys
+
+
+def sync_job_search_index(job, subject_map=None):
+    """Bring a single job's index rows in line with its subjects. No writes if nothing changed."""
+    keys = job_subject_keys(job)
+    existing = set(JobSubjectIndex.objects.filter(job_id=job.id).values_list('key', flat=True))
+    if keys == existing:
+        return
+    if subject_map is None:
+        subject_map = load_subject_map()
+    with transaction.atomic():
+        JobSubjectIndex.objects.filter(job_id=job.id, key__in=existing - keys).delete()
+        JobSubjectIndex.objects.bulk_create([
+            JobSubjectIndex(job_id=job.id, key=key, subject_id=subject_map.get(key))
+            for key in sorted(keys - existing)
+        ])
+
+
+def job_search_parts(student_name, subjects, class_grade, locality):
+    """Weighted text for a job's search vector: subjects and student, then grade and locality."""
+    subject_words = set()
+    for value in subjects if isinstance(subjects, list) else [subjects]:
+        subject_words.update(subject_index_keys(value))
+    return {
+        'A': ' '.join(sorted(subject_words)),
+        'B': ' '.join(filter(None, [student_name, class_grade, locality])),
+    }
+
+
+def sync_job_search_vector(job):
+    """Refresh one job's full-text vector. No-op off PostgreSQL."""
+    if not fulltext_enabled():
+        return
+    parts = job_search_parts(job.student_name, job.subjects, job.class_grade, job.locality)
+    update_search_vector(JobPost, job.id, parts)
+
+
+def rebuild_job_search_index(jobs, batch_size=1000):
+    """Rebuild the index for an iterable of jobs in batches. Returns the number of jobs indexed."""
+    subject_map = load_subject_map()
+    total = 0
+    batch = []
+
+    def flush(batch):
+        rows = [
+            JobSubjectIndex(job_id=job.id, key=key, subject_id=subject_map.get(key))
+            for job in batch
+            for key in sorted(job_subject_keys(job))
+        ]
+        with transaction.atomic():
+            JobSubjectIndex.objects.filter(job_id__in=[job.id for job in batch]).delete()
+            JobSubjectIndex.objects.bulk_create(rows, batch_size=batch_size)
+            for job in batch:
+                sync_job_search_vector(job)
+
+    for job in jobs:
+        batch.append(job)
+        if len(batch) >= batch_size:
+            flush(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        flush(batch)
+        total += len(batch)
+    return total
+
+
+def job_subject_q(keys, job_field='pk'):
+    """Q matching rows whose job (via ``job_field``) has any of the given subject keys."""
+    return Q(**{f'{job_field}__in': JobSubjectIndex.objects.filter(key__in=keys).values('job_id')})
+
+
+def job_subject_text_q(q, job_field='pk', subjects_field='subjects'):
+    """
+    Subject part of a free-text ``q`` filter: the index lookup, which knows
+    synonyms such as "maths", OR a substring match on the raw subjects, so
+    partial input like "chem" still finds Chemistry.
+    """
+    return job_subject_q(subject_index_keys(q), job_field=job_field) | Q(**{f'{subjects_field}__icontains': q})
+
+
+def filter_jobs_by_subject(queryset, subject_name):
+    """Filter a JobPost queryset to jobs for the subject (or "All Subjects")."""
+    if not subject_name:
+        return queryset
+    return queryset.filter(job_subject_q(subject_search_keys(subject_name)))
+
+
+def search_jobs(queryset, q, legacy_filter):
+    """
+    Free-text job search: ranked full-text on PostgreSQL. Elsewhere ``legacy_filter``
+    (the view's icontains Q, subjects via ``job_subject_text_q``) is applied.
+    """
+    if not q:
+        return queryset
+    if fulltext_enabled():
+        return fulltext_search(queryset, q)
+    return queryset.filter(legacy_filter)
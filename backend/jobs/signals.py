@@ -0,0 +1,159 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .admin_models import AdminTask, Notification
+from .notification_counts import adjust_unread_counts, read_state_changed, remember_read_state
+from .master_cache import bump_master_data_version
+from .notification_stream import publish_notifications, publish_unread_delta
+from .models import Application, Board, ClassLevel, JobPost, Locality, Location, Subject, TutorRating
+from .rollup import (
+    application_bucket, bump, job_bucket, metric_day, remember_bucket, rollup_deleted, rollup_saved,
+)
+from .search_index import sync_job_search_index, sync_job_search_vector
+from .utils import OPEN_TASK_STATUSES, release_workload
+from users.ranking import refresh_tutor_rankings
+from wallet.models import Transaction
+
+
+@receiver(post_save, sender=JobPost)
+def sync_search_index(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the normalized job subject index in step with JobPost.subjects.
+    """
+    if update_fields and 'subjects' not in update_fields:
+        return
+    sync_job_search_index(instance)
+
+
+@receiver(post_save, sender=JobPost)
+def sync_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the full-text search vector in step with the searchable job fields.
+    """
+    if update_fields and not {'student_name', 'subjects', 'class_grade', 'locality'} & set(update_fields):
+        return
+    sync_job_search_vector(instance)
+
+
+@receiver([post_save, post_delete], sender=Subject)
+@receiver([post_save, post_delete], sender=Board)
+@receiver([post_save, post_delete], sender=ClassLevel)
+@receiver([post_save, post_delete], sender=Location)
+@receiver([post_save, post_delete], sender=Locality)
+def invalidate_master_data(sender, **kwargs):
+    """
+    Any master data change (CRUD views, seeding, admin) invalidates the cached public payload.
+    """
+    transaction.on_commit(bump_master_data_version)
+
+
+@receiver(post_init, sender=Notification)
+def remember_notification_read_state(sender, instance, **kwargs):
+    remember_read_state(instance)
+
+
+@receiver(post_save, sender=Notification)
+def track_notification(sender, instance, created, **kwargs):
+    """
+    Keep the unread counter (jobs/notification_counts.py) current and push the
+    change to the user's open SSE streams (jobs/notification_stream.py).
+    """
+    delta = read_state_changed(instance, created)
+    adjust_unread_counts({instance.user_id: delta})
+    remember_read_state(instance)
+    if created:
+        publish_notifications([instance])
+    else:
+        publish_unread_delta(instance.user_id, delta)
+
+
+@receiver(post_delete, sender=Notification)
+def untrack_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread_counts({instance.user_id: -1})
+        publish_unread_delta(instance.user_id, -1)
+
+
+@receiver(post_delete, sender=AdminTask)
+def release_deleted_task_workload(sender, instance, **kwargs):
+    """
+    Deleting an open task (directly or via its JobPost/TutorKYC cascade) frees the admin's counter.
+    """
+    if instance.status in OPEN_TASK_STATUSES:
+        release_workload([{'admin_id': instance.admin_id, 'task_type': instance.task_type}])
+
+
+@receiver(post_init, sender=JobPost)
+def remember_job_rollup_bucket(sender, instance, **kwargs):
+    remember_bucket(instance, job_bucket)
+
+
+@receiver(post_save, sender=JobPost)
+def rollup_job(sender, instance, created, **kwargs):
+    """
+    Keep the daily metrics rollup (jobs/rollup.py) in step with job status and assignment.
+    """
+    rollup_saved('JOB', instance, created, job_bucket)
+
+
+@receiver(post_delete, sender=JobPost)
+def rollup_job_deleted(sender, instance, **kwargs):
+    rollup_deleted('JOB', instance, job_bucket)
+
+
+@receiver(post_init, sender=Application)
+def remember_application_rollup_bucket(sender, instance, **kwargs):
+    remember_bucket(instance, application_bucket)
+
+
+@receiver(post_save, sender=Application)
+def rollup_application(sender, instance, created, **kwargs):
+    rollup_saved('APPLICATION', instance, created, application_bucket)
+
+
+@receiver(post_delete, sender=Application)
+def rollup_application_deleted(sender, instance, **kwargs):
+    rollup_deleted('APPLICATION', instance, application_bucket)
+
+
+@receiver(post_save, sender=Transaction)
+def rollup_credit(sender, instance, created, **kwargs):
+    """
+    Wallet credits feed the CREDIT rollup (count and amount per day).
+    """
+    if created and instance.transaction_type == 'CREDIT':
+        bump(metric_day(instance.created_at), 'CREDIT', amount=instance.amount)
+
+
+@receiver(post_delete, sender=Transaction)
+def rollup_credit_deleted(sender, instance, **kwargs):
+    if instance.transaction_type == 'CREDIT':
+        bump(metric_day(instance.created_at), 'CREDIT', count=-1, amount=-instance.amount)
+
+
+@receiver(post_save, sender=TutorRating)
+def refresh_ranking_on_rating(sender, instance, **kwargs):
+    """
+    Ratings and hires feed the tutor's TutorRanking row (users/ranking.py).
+    """
+    refresh_tutor_rankings([instance.tutor_id])
+
+
+@receiver(post_save, sender=Application)
+def refresh_ranking_on_application(sender, instance, created, update_fields=None, **kwargs):
+    if created and instance.status != 'HIRED':
+        return
+    if update_fields and 'status' not in update_fields:
+        return
+    refresh_tutor_rankings([instance.tutor_id])
+
+
+@receiver(post_delete, sender=TutorRating)
+@receiver(post_delete, sender=Application)
+def refresh_ranking_on_delete(sender, instance, **kwargs):
+    if sender is Application and instance.status != 'HIRED':
+        return
+    # May be part of deleting the tutor profile; by commit time its row is gone too
+    tutor_id = instance.tutor_id
+    transaction.on_commit(lambda: refresh_tutor_rankings([tutor_id]))
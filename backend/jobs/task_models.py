@@ -0,0 +1,33 @@
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundTask(models.Model):
+    """
+    A queued call to a function, run out of the request cycle by ``run_worker``.
+    See jobs/tasks.py for enqueueing, claiming and retries.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
+    name = models.CharField(max_length=200)  # dotted path of the function to call
+    payload = models.JSONField(default=dict, blank=True)  # keyword arguments
+    sensitive = models.BooleanField(default=False)  # payload hidden in the admin and cleared once finished
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx')]
+
+    def __str__(self):
+        return f"{self.name} [{self.status}]"
@@ -0,0 +1,155 @@
+"""
+Database-backed background tasks, so request threads never wait on SMTP or
+SMS gateways.
+
+    enqueue('users.password_reset_views.send_password_reset_email', user_id=user.pk)
+
+stores a BackgroundTask row naming the function by dotted path, with JSON
+keyword arguments. The row is written in the caller's transaction, so a
+rolled-back request never sends anything. ``python manage.py run_worker``
+claims due tasks in batches. On PostgreSQL it uses
+``SELECT ... FOR UPDATE SKIP LOCKED``, so several workers never pick the same
+row. A task that raises is retried with exponential backoff until
+``max_attempts``, then left FAILED with its traceback.
+
+Task functions must be importable module-level callables that take only
+JSON-serialisable keyword arguments. Renaming one strands tasks already
+queued under the old path. Secrets such as OTPs are queued with
+``sensitive=True``: the admin hides the payload and it is wiped as soon as the
+task is DONE or FAILED.
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .task_models import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+STALE_AFTER = timedelta(minutes=15)  # RUNNING longer than this: the worker died
+
+
+def enqueue(name, *, run_at=None, max_attempts=5, sensitive=False, **payload):
+    """Queue ``name(**payload)`` to run in a worker. Returns the BackgroundTask."""
+    return BackgroundTask.objects.create(
+        name=name,
+        payload=payload,
+        sensitive=sensitive,
+        max_attempts=max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def _finished(task, status, **fields):
+    """Fields for moving ``task`` to DONE/FAILED; sensitive payloads are wiped."""
+    if task.sensitive:
+        fields['payload'] = {}
+    return {'status': status, 'finished_at': timezone.now(), **fields}
+
+
+def backoff_delay(attempts):
+    """Delay before the next try after ``attempts`` failures: 30s, 60s, 120s, ... capped at an hour."""
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def default_worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_tasks(worker_id, limit=10, task_ids=None):
+    """
+    Mark up to ``limit`` due PENDING tasks as RUNNING for this worker and
+    return them. ``task_ids`` restricts the claim to those tasks.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = BackgroundTask.objects.filter(
+            status=BackgroundTask.Status.PENDING, run_at__lte=now,
+        ).order_by('run_at', 'id')
+        if task_ids is not None:
+            due = due.filter(id__in=task_ids)
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        BackgroundTask.objects.filter(id__in=ids).update(
+            status=BackgroundTask.Status.RUNNING, locked_at=now, locked_by=worker_id,
+            attempts=F('attempts') + 1,
+        )
+    return list(BackgroundTask.objects.filter(id__in=ids).order_by('run_at', 'id'))
+
+
+def run_task(task):
+    """Call a claimed task and record DONE, a retry, or FAILED. Returns True on success."""
+    try:
+        func = import_string(task.name)
+        func(**task.payload)
+    except Exception:  # noqa: BLE001 - any failure is recorded on the task
+        error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            logger.error('Task %s (%s) failed permanently after %s attempts', task.id, task.name, task.attempts)
+            BackgroundTask.objects.filter(pk=task.pk).update(
+                **_finished(task, BackgroundTask.Status.FAILED, last_error=error),
+            )
+        else:
+            retry_at = timezone.now() + backoff_delay(task.attempts)
+            logger.warning('Task %s (%s) failed, retrying at %s', task.id, task.name, retry_at)
+            BackgroundTask.objects.filter(pk=task.pk).update(
+                status=BackgroundTask.Status.PENDING, last_error=error, run_at=retry_at,
+                locked_at=None, locked_by='',
+            )
+        return False
+
+    BackgroundTask.objects.filter(pk=task.pk).update(**_finished(task, BackgroundTask.Status.DONE, last_error=''))
+    return True
+
+
+def requeue_stale_tasks(stale_after=STALE_AFTER):
+    """
+    Return tasks left RUNNING by a crashed worker to the queue. A task that has
+    used up its attempts (it may be what keeps killing the worker) is marked
+    FAILED instead. Returns (requeued, failed).
+    """
+    stale = BackgroundTask.objects.filter(
+        status=BackgroundTask.Status.RUNNING, locked_at__lt=timezone.now() - stale_after,
+    )
+    failed = 0
+    for task in stale.filter(attempts__gte=F('max_attempts')):
+        logger.error('Task %s (%s) abandoned by its worker after %s attempts', task.id, task.name, task.attempts)
+        failed += BackgroundTask.objects.filter(pk=task.pk, status=BackgroundTask.Status.RUNNING).update(
+            **_finished(task, BackgroundTask.Status.FAILED, last_error='Worker died while running the task'),
+        )
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status=BackgroundTask.Status.PENDING, locked_at=None, locked_by='',
+    )
+    return requeued, failed
+
+
+def run_pending(worker_id=None, limit=10, task_ids=None):
+    """Claim and run one batch of due tasks (only ``task_ids`` if given). Returns (succeeded, failed)."""
+    worker_id = worker_id or default_worker_id()
+    succeeded = failed = 0
+    for task in claim_tasks(worker_id, limit, task_ids):
+        if run_task(task):
+            succeeded += 1
+        else:
+            failed += 1
+    return succeeded, failed
+
+
+def purge_finished_tasks(older_than):
+    """Delete DONE tasks finished before ``now - older_than``. Returns how many."""
+    deleted, _ = BackgroundTask.objects.filter(
+        status=BackgroundTask.Status.DONE, finished_at__lt=timezone.now() - older_than,
+    ).delete()
+    return deleted
@@ -1,9 +1,12 @@
 from django.test import TestCase
 from django.contrib.auth import get_user_model
-from jobs.models import JobPost, Application
+from jobs.models import JobPost, Application, JobSubjectIndex, Subject, Location, Locality, DailyMetric
+from jobs.admin_models import AdminProfile, AdminTask
+from jobs.utils import assign_job_to_admin
 from users.models import TutorProfile, FavouriteTutor, ContactUnlock
 from jobs.serializers import JobPostSerializer
 from django.db.models import Prefetch
+from rest_framework.test import APIClient
 
 User = get_user_model()
 
@@ -58,3 +61,932 @@ class JobPostSerializerTestCase(TestCase):
         self.assertEqual(job2_data['application_count'], 1)
         self.assertTrue(job2_data['has_applied'])
         self.assertIsNone(job2_data['assigned_tutor'])
+
+
+class JobSubjectIndexTestCase(TestCase):
+    def setUp(self):
+        self.maths = Subject.objects.create(name='Mathematics')
+        self.parent = User.objects.create(username='parent1', role='PARENT')
+
+        self.job1 = self._make_job(['Maths', 'Physics'])
+        self.job2 = self._make_job(['Computer Science'])
+        self.job3 = self._make_job(['All Subjects'])
+        self._make_job(['Maths'], status='PENDING')
+
+    def _make_job(self, subjects, status='APPROVED'):
+        return JobPost.objects.create(posted_by=self.parent, student_name='Student', subjects=subjects, status=status)
+
+    def _search(self, **params):
+        response = self.client.get('/api/jobs/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def test_index_rows_follow_job_save(self):
+        keys = set(JobSubjectIndex.objects.filter(job=self.job1).values_list('key', flat=True))
+        self.assertTrue({'mathematics', 'physics'} <= keys)
+        self.assertEqual(JobSubjectIndex.objects.get(job=self.job1, key='mathematics').subject_id, self.maths.id)
+
+        self.job1.subjects = ['Chemistry']
+        self.job1.save()
+        keys = set(JobSubjectIndex.objects.filter(job=self.job1).values_list('key', flat=True))
+        self.assertEqual(keys, {'chemistry'})
+
+    def test_subject_search_uses_synonyms_and_catch_all(self):
+        self.assertEqual(self._search(subject='Mathematics'), {self.job1.id, self.job3.id})
+        self.assertEqual(self._search(subject='Physics'), {self.job1.id, self.job3.id})
+        self.assertEqual(self._search(subject='Computer Science'), {self.job2.id, self.job3.id})
+        self.assertEqual(self._search(q='maths'), {self.job1.id})
+
+    def test_free_text_matches_partial_subject_names(self):
+        self.assertEqual(self._search(q='phys'), {self.job1.id})
+        self.assertEqual(self._search(q='comp'), {self.job2.id})
+
+        tutor = User.objects.create(username='tutor1', role='TEACHER').tutor_profile
+        application = Application.objects.create(job=self.job1, tutor=tutor)
+        Application.objects.create(job=self.job2, tutor=tutor)
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username='boss', role='SUPERADMIN'))
+        response = client.get('/api/jobs/crm/applications/', {'q': 'phys'})
+        self.assertEqual([row['id'] for row in response.data['results']], [application.id])
+
+
+class PublicMasterDataCacheTestCase(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        Subject.objects.create(name='Mathematics')
+        lucknow = Location.objects.create(city='Lucknow', state='Uttar Pradesh')
+        Locality.objects.create(location=lucknow, name='Gomti Nagar')
+
+    def test_cached_payload_and_conditional_get(self):
+        first = self.client.get('/api/jobs/master/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([s['name'] for s in first.data['subjects']], ['Mathematics'])
+        self.assertEqual(first.data['locations'][0]['localities'][0]['name'], 'Gomti Nagar')
+        etag = first['ETag']
+
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/jobs/master/')
+        self.assertEqual(again.data, first.data)
+
+        not_modified = self.client.get('/api/jobs/master/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+    def test_master_data_change_bumps_version(self):
+        etag = self.client.get('/api/jobs/master/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Subject.objects.create(name='Physics')
+
+        response = self.client.get('/api/jobs/master/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual({s['name'] for s in response.data['subjects']}, {'Mathematics', 'Physics'})
+
+
+class AdminAssignmentTestCase(TestCase):
+    def setUp(self):
+        self.counsellors = []
+        for i in range(3):
+            user = User.objects.create(username=f'counsellor{i}', role='COUNSELLOR')
+            AdminProfile.objects.create(user=user, department='COUNSELLOR')
+            self.counsellors.append(user)
+
+    def _post_jobs(self, count):
+        jobs = []
+        for _ in range(count):
+            parent = User.objects.create(username=f'parent{JobPost.objects.count()}', role='PARENT')
+            job = JobPost.objects.create(posted_by=parent, student_name='Student', subjects=['Maths'])
+            assign_job_to_admin(job)
+            jobs.append(job)
+        return jobs
+
+    def _counters(self):
+        return [AdminProfile.objects.get(user=u).pending_job_count for u in self.counsellors]
+
+    def test_least_loaded_admin_gets_the_job(self):
+        self._post_jobs(30)
+        self.assertEqual(self._counters(), [10, 10, 10])
+        for user in self.counsellors:
+            self.assertEqual(AdminTask.objects.filter(admin=user, status='PENDING').count(), 10)
+
+    def test_closing_and_deleting_tasks_release_counters(self):
+        jobs = self._post_jobs(3)
+        job = jobs[0]
+        admin = job.assigned_admin
+
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.put(f'/api/jobs/admin/{job.id}/approve/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AdminProfile.objects.get(user=admin).pending_job_count, 0)
+        self.assertEqual(AdminTask.objects.get(job_post=job).status, 'COMPLETED')
+
+        jobs[1].delete()
+        self.assertEqual(sum(self._counters()), 1)
+
+    def test_reconcile_command_fixes_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        self._post_jobs(3)
+        AdminProfile.objects.update(pending_job_count=7)
+        call_command('reconcile_admin_workload', stdout=StringIO())
+        self.assertEqual(self._counters(), [1, 1, 1])
+
+    def test_loadtest_refuses_to_park_real_admins_outside_test_database(self):
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import CommandError, call_command
+
+        with mock.patch('core.loadtest.is_test_database', return_value=False):
+            with self.assertRaisesMessage(CommandError, '--i-know-this-is-not-production'):
+                call_command('loadtest_admin_assignment', stdout=StringIO())
+        self.assertEqual(AdminProfile.objects.filter(is_available=True).count(), 3)
+
+
+class DailyMetricRollupTestCase(TestCase):
+    def setUp(self):
+        self.parent = User.objects.create(username='parent1', role='PARENT')
+        self.counsellor = User.objects.create(username='counsellor1', role='COUNSELLOR')
+        self.tutor = User.objects.create(username='tutor1', role='TEACHER').tutor_profile
+
+    def _snapshot(self):
+        return sorted(
+            (m.day, m.kind, m.status, m.admin_id, m.count, m.amount)
+            for m in DailyMetric.objects.exclude(count=0)
+        )
+
+    def test_signals_match_full_rebuild(self):
+        from jobs.rollup import rebuild_daily_metrics
+        from wallet.models import Wallet
+
+        job1 = JobPost.objects.create(posted_by=self.parent)
+        job2 = JobPost.objects.create(posted_by=self.parent)
+        JobPost.objects.create(posted_by=self.parent, status='REJECTED')
+        job1.assigned_admin = self.counsellor
+        job1.status = 'APPROVED'
+        job1.save()
+        application = Application.objects.create(job=job1, tutor=self.tutor)
+        application.status = 'HIRED'
+        application.save()
+        Application.objects.create(job=job2, tutor=self.tutor)
+        job2.delete()
+        wallet, _ = Wallet.objects.get_or_create(user=self.parent)
+        wallet.credit(500, 'Top up')
+
+        incremental = self._snapshot()
+        rebuild_daily_metrics()
+        self.assertEqual(incremental, self._snapshot())
+
+    def test_bulk_status_and_admin_changes_keep_rollup(self):
+        from jobs.rollup import rebuild_daily_metrics
+
+        job = JobPost.objects.create(posted_by=self.parent, parent=self.parent, status='APPROVED')
+        hired = Application.objects.create(job=job, tutor=self.tutor, demo_status='COMPLETED')
+        for i in range(2):
+            Application.objects.create(job=job, tutor=User.objects.create(username=f'other{i}', role='TEACHER').tutor_profile)
+        JobPost.objects.create(posted_by=self.parent, parent=self.parent, assigned_admin=self.counsellor)
+
+        client = APIClient()
+        client.force_authenticate(self.parent)
+        response = client.post(f'/api/jobs/parent/application-action/{hired.pk}/confirm/')
+        self.assertEqual(response.status_code, 200)
+        incremental = self._snapshot()
+        rebuild_daily_metrics()
+        self.assertEqual(incremental, self._snapshot())
+
+        new_admin = User.objects.create(username='counsellor2', role='COUNSELLOR')
+        client.force_authenticate(User.objects.create(username='boss', role='SUPERADMIN'))
+        response = client.post(f'/api/jobs/admin/transfer-client/{self.parent.pk}/', {'new_admin_id': new_admin.pk})
+        self.assertEqual(response.data['jobs_updated'], 2)
+        incremental = self._snapshot()
+        rebuild_daily_metrics()
+        self.assertEqual(incremental, self._snapshot())
+
+    def test_rebuild_keeps_archived_credits(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from jobs.rollup import rebuild_daily_metrics
+        from wallet.models import Transaction, TransactionArchive, Wallet
+
+        wallet, _ = Wallet.objects.get_or_create(user=self.parent)
+        wallet.credit(500, 'Top up')
+        Transaction.objects.update(created_at=timezone.now() - timedelta(days=1000))
+        rebuild_daily_metrics()
+        before = self._snapshot()
+
+        call_command('archive_old_rows', '--policy', 'transactions', '--days', '730', stdout=StringIO())
+        self.assertEqual(TransactionArchive.objects.count(), 1)
+        rebuild_daily_metrics()
+        self.assertEqual(before, self._snapshot())
+
+    def test_pipeline_stats_read_rollup(self):
+        superadmin = User.objects.create(username='boss', role='SUPERADMIN')
+        JobPost.objects.create(posted_by=self.parent)
+        job = JobPost.objects.create(posted_by=self.parent, assigned_admin=self.counsellor, status='APPROVED')
+        Application.objects.create(job=job, tutor=self.tutor, status='HIRED')
+
+        client = APIClient()
+        client.force_authenticate(superadmin)
+        with self.assertNumQueries(2):
+            data = client.get('/api/jobs/crm/pipeline/').data
+        self.assertEqual(data['pipeline']['pending'], 1)
+        self.assertEqual(data['pipeline']['approved'], 1)
+        self.assertEqual(data['today'], 2)
+        self.assertEqual(data['unassigned_pending'], 1)
+        self.assertEqual(data['hired_applications'], 1)
+        self.assertEqual(data['conversion_rate'], 100.0)
+
+
+class ListQueryCountTestCase(TestCase):
+    """Job/application list pages cost the same number of queries however many rows they hold."""
+
+    def setUp(self):
+        self.parent = User.objects.create(username='parent1', role='PARENT')
+        self.superadmin = User.objects.create(username='boss', role='SUPERADMIN')
+        self.counsellor = User.objects.create(username='counsellor1', role='COUNSELLOR')
+        self.rows = 0
+        self._add_rows(2)
+
+    def _add_rows(self, count):
+        for _ in range(count):
+            self.rows += 1
+            tutor = User.objects.create(username=f'tutor{self.rows}', role='TEACHER').tutor_profile
+            job = JobPost.objects.create(
+                posted_by=self.parent, parent=self.parent, assigned_admin=self.counsellor, status='APPROVED'
+            )
+            Application.objects.create(job=job, tutor=tutor, status='HIRED')
+            Application.objects.create(
+                job=job, tutor=User.objects.create(username=f'extra{self.rows}', role='TEACHER').tutor_profile
+            )
+            FavouriteTutor.objects.create(parent=self.parent, tutor=tutor)
+
+    def _query_count(self, user, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        client = APIClient()
+        client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data
+
+    def _assert_constant(self, user, url):
+        small, _ = self._query_count(user, url)
+        self._add_rows(5)
+        large, data = self._query_count(user, url)
+        self.assertEqual(small, large)
+        return data
+
+    def test_parent_job_list(self):
+        data = self._assert_constant(self.parent, '/api/jobs/')
+        self.assertEqual(len(data['results']), 7)
+        self.assertTrue(all(job['assigned_tutor']['is_favourite'] for job in data['results']))
+
+    def test_crm_job_list(self):
+        data = self._assert_constant(self.superadmin, '/api/jobs/crm/jobs/')
+        self.assertEqual(len(data['results']), 7)
+        self.assertTrue(all(job['assigned_tutor']['is_unlocked'] for job in data['results']))
+
+    def test_admin_application_list(self):
+        data = self._assert_constant(self.counsellor, '/api/jobs/crm/applications/')
+        self.assertEqual(len(data['results']), 14)
+        self.assertTrue(all(app['job_details']['parent_name'] == 'parent1' for app in data['results']))
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        self.parent = User.objects.create(username='parent1', role='PARENT')
+        self.superadmin = User.objects.create(username='boss', role='SUPERADMIN')
+        self.jobs = [JobPost.objects.create(posted_by=self.parent) for _ in range(5)]
+        # Two rows sharing a timestamp must still be split correctly across pages
+        JobPost.objects.filter(pk__in=[self.jobs[1].pk, self.jobs[2].pk]).update(created_at=self.jobs[1].created_at)
+        self.client = APIClient()
+        self.client.force_authenticate(self.superadmin)
+
+    def test_cursor_walks_every_row_once(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        seen = []
+        url = '/api/jobs/crm/jobs/?cursor=&page_size=2'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(url).data
+            self.assertNotIn('count', data)
+            self.assertFalse(any('COUNT(' in q['sql'] and 'jobs_jobpost' in q['sql'] for q in queries))
+            seen.extend(job['id'] for job in data['results'])
+            url = data['next']
+        expected = JobPost.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        self.assertEqual(seen, list(expected))
+
+    def test_page_number_mode_unchanged(self):
+        data = self.client.get('/api/jobs/crm/jobs/?page=2&page_size=2').data
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNotNone(data['previous'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/jobs/crm/jobs/?cursor=bogus').status_code, 404)
+
+
+class ImportTutorsBulkTestCase(TestCase):
+    CSV = (
+        'Email Address,NAME,Gender,Date of Birth,"CALLING NUMBER , WHATSAPP NUMBER , ALTERNATE NUMBER",'
+        'Classes and Subjects,Which Subjects you can teach in class 9th and 10th,IN WHICH LOCATIONS YOU CAN TEACH,'
+        'TEACHING EXPERIENCE IN YEARS,APPROVED OR NOT\n'
+        'a@example.com,Asha Verma,Female,05/14/1990,9876500001,"Class 6-8, Maths, Science",,Aliganj,5 years,Approved\n'
+        ',Ravi Kumar,Male,,+91 98765 00002,"Physics, Chemistry",Maths,Gomti Nagar,2,\n'
+        'dup@example.com,Duplicate,Male,,9876500001,English,,,,\n'
+        'x@example.com,No Phone,Male,,12345,English,,,,\n'
+    )
+
+    def setUp(self):
+        import os
+        import tempfile
+        tmp = tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8')
+        tmp.write(self.CSV)
+        tmp.close()
+        self.path = tmp.name
+        self.addCleanup(os.unlink, self.path)
+
+    def _import(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+        call_command('import_tutors', self.path, stdout=StringIO(), **options)
+
+    def _snapshot(self):
+        from users.models import TutorKYC, TutorSubjectIndex
+        return sorted(
+            (
+                p.user.username, p.user.email, p.user.first_name, p.full_name, p.gender, p.dob, p.subjects,
+                p.classes, p.locality, p.teaching_experience_years, p.profile_completion_percentage,
+                p.status_record.status, list(TutorKYC.objects.filter(tutor=p).values_list('status', flat=True)),
+                sorted(TutorSubjectIndex.objects.filter(tutor=p).values_list('key', flat=True)),
+            )
+            for p in TutorProfile.objects.select_related('user', 'status_record')
+        )
+
+    def test_bulk_matches_row_by_row(self):
+        self._import()
+        row_by_row = self._snapshot()
+        User.objects.filter(role='TEACHER').delete()
+
+        self._import(bulk=True, chunk_size=1)
+        self.assertEqual(self._snapshot(), row_by_row)
+        self.assertEqual(len(row_by_row), 2)
+        self.assertTrue(User.objects.get(username='9876500001').check_password('Tutor@123'))
+
+    def test_worker_pool_matches_single_process(self):
+        self._import(bulk=True)
+        single = self._snapshot()
+        User.objects.filter(role='TEACHER').delete()
+
+        self._import(bulk=True, workers=2, chunk_size=1)
+        self.assertEqual(self._snapshot(), single)
+
+    def test_bulk_update_existing_fills_empty_fields(self):
+        user = User.objects.create_user(username='9876500001', role='TEACHER', phone='9876500001')
+        profile = user.tutor_profile
+        profile.locality = 'Hazratganj'
+        profile.save()
+
+        self._import(bulk=True, update_existing=True)
+        profile.refresh_from_db()
+        self.assertEqual(profile.locality, 'Hazratganj')
+        self.assertEqual(profile.subjects, ['Mathematics', 'Science'])
+        self.assertEqual(profile.profile_completion_percentage, profile.calculate_completion_percentage())
+
+
+class VocabularyTestCase(TestCase):
+    def test_scan_returns_subjects_and_classes_in_one_call(self):
+        from jobs.vocabulary import scan_vocabulary
+        subjects, classes = scan_vocabulary('Class 10th, LKG - Computer Science, Maths; class 12nd')
+        self.assertEqual(subjects, ['Computer Science', 'Mathematics'])
+        # Overlapping mentions still count: "class 12nd" holds both "class 12" and "2nd"
+        self.assertEqual(classes, {'Class 10', 'Nursery/Preschool', 'Class 12', 'Class 1-5'})
+
+    def test_filter_by_subject_single_regex(self):
+        from jobs.utils import filter_by_subject
+        parent = User.objects.create(username='parent1', role='PARENT')
+        maths = JobPost.objects.create(posted_by=parent, subjects=['maths'])
+        catch_all = JobPost.objects.create(posted_by=parent, subjects=['All Subjects'])
+        JobPost.objects.create(posted_by=parent, subjects=['Physics'])
+        matched = filter_by_subject(JobPost.objects.all(), 'Mathematics')
+        self.assertEqual(set(matched.values_list('id', flat=True)), {maths.id, catch_all.id})
+
+
+class MigrateTutorImagesTestCase(TestCase):
+    """Runs the downloader against a local HTTP stub standing in for Google Drive."""
+
+    def setUp(self):
+        import tempfile
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlsplit
+
+        from io import BytesIO
+        from PIL import Image
+
+        hits = self.hits = []
+        photo = BytesIO()
+        Image.new('RGB', (800, 600), 'teal').save(photo, 'JPEG')
+
+        class DriveStub(BaseHTTPRequestHandler):
+            def do_GET(self):
+                file_id = parse_qs(urlsplit(self.path).query)['id'][0]
+                hits.append(file_id)
+                if file_id == 'flaky' and hits.count('flaky') == 1:
+                    status, content_type, body = 503, 'text/plain', b'busy'
+                elif file_id == 'page':
+                    status, content_type, body = 200, 'text/html', b'<html></html>'
+                elif file_id == 'photo':
+                    status, content_type, body = 200, 'image/jpeg', photo.getvalue()
+                else:
+                    status, content_type, body = 200, 'image/jpeg', b'\xff\xd8' + file_id.encode() * 5000
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), DriveStub)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}/uc?export=download'
+
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = self.settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.profiles = {}
+        for file_id in ['ok', 'flaky', 'page']:
+            user = User.objects.create(username=f'img_{file_id}', role='TEACHER')
+            profile, _ = TutorProfile.objects.get_or_create(user=user)
+            profile.external_profile_image_url = f'https://drive.google.com/open?id={file_id}'
+            profile.save()
+            self.profiles[file_id] = profile
+
+    def migrate(self, **options):
+        from io import StringIO
+        from django.core.management import call_command
+        call_command('migrate_tutor_images', base_url=self.base_url, workers=3, rate=0, backoff=0, stdout=StringIO(),
+                     **options)
+
+    def test_forced_rerun_replaces_thumbnails_and_deletes_old_files(self):
+        from django.core.files.storage import default_storage
+
+        profile = self.profiles['ok']
+        profile.external_profile_image_url = 'https://drive.google.com/open?id=photo'
+        profile.save()
+        self.migrate()
+        first = TutorProfile.objects.get(pk=profile.pk).thumbnails
+        self.assertTrue(first['files'])
+
+        self.migrate(force=True)
+        second = TutorProfile.objects.get(pk=profile.pk)
+        self.assertEqual(second.thumbnails_source, second.profile_image.name)
+        self.assertTrue(all(default_storage.exists(name) for name in second.thumbnails['files']))
+        self.assertFalse(any(default_storage.exists(name) for name in first['files']))
+
+    def test_downloads_retries_and_checkpoints(self):
+        from users.models import TutorImageMigration
+        self.migrate()
+
+        ok = TutorProfile.objects.get(pk=self.profiles['ok'].pk)
+        self.assertTrue(ok.profile_image.name.startswith('tutor_profiles/tutor_'))
+        with ok.profile_image.open('rb') as f:
+            self.assertEqual(f.read(), b'\xff\xd8' + b'ok' * 5000)
+
+        checkpoints = {c.tutor_id: c for c in TutorImageMigration.objects.all()}
+        self.assertEqual(checkpoints[self.profiles['ok'].pk].status, 'DONE')
+        flaky = checkpoints[self.profiles['flaky'].pk]
+        self.assertEqual((flaky.status, flaky.attempts), ('DONE', 2))
+        self.assertEqual(checkpoints[self.profiles['page'].pk].status, 'FAILED')
+        self.assertFalse(TutorProfile.objects.get(pk=self.profiles['page'].pk).profile_image)
+
+        # A rerun only retries the failed profile; a changed URL is fetched again
+        self.hits.clear()
+        ok.external_profile_image_url = 'https://drive.google.com/file/d/renamed/view'
+        ok.save()
+        self.migrate()
+        self.assertEqual(sorted(self.hits), ['page', 'renamed'])
+
+
+FLAKY_CALLS = []
+
+
+def flaky_task(fail_times):
+    """Task target for BackgroundTaskTestCase: fails the first ``fail_times`` calls."""
+    FLAKY_CALLS.append(fail_times)
+    if len(FLAKY_CALLS) <= fail_times:
+        raise RuntimeError('gateway timeout')
+
+
+def abandon_task(task_id):
+    """Task target for BackgroundTaskTestCase: another worker dies holding ``task_id``."""
+    from datetime import timedelta
+    from django.utils import timezone
+    from jobs.models import BackgroundTask
+
+    BackgroundTask.objects.filter(pk=task_id).update(locked_at=timezone.now() - timedelta(hours=1))
+
+
+class BackgroundTaskTestCase(TestCase):
+    def setUp(self):
+        FLAKY_CALLS.clear()
+
+    def test_retries_with_backoff_then_fails(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from jobs.models import BackgroundTask
+        from jobs.tasks import enqueue, run_pending
+
+        task = enqueue('jobs.tests.flaky_task', max_attempts=2, fail_times=5)
+        self.assertEqual(run_pending(), (0, 1))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('PENDING', 1))
+        self.assertGreater(task.run_at, timezone.now() + timedelta(seconds=20))
+        self.assertIn('gateway timeout', task.last_error)
+
+        # Not due yet, so nothing is claimed
+        self.assertEqual(run_pending(), (0, 0))
+        BackgroundTask.objects.filter(pk=task.pk).update(run_at=timezone.now())
+        self.assertEqual(run_pending(), (0, 1))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), ('FAILED', 2))
+
+    def test_run_worker_once_drains_due_tasks(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from jobs.models import BackgroundTask
+        from jobs.tasks import enqueue
+
+        for _ in range(3):
+            enqueue('jobs.tests.flaky_task', fail_times=0)
+        call_command('run_worker', once=True, stdout=StringIO())
+        self.assertEqual(len(FLAKY_CALLS), 3)
+        self.assertEqual(BackgroundTask.objects.filter(status='DONE').count(), 3)
+
+    def test_run_worker_recovers_tasks_abandoned_while_it_runs(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from django.utils import timezone
+        from jobs.models import BackgroundTask
+        from jobs.tasks import enqueue
+
+        # Claimed by a live worker when this one starts, so the startup check leaves it alone
+        orphan = enqueue('jobs.tests.flaky_task', fail_times=0)
+        BackgroundTask.objects.filter(pk=orphan.pk).update(status='RUNNING', attempts=1, locked_at=timezone.now())
+        enqueue('jobs.tests.abandon_task', task_id=orphan.pk)
+
+        out = StringIO()
+        call_command('run_worker', once=True, stale_check_interval=0, stdout=out)
+        orphan.refresh_from_db()
+        self.assertEqual(orphan.status, 'DONE')
+        self.assertEqual(len(FLAKY_CALLS), 1)
+        self.assertIn('Requeued 1 task(s)', out.getvalue())
+
+    def test_stale_tasks_are_requeued_until_out_of_attempts(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from jobs.models import BackgroundTask
+        from jobs.tasks import enqueue, requeue_stale_tasks
+
+        crashed = enqueue('jobs.tests.flaky_task', max_attempts=2, fail_times=0)
+        retry = enqueue('jobs.tests.flaky_task', max_attempts=2, fail_times=0)
+        long_ago = timezone.now() - timedelta(hours=1)
+        BackgroundTask.objects.filter(pk=crashed.pk).update(status='RUNNING', attempts=2, locked_at=long_ago)
+        BackgroundTask.objects.filter(pk=retry.pk).update(status='RUNNING', attempts=1, locked_at=long_ago)
+
+        self.assertEqual(requeue_stale_tasks(), (1, 1))
+        crashed.refresh_from_db()
+        retry.refresh_from_db()
+        self.assertEqual(crashed.status, 'FAILED')
+        self.assertIn('Worker died', crashed.last_error)
+        self.assertEqual(retry.status, 'PENDING')
+
+    def test_otp_is_sent_by_the_worker_and_not_kept(self):
+        from django.contrib import admin
+        from jobs.models import BackgroundTask
+        from jobs.tasks import run_pending
+        from users.utils import send_otp_to_phone
+
+        with self.settings(DEBUG=True, MSG91_AUTH_KEY='', MSG91_TEMPLATE_ID=''):
+            self.assertTrue(send_otp_to_phone('9876543210', '424242'))
+            task = BackgroundTask.objects.get()
+            self.assertTrue(task.sensitive)
+            self.assertIn('payload', admin.site._registry[BackgroundTask].get_exclude(None, task))
+            self.assertEqual(run_pending(), (1, 0))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.payload), ('DONE', {}))
+
+    def test_password_reset_email_is_sent_by_the_worker(self):
+        from django.core import mail
+        from jobs.tasks import run_pending
+
+        User.objects.create(username='forgetful', email='forgetful@example.com')
+        response = APIClient().post('/api/users/password-reset/', {'email': 'forgetful@example.com'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+
+        self.assertEqual(run_pending(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('reset-password?uid=', mail.outbox[0].body)
+
+
+class BulkNotificationTestCase(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        self.parent = User.objects.create(username='bulk_parent', role='PARENT')
+        self.job = JobPost.objects.create(posted_by=self.parent, student_name='Student', class_grade='Class 8')
+        self.completed_at = timezone.now() - timedelta(hours=2)
+
+    def add_applications(self, count, job=None, **fields):
+        apps = []
+        for _ in range(count):
+            user = User.objects.create(username=f'bulk_tutor_{User.objects.count()}', role='TEACHER')
+            tutor, _ = TutorProfile.objects.get_or_create(user=user)
+            apps.append(Application.objects.create(job=job or self.job, tutor=tutor, **fields))
+        return apps
+
+    def test_notify_demo_feedback_query_count_is_constant(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from jobs.admin_models import Notification
+
+        demo = {'demo_status': 'COMPLETED', 'demo_completed_at': self.completed_at}
+        self.add_applications(2, **demo)
+        with CaptureQueriesContext(connection) as small:
+            call_command('notify_demo_feedback', stdout=StringIO())
+
+        self.add_applications(8, **demo)
+        with CaptureQueriesContext(connection) as large:
+            call_command('notify_demo_feedback', stdout=StringIO())
+
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Notification.objects.filter(user=self.parent).count(), 10)
+        self.assertFalse(Application.objects.filter(parent_notified_for_review=False).exists())
+
+    def test_confirming_a_tutor_notifies_the_other_applicants_in_bulk(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from jobs.admin_models import Notification
+
+        client = APIClient()
+        client.force_authenticate(self.parent)
+        query_counts = []
+        # The first confirm of the day also creates DailyMetric rows, so compare the later two
+        for applicants in (2, 3, 8):
+            job = JobPost.objects.create(posted_by=self.parent, student_name='Student', class_grade='Class 8')
+            hired, *others = self.add_applications(applicants, job=job, demo_status='COMPLETED')
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(f'/api/jobs/parent/application-action/{hired.pk}/confirm/')
+            self.assertEqual(response.status_code, 200)
+            query_counts.append(len(queries))
+
+            notified = Notification.objects.filter(title='Position Filled', related_job=job)
+            self.assertEqual(set(notified.values_list('user_id', flat=True)), {app.tutor.user_id for app in others})
+        self.assertEqual(query_counts[1], query_counts[2])
+
+
+class NotificationStreamTestCase(TestCase):
+    """Drives the SSE view through Django's ASGI test client."""
+
+    def setUp(self):
+        self.user = User.objects.create(username='streamer', role='PARENT')
+
+    def ticket(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return client.post('/api/jobs/notifications/stream/ticket/').data['ticket']
+
+    async def test_stream_pushes_new_notifications_and_unread_deltas(self):
+        import json
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient
+        from jobs.utils import send_notification
+
+        def notify_and_read():
+            with self.captureOnCommitCallbacks(execute=True):
+                notification = send_notification(self.user, 'Demo booked', 'Tomorrow 5pm', 'SYSTEM')
+            client = APIClient()
+            client.force_authenticate(self.user)
+            with self.captureOnCommitCallbacks(execute=True):
+                client.put(f'/api/jobs/notifications/{notification.pk}/read/')
+
+        await sync_to_async(send_notification)(self.user, 'Earlier', 'Unread', 'SYSTEM')
+        ticket = await sync_to_async(self.ticket)()
+        response = await AsyncClient().get(f'/api/jobs/notifications/stream/?ticket={ticket}')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+
+        def parse(chunk):
+            event, data = chunk.decode().strip().split('\n')
+            return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+        self.assertEqual(parse(await anext(stream)), ('unread', {'unread_count': 1}))
+        await sync_to_async(notify_and_read)()
+        event, data = parse(await anext(stream))
+        self.assertEqual((event, data['notification']['title'], data['unread_delta']), ('notification', 'Demo booked', 1))
+        self.assertEqual(parse(await anext(stream)), ('unread', {'unread_delta': -1}))
+        await stream.aclose()
+
+    async def test_stream_ends_and_unsubscribes_after_max_lifetime(self):
+        from unittest import mock
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient
+        from jobs.notification_stream import broker
+        from jobs.notification_views import NotificationStreamView
+
+        # Nobody reads the stream, like a closed tab: the server keeps pulling until it ends
+        with mock.patch.object(NotificationStreamView, 'MAX_STREAM_SECONDS', 0.2), \
+                mock.patch.object(NotificationStreamView, 'KEEPALIVE_SECONDS', 0.05):
+            ticket = await sync_to_async(self.ticket)()
+            response = await AsyncClient().get(f'/api/jobs/notifications/stream/?ticket={ticket}')
+            chunks = [chunk async for chunk in response.streaming_content]
+        self.assertTrue(chunks[0].startswith(b'event: unread'))
+        self.assertIn(b': keep-alive\n\n', chunks)
+        self.assertNotIn(self.user.id, broker.subscribers)
+
+    async def test_stream_requires_a_valid_token(self):
+        from django.test import AsyncClient
+        response = await AsyncClient().get('/api/jobs/notifications/stream/?ticket=bogus')
+        self.assertEqual(response.status_code, 401)
+        response = await AsyncClient().get('/api/jobs/notifications/stream/', HTTP_AUTHORIZATION='Bearer bogus')
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_ticket_is_single_use_and_short_lived(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from rest_framework_simplejwt.tokens import AccessToken
+        from jobs.admin_models import NotificationStreamTicket
+        from jobs.notification_stream import TICKET_SECONDS, redeem_stream_ticket
+
+        # Access tokens are not accepted in the query string, where they would be logged
+        response = self.client.get(f'/api/jobs/notifications/stream/?token={AccessToken.for_user(self.user)}')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(APIClient().post('/api/jobs/notifications/stream/ticket/').status_code, 401)
+
+        ticket = self.ticket()
+        self.assertEqual(redeem_stream_ticket(ticket), self.user)
+        self.assertIsNone(redeem_stream_ticket(ticket))
+
+        expired = self.ticket()
+        NotificationStreamTicket.objects.filter(pk=expired).update(
+            created_at=timezone.now() - timedelta(seconds=TICKET_SECONDS + 1))
+        self.assertIsNone(redeem_stream_ticket(expired))
+        # Issuing a ticket clears expired ones
+        self.ticket()
+        self.assertFalse(NotificationStreamTicket.objects.filter(pk=expired).exists())
+
+
+class NotificationCounterTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='badge_user', role='PARENT')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def unread(self):
+        return self.client.get('/api/jobs/notifications/unread-count/').data['unread_count']
+
+    def test_counter_follows_create_read_bulk_and_delete(self):
+        from jobs.admin_models import Notification
+        from jobs.utils import send_notification, send_notifications_bulk
+
+        first = send_notification(self.user, 'One', 'msg', 'SYSTEM')
+        send_notifications_bulk({'user': self.user, 'title': f'Bulk {i}', 'message': 'msg', 'notification_type': 'SYSTEM'}
+                                for i in range(4))
+        self.assertEqual(self.unread(), 5)
+
+        self.client.put(f'/api/jobs/notifications/{first.pk}/read/')
+        self.client.put(f'/api/jobs/notifications/{first.pk}/read/')  # already read: no change
+        self.assertEqual(self.unread(), 4)
+
+        ids = list(Notification.objects.filter(title__startswith='Bulk').values_list('id', flat=True)[:2])
+        with self.assertNumQueries(4):  # UPDATE notifications, INSERT/UPDATE counter, SELECT count
+            response = self.client.post(f"/api/jobs/notifications/mark-read/?ids={','.join(map(str, ids))}")
+        self.assertEqual(response.data, {'updated': 2, 'unread_count': 2})
+
+        Notification.objects.filter(is_read=False).first().delete()
+        self.assertEqual(self.unread(), 1)
+
+        response = self.client.post('/api/jobs/notifications/mark-all-read/')
+        self.assertEqual(response.data, {'updated': 1, 'unread_count': 0})
+
+    def test_reconcile_repairs_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from jobs.admin_models import Notification
+        from jobs.utils import send_notification
+
+        for i in range(3):
+            send_notification(self.user, f'N{i}', 'msg', 'SYSTEM')
+        Notification.objects.filter(title='N0').update(is_read=True)  # bypasses the counter
+        self.assertEqual(self.unread(), 3)
+        call_command('reconcile_notification_counts', stdout=StringIO())
+        self.assertEqual(self.unread(), 2)
+
+
+class ArchiveOldRowsTestCase(TestCase):
+    def setUp(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from jobs.admin_models import Notification
+        from jobs.utils import send_notification
+        from wallet.models import Transaction, Wallet
+
+        self.user = User.objects.create(username='archive_user', role='PARENT')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        old = timezone.now() - timedelta(days=400)
+
+        for i in range(5):
+            send_notification(self.user, f'Old {i}', 'msg', 'SYSTEM')
+        Notification.objects.update(created_at=old)
+        Notification.objects.exclude(title='Old 0').update(is_read=True)  # 'Old 0' stays unread
+        send_notification(self.user, 'New', 'msg', 'SYSTEM')
+
+        wallet = Wallet.objects.create(user=self.user)
+        for amount in (10, 20, 30):
+            wallet.credit(amount, 'Top-up')
+        Transaction.objects.update(created_at=old)
+        wallet.credit(40, 'Recent top-up')
+
+    def test_archive_moves_closed_rows_and_include_archived_lists_them(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from jobs.archive_models import NotificationArchive
+        from jobs.notification_counts import unread_count
+        from wallet.models import Transaction, TransactionArchive
+
+        metrics_before = list(DailyMetric.objects.values_list('kind', 'count', 'amount'))
+        unread_before = unread_count(self.user)
+        call_command('archive_old_rows', '--days', '365', '--batch-size', '2', stdout=StringIO())
+
+        # Only read notifications move; counters and rollups are untouched
+        self.assertEqual(NotificationArchive.objects.count(), 4)
+        self.assertEqual(sorted(self.user.notifications.values_list('title', flat=True)), ['New', 'Old 0'])
+        self.assertEqual(unread_count(self.user), unread_before)
+        self.assertEqual(TransactionArchive.objects.count(), 3)
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(list(DailyMetric.objects.values_list('kind', 'count', 'amount')), metrics_before)
+
+        # Re-running finds nothing left to move
+        call_command('archive_old_rows', '--days', '365', stdout=StringIO())
+        self.assertEqual(NotificationArchive.objects.count(), 4)
+
+        live = self.client.get('/api/jobs/notifications/')
+        self.assertEqual(live.data['count'], 2)
+        combined = self.client.get('/api/jobs/notifications/?include_archived=1')
+        self.assertEqual(combined.data['count'], 6)
+        self.assertEqual(combined.data['results'][0]['title'], 'New')
+        self.assertEqual(self.client.get('/api/jobs/notifications/?include_archived=1&cursor=').status_code, 400)
+
+        transactions = self.client.get('/api/wallet/transactions/?include_archived=1')
+        self.assertEqual(transactions.data['count'], 4)
+        self.assertEqual(transactions.data['results'][-1]['description'], 'Top-up')
+
+    def test_jsonl_export(self):
+        import gzip
+        import os
+        import json
+        import tempfile
+        from io import StringIO
+        from django.core.management import CommandError, call_command
+        from jobs.admin_models import Notification
+        from jobs.archive_models import NotificationArchive
+        from wallet.models import Transaction, TransactionArchive
+
+        with tempfile.TemporaryDirectory() as directory:
+            call_command('archive_old_rows', '--policy', 'notifications', '--days', '365',
+                         '--batch-size', '2', '--to-jsonl', directory, stdout=StringIO())
+            [name] = os.listdir(directory)
+            with gzip.open(os.path.join(directory, name), 'rt') as fh:
+                rows = [json.loads(line) for line in fh]
+
+            self.assertEqual(sorted(row['title'] for row in rows), ['Old 1', 'Old 2', 'Old 3', 'Old 4'])
+            self.assertEqual(Notification.objects.count(), 2)
+            self.assertFalse(NotificationArchive.objects.exists())
+
+            # Wallet history must stay in the database for the ledger check and wallet totals
+            with self.assertRaisesMessage(CommandError, 'not allowed for: transactions'):
+                call_command('archive_old_rows', '--policy', 'transactions', '--days', '365',
+                             '--to-jsonl', directory, stdout=StringIO())
+            call_command('archive_old_rows', '--days', '365', '--to-jsonl', directory, stdout=StringIO())
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(TransactionArchive.objects.count(), 3)
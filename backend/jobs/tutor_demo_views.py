@@ -8,6 +8,7 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
 from .models import Application
+from .prefetch import prefetch_applications
 from .utils import send_notification
 from users.models import TutorProfile
 
@@ -83,7 +84,8 @@ class TutorScheduledDemosView(APIView):
             is_confirmed=True
         ).exclude(
             demo_status='REJECTED'
-        ).select_related('job', 'tutor').order_by('-demo_date')
+        )
+        demos = prefetch_applications(demos).order_by('-demo_date')
 
         serializer = ApplicationSerializer(demos, many=True)
         return Response({
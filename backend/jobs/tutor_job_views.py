@@ -10,10 +10,11 @@ from django.shortcuts import get_object_or_404
 
 from .models import JobPost, Application
 from core.roles import ADMIN_ROLES, COUNSELLOR, SUPERADMIN, TUTOR_ADMIN
+from .prefetch import prefetch_applications, prefetch_jobs
 from .serializers import JobPostSerializer, TutorJobPostSerializer, ApplicationSerializer
 from .utils import assign_job_to_admin, send_notification
 from users.models import TutorProfile, User
-from wallet.models import Wallet
+from wallet.snapshot import check_credits
 
 import logging
 
@@ -62,9 +63,9 @@ class MyJobPostsView(generics.ListAPIView):
 
     def get_queryset(self):
         from django.db.models import Q
-        return JobPost.objects.filter(
+        return prefetch_jobs(JobPost.objects.filter(
             Q(posted_by=self.request.user) | Q(parent=self.request.user)
-        ).select_related('posted_by', 'parent', 'assigned_admin').order_by('-created_at')
+        ), self.request.user).order_by('-created_at')
 
 
 class TutorApplicationsView(APIView):
@@ -77,9 +78,9 @@ class TutorApplicationsView(APIView):
 
         try:
             tutor_profile = TutorProfile.objects.get(user=request.user)
-            applications = Application.objects.filter(
+            applications = prefetch_applications(Application.objects.filter(
                 tutor=tutor_profile
-            ).select_related('job').order_by('-created_at')
+            )).order_by('-created_at')
 
             status_filter = request.query_params.get('status')
             if status_filter:
@@ -137,11 +138,11 @@ class JobApplicationCreateView(APIView):
             }, status=400)
 
         # Block applying if teacher has 0 credits
-        wallet, _ = Wallet.objects.get_or_create(user=request.user)
-        if wallet.balance < Decimal('1'):
+        has_credit, wallet = check_credits(request.user, Decimal('1'))
+        if not has_credit:
             return Response({
                 "error": "You have 0 rejection credits. Purchase credits to apply for jobs.",
-                "credits": float(wallet.balance),
+                "credits": float(wallet['balance']),
             }, status=402)
 
         if Application.objects.filter(job=job, tutor=tutor_profile).exists():
@@ -178,6 +179,6 @@ class JobApplicantsView(generics.ListAPIView):
         if not (is_owner or is_admin):
             return Application.objects.none()
             
-        return Application.objects.filter(
+        return prefetch_applications(Application.objects.filter(
             job=job
-        ).select_related('tutor__user').order_by('-created_at')
+        ), user).order_by('-created_at')
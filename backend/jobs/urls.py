@@ -53,6 +53,10 @@ from .parent_job_views import (
 from .notification_views import (
     NotificationListView,
     MarkNotificationReadView,
+    BulkMarkNotificationsReadView,
+    UnreadNotificationCountView,
+    NotificationStreamView,
+    NotificationStreamTicketView,
 )
 
 # Master data views
@@ -137,6 +141,11 @@ urlpatterns = [
     # Notification endpoints
     path('notifications/', NotificationListView.as_view(), name='user-notifications'),
     path('notifications/<int:pk>/read/', MarkNotificationReadView.as_view(), name='mark-notification-read'),
+    path('notifications/stream/', NotificationStreamView.as_view(), name='notification-stream'),
+    path('notifications/stream/ticket/', NotificationStreamTicketView.as_view(), name='notification-stream-ticket'),
+    path('notifications/mark-read/', BulkMarkNotificationsReadView.as_view(), name='mark-notifications-read'),
+    path('notifications/mark-all-read/', BulkMarkNotificationsReadView.as_view(mark_all=True), name='mark-all-notifications-read'),
+    path('notifications/unread-count/', UnreadNotificationCountView.as_view(), name='unread-notification-count'),
 
     # Master Data endpoints
     path('master/', PublicMasterDataView.as_view(), name='master-data'),
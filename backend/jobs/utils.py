@@ -1,76 +1,155 @@
 """
 Utility functions for job posting workflow
 """
+from collections import Counter
 from django.contrib.auth import get_user_model
 from core.roles import COUNSELLOR, SUPERADMIN, TUTOR_ADMIN
-from django.db.models import Count, Q, CharField
-from django.db.models.functions import Cast
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, CharField
+from django.db.models.functions import Cast, Greatest
 from django.utils import timezone
-import random
 import logging
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
-# Centralized Subject Synonyms for both Job and Tutor search
-SUBJECT_SYNONYMS = {
-    'Mathematics': ['Mathematics', 'Maths', 'Math', 'mathematics', 'maths', 'math'],
-    'Physics': ['Physics', 'physics'],
-    'Chemistry': ['Chemistry', 'chemistry'],
-    'Biology': ['Biology', 'biology', 'Bio'],
-    'Science': ['Science', 'science', 'General Science'],
-    'English': ['English', 'english', 'English Language', 'English Literature'],
-    'Hindi': ['Hindi', 'hindi'],
-    'Sanskrit': ['Sanskrit', 'sanskrit'],
-    'Social Science': ['Social Science', 'SST', 'Social Studies', 'social science'],
-    'History': ['History', 'history'],
-    'Geography': ['Geography', 'geography'],
-    'Civics': ['Civics', 'civics', 'Civic'],
-    'Political Science': ['Political Science', 'Pol Science', 'pol science'],
-    'Computer Science': ['Computer Science', 'Computer', 'Computers', 'CS', 'computer science', 'computer'],
-    'Information Technology': ['Information Technology', 'IT', 'information technology'],
-    'Coding': ['Coding', 'coding', 'Programming'],
-    'Accountancy': ['Accountancy', 'Accounts', 'accountancy', 'accounts', 'Accounting'],
-    'Business Studies': ['Business Studies', 'business studies', 'Business'],
-    'Economics': ['Economics', 'economics', 'Eco'],
-    'Commerce': ['Commerce', 'commerce'],
-    'EVS (Environmental Studies)': ['EVS', 'Environmental Studies', 'Environmental Science', 'evs'],
-    'Psychology': ['Psychology', 'psychology'],
-    'Sociology': ['Sociology', 'sociology'],
-    'Physical Education': ['Physical Education', 'physical education', 'PE'],
-    'Regional Languages': ['Regional Languages'],
-}
+# Subject/class vocabulary lives in jobs/vocabulary.py; re-exported for existing imports
+from .vocabulary import (  # noqa: F401
+    ALL_SUBJECTS_KEY, SUBJECT_SYNONYMS, class_index_keys, normalize_search_key,
+    subject_index_keys, subject_match_pattern, subject_search_keys,
+)
+
 
 def filter_by_subject(queryset, subject_name, field_name='subjects'):
     """
     Apply robust subject filtering to a queryset.
     Handles:
     1. JSON list field (using Cast to CharField)
-    2. Case-insensitive partial matching (icontains)
+    2. Case-insensitive partial matching (a single iregex)
     3. Synonyms (e.g. Maths -> Mathematics)
     4. "All Subjects" catch-all
+
+    This scans every row. Tutor and job search use the normalized indexes in
+    users/search_index.py and jobs/search_index.py instead; this is kept for
+    ad-hoc querysets and as the baseline in benchmark_job_search.
     """
     if not subject_name:
         return queryset
 
-    # Get synonyms if they exist
-    synonyms = SUBJECT_SYNONYMS.get(subject_name, [subject_name])
-    
     # Cast the JSON field to CharField if it hasn't been annotated yet
     field_str = f"{field_name}_str"
     if not hasattr(queryset, 'query') or field_str not in str(queryset.query):
         queryset = queryset.annotate(**{field_str: Cast(field_name, CharField())})
     
-    # Build OR query for all synonyms + "All Subjects"
-    # Also include tutors with no subject data populated (empty lists/nulls) if searching
-    subject_q = Q(**{f"{field_str}__icontains": "All Subjects"})
-    
-    for syn in synonyms:
-        subject_q |= Q(**{f"{field_str}__icontains": syn})
-        
-    return queryset.filter(subject_q)
+    # One case-insensitive regex over all synonyms + "All Subjects"
+    # instead of an OR of one icontains per synonym
+    return queryset.filter(**{f"{field_str}__iregex": subject_match_pattern(subject_name)})
+
+
+
+# AdminTask types backing each AdminProfile workload counter
+WORKLOAD_COUNTERS = {
+    'JOB_APPROVAL': 'pending_job_count',
+    'KYC_VERIFICATION': 'pending_kyc_count',
+}
+OPEN_TASK_STATUSES = ('PENDING', 'IN_PROGRESS')
+
+
+def _claim_least_loaded(admin_profiles, counter):
+    """
+    Pick the AdminProfile with the lowest ``counter`` and increment it with F(),
+    inside one transaction holding the row lock.
+
+    On PostgreSQL the candidate rows are read with SELECT ... FOR UPDATE SKIP LOCKED,
+    so concurrent submissions each take a different admin instead of all reading the
+    same minimum. If every candidate is locked we wait for the least-loaded one.
+    Returns the profile (with ``user`` loaded) or None if there are no candidates.
+    """
+    ordered = admin_profiles.select_related('user').order_by(counter, 'id')
+    with transaction.atomic():
+        profile = None
+        if connection.features.has_select_for_update_skip_locked:
+            profile = ordered.select_for_update(skip_locked=True, of=('self',)).first()
+        if profile is None:
+            profile = ordered.select_for_update(of=('self',)).first()
+        if profile is None:
+            return None
+        type(profile).objects.filter(pk=profile.pk).update(**{counter: F(counter) + 1})
+    return profile
+
 
+def _increment_workload(admin_user, counter):
+    """Atomically bump a workload counter for an admin picked by sticky assignment."""
+    from .admin_models import AdminProfile
+    AdminProfile.objects.filter(user=admin_user).update(**{counter: F(counter) + 1})
+
+
+def _least_loaded_user(admins, task_type):
+    """Fallback for admins without an AdminProfile: fewest open tasks of ``task_type``, oldest account first."""
+    return admins.annotate(
+        open_tasks=Count('admin_tasks', filter=Q(
+            admin_tasks__task_type=task_type, admin_tasks__status__in=OPEN_TASK_STATUSES
+        ))
+    ).order_by('open_tasks', 'id').first()
+
+
+def release_workload(tasks):
+    """
+    Decrement the workload counters for the given open AdminTask rows (dicts with
+    admin_id and task_type). Counters never go below zero.
+    """
+    from .admin_models import AdminProfile
+    released = Counter(
+        (task['admin_id'], WORKLOAD_COUNTERS[task['task_type']])
+        for task in tasks if task['task_type'] in WORKLOAD_COUNTERS
+    )
+    for (admin_id, counter), amount in released.items():
+        AdminProfile.objects.filter(user_id=admin_id).update(**{counter: Greatest(F(counter) - amount, 0)})
+
+
+def close_admin_tasks(tasks, status='COMPLETED'):
+    """
+    Close the open tasks in ``tasks`` (an AdminTask queryset) and release their
+    workload counters in the same transaction. Returns the number of tasks closed.
+    """
+    from .admin_models import AdminTask
+    with transaction.atomic():
+        open_tasks = list(
+            tasks.filter(status__in=OPEN_TASK_STATUSES).select_for_update().values('id', 'admin_id', 'task_type')
+        )
+        if not open_tasks:
+            return 0
+        AdminTask.objects.filter(id__in=[t['id'] for t in open_tasks]).update(
+            status=status, completed_at=timezone.now()
+        )
+        release_workload(open_tasks)
+    return len(open_tasks)
+
+
+def reconcile_workload_counters(dry_run=False):
+    """
+    Recompute every AdminProfile counter from its open AdminTask rows.
+    Returns a list of (username, counter, old value, new value) for the rows that drifted.
+    """
+    from .admin_models import AdminProfile, AdminTask
+    actual = {
+        (row['admin_id'], WORKLOAD_COUNTERS[row['task_type']]): row['total']
+        for row in AdminTask.objects.filter(
+            status__in=OPEN_TASK_STATUSES, task_type__in=WORKLOAD_COUNTERS
+        ).values('admin_id', 'task_type').annotate(total=Count('id'))
+    }
+    changes = []
+    for profile in AdminProfile.objects.select_related('user').order_by('id'):
+        updates = {}
+        for counter in WORKLOAD_COUNTERS.values():
+            expected = actual.get((profile.user_id, counter), 0)
+            if getattr(profile, counter) != expected:
+                changes.append((profile.user.username, counter, getattr(profile, counter), expected))
+                updates[counter] = expected
+        if updates and not dry_run:
+            AdminProfile.objects.filter(pk=profile.pk).update(**updates)
+    return changes
 
 
 def assign_job_to_admin(job_post):
@@ -96,13 +175,7 @@ def assign_job_to_admin(job_post):
             logger.info(f"Sticky Assignment: Re-assigning job {job_post.id} to previous admin {assigned_admin.username}")
             
             # Update counter for the sticky admin
-            try:
-                profile = AdminProfile.objects.get(user=assigned_admin)
-                profile.pending_job_count += 1
-                profile.save()
-            except AdminProfile.DoesNotExist:
-                pass
-                
+            _increment_workload(assigned_admin, 'pending_job_count')
             return _finalize_job_assignment(job_post, assigned_admin)
             
         # Check prior enquiries linked by phone if parent has phone
@@ -116,13 +189,7 @@ def assign_job_to_admin(job_post):
                 assigned_admin = prior_enquiry.assigned_admin
                 logger.info(f"Sticky Assignment: Job {job_post.id} assigned to admin {assigned_admin.username} based on prior Enquiry")
                 
-                try:
-                    profile = AdminProfile.objects.get(user=assigned_admin)
-                    profile.pending_job_count += 1
-                    profile.save()
-                except AdminProfile.DoesNotExist:
-                    pass
-                    
+                _increment_workload(assigned_admin, 'pending_job_count')
                 return _finalize_job_assignment(job_post, assigned_admin)
                 
     # 2. Fallback to Workload Balanced Assignment
@@ -132,28 +199,22 @@ def assign_job_to_admin(job_post):
         Q(department='COUNSELLOR') | Q(department='SUPERADMIN'),
         is_available=True,
         user__is_active=True
-    ).order_by('pending_job_count')
-    
-    if not admin_profiles.exists():
+    )
+    # Pick the one with least job count and increment its counter atomically
+    chosen_profile = _claim_least_loaded(admin_profiles, 'pending_job_count')
+
+    if chosen_profile is None:
         # Fallback to any active admin if no specific ops are available
         logger.warning("No COUNSELLOR admins available. Falling back to any admin.")
-        admins = User.objects.filter(role__in=['COUNSELLOR', 'TUTOR_ADMIN'], is_active=True)
-        if not admins.exists():
+        assigned_admin = _least_loaded_user(
+            User.objects.filter(role__in=['COUNSELLOR', 'TUTOR_ADMIN'], is_active=True), 'JOB_APPROVAL'
+        )
+        if assigned_admin is None:
             logger.error("No active admins available for job assignment")
             raise Exception("No active admins available")
-        assigned_admin = random.choice(admins)
     else:
-        # Pick the one with least job count
-        # (Already sorted by pending_job_count asc)
-        min_count = admin_profiles.first().pending_job_count
-        candidates = admin_profiles.filter(pending_job_count=min_count)
-        chosen_profile = random.choice(candidates)
         assigned_admin = chosen_profile.user
-        
-        # Increment counter
-        chosen_profile.pending_job_count += 1
-        chosen_profile.save()
-    
+
     return _finalize_job_assignment(job_post, assigned_admin)
 
 def _finalize_job_assignment(job_post, assigned_admin):
@@ -213,6 +274,47 @@ def send_notification(user, title, message, notification_type, related_job=None,
     return notification
 
 
+def send_notifications_bulk(notifications, batch_size=500):
+    """
+    Create many in-app notifications with one INSERT per ``batch_size`` rows.
+
+    Args:
+        notifications: Iterable of dicts taking send_notification's keyword
+            arguments (user or user_id, title, message, notification_type and
+            optionally related_job / related_kyc). Consumed lazily, chunk by chunk.
+        batch_size: Rows per bulk_create
+
+    Returns the number of notifications created. post_save does not fire for
+    these rows, so the unread counters and SSE streams are updated here: two
+    counter queries per batch, however many users it covers.
+    """
+    from .admin_models import Notification
+
+    created = 0
+    batch = []
+    for fields in notifications:
+        batch.append(Notification(**fields))
+        if len(batch) >= batch_size:
+            created += _create_notifications(batch)
+            batch = []
+    if batch:
+        created += _create_notifications(batch)
+
+    logger.info(f"{created} notifications created in bulk")
+    return created
+
+
+def _create_notifications(batch):
+    from .admin_models import Notification
+    from .notification_counts import adjust_unread_counts
+    from .notification_stream import publish_notifications
+
+    Notification.objects.bulk_create(batch)
+    adjust_unread_counts(Counter(n.user_id for n in batch if not n.is_read))
+    publish_notifications(batch)
+    return len(batch)
+
+
 def assign_kyc_to_admin(kyc_record):
     """
     Assign KYC verification to the TUTOR_ADMIN or SUPERADMIN with the
@@ -235,31 +337,20 @@ def assign_kyc_to_admin(kyc_record):
             user__role__in=[TUTOR_ADMIN, SUPERADMIN],
             is_available=True,
             user__is_active=True
-        ).order_by('pending_kyc_count')
-
-        logger.info("TUTOR_ADMIN/SUPERADMIN admin profiles found: %s", admin_profiles.count())
-
-        if admin_profiles.exists():
-            min_count = admin_profiles.first().pending_kyc_count
-            candidates = list(admin_profiles.filter(pending_kyc_count=min_count))
-            chosen_profile = random.choice(candidates)
+        )
+        chosen_profile = _claim_least_loaded(admin_profiles, 'pending_kyc_count')
+        if chosen_profile is not None:
             assigned_admin = chosen_profile.user
-            chosen_profile.pending_kyc_count += 1
-            chosen_profile.save()
     except Exception as e:
         logger.warning("AdminProfile lookup failed: %s", e)
 
     # Try 2: Fallback – any active TUTOR_ADMIN or SUPERADMIN user
     if not assigned_admin:
         try:
-            admins = list(User.objects.filter(
-                role__in=[TUTOR_ADMIN, SUPERADMIN],
-                is_active=True
-            ))
-            logger.info("Fallback admins found: %s — %s",
-                len(admins), [(a.username, a.role) for a in admins])
-            if admins:
-                assigned_admin = random.choice(admins)
+            assigned_admin = _least_loaded_user(
+                User.objects.filter(role__in=[TUTOR_ADMIN, SUPERADMIN], is_active=True), 'KYC_VERIFICATION'
+            )
+            logger.info("Fallback admin: %s", assigned_admin.username if assigned_admin else None)
         except Exception as e:
             logger.warning("Fallback admin lookup failed: %s", e)
 
@@ -278,15 +369,18 @@ def assign_kyc_to_admin(kyc_record):
     # Create AdminTask and notify if admin found
     if assigned_admin:
         try:
-            AdminTask.objects.get_or_create(
+            _, created = AdminTask.objects.get_or_create(
                 admin=assigned_admin,
                 related_kyc=kyc_record,
+                status='PENDING',
                 defaults={
                     'task_type': 'KYC_VERIFICATION',
-                    'status': 'PENDING',
                     'notes': f"KYC for {kyc_record.tutor.full_name or kyc_record.tutor.user.username}"
                 }
             )
+            if not created:
+                # Already pending with this admin; undo the counter bump from the pick above.
+                release_workload([{'admin_id': assigned_admin.id, 'task_type': 'KYC_VERIFICATION'}])
             send_notification(
                 user=assigned_admin,
                 title="New KYC Verification Request",
@@ -345,26 +439,24 @@ def assign_enquiry_to_admin(enquiry):
 def _fallback_enquiry_assignment(enquiry):
     from .admin_models import AdminProfile
     from users.models import User
-    import random
-    
-    # Get active COUNSELLOR or SUPERADMIN
-    admin_profiles = AdminProfile.objects.filter(
+
+    # Get active COUNSELLOR or SUPERADMIN with the fewest pending jobs.
+    # Enquiries have no AdminTask, so no counter is incremented here.
+    chosen_profile = AdminProfile.objects.filter(
         Q(department='COUNSELLOR') | Q(department='SUPERADMIN'),
         is_available=True,
         user__is_active=True
-    ).order_by('pending_job_count')
-    
-    if not admin_profiles.exists():
-        admins = User.objects.filter(role__in=['COUNSELLOR', 'TUTOR_ADMIN'], is_active=True)
-        if not admins.exists():
+    ).select_related('user').order_by('pending_job_count', 'id').first()
+
+    if chosen_profile is None:
+        assigned_admin = _least_loaded_user(
+            User.objects.filter(role__in=['COUNSELLOR', 'TUTOR_ADMIN'], is_active=True), 'JOB_APPROVAL'
+        )
+        if assigned_admin is None:
             return None
-        assigned_admin = random.choice(admins)
     else:
-        min_count = admin_profiles.first().pending_job_count
-        candidates = admin_profiles.filter(pending_job_count=min_count)
-        chosen_profile = random.choice(candidates)
         assigned_admin = chosen_profile.user
-        
+
     enquiry.assigned_admin = assigned_admin
     enquiry.save()
     logger.info(f"Assigned Enquiry {enquiry.id} to admin {assigned_admin.username}")
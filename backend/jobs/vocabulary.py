@@ -0,0 +1,225 @@
+"""
+Shared subject/class vocabulary for search and the tutor importer.
+
+SUBJECT_SYNONYMS and CLASS_NORMALIZE are compiled once, at import, into one
+alternation regex each. ``scan_vocabulary(text)`` lower-cases the text once
+and returns both the canonical subjects and the normalized classes it
+mentions, so neither search nor import loops over every synonym/pattern for
+each token. (Case-sensitive patterns over pre-lowered text run several times
+faster in ``re`` than IGNORECASE ones.)
+
+Each half keeps the semantics its callers always had:
+  - subjects match on word boundaries and do not overlap, longest first, so
+    "Computer Science" is not also read as "Science";
+  - classes match as plain substrings anywhere, like the importer's old
+    ``raw_class in text`` loop, so "lkg" yields both "lkg" and "kg".
+
+``benchmark_vocabulary`` compares this against the old per-pattern loops.
+"""
+import re
+
+# Centralized Subject Synonyms for both Job and Tutor search
+SUBJECT_SYNONYMS = {
+    'Mathematics': ['Mathematics', 'Maths', 'Math', 'mathematics', 'maths', 'math'],
+    'Physics': ['Physics', 'physics'],
+    'Chemistry': ['Chemistry', 'chemistry'],
+    'Biology': ['Biology', 'biology', 'Bio'],
+    'Science': ['Science', 'science', 'General Science'],
+    'English': ['English', 'english', 'English Language', 'English Literature'],
+    'Hindi': ['Hindi', 'hindi'],
+    'Sanskrit': ['Sanskrit', 'sanskrit'],
+    'Social Science': ['Social Science', 'SST', 'Social Studies', 'social science'],
+    'History': ['History', 'history'],
+    'Geography': ['Geography', 'geography'],
+    'Civics': ['Civics', 'civics', 'Civic'],
+    'Political Science': ['Political Science', 'Pol Science', 'pol science'],
+    'Computer Science': ['Computer Science', 'Computer', 'Computers', 'CS', 'computer science', 'computer'],
+    'Information Technology': ['Information Technology', 'IT', 'information technology'],
+    'Coding': ['Coding', 'coding', 'Programming'],
+    'Accountancy': ['Accountancy', 'Accounts', 'accountancy', 'accounts', 'Accounting'],
+    'Business Studies': ['Business Studies', 'business studies', 'Business'],
+    'Economics': ['Economics', 'economics', 'Eco'],
+    'Commerce': ['Commerce', 'commerce'],
+    'EVS (Environmental Studies)': ['EVS', 'Environmental Studies', 'Environmental Science', 'evs'],
+    'Psychology': ['Psychology', 'psychology'],
+    'Sociology': ['Sociology', 'sociology'],
+    'Physical Education': ['Physical Education', 'physical education', 'PE'],
+    'Regional Languages': ['Regional Languages'],
+}
+
+ALL_SUBJECTS_KEY = 'all subjects'
+
+# Map raw class mentions (as written in Google Form exports) to normalized values
+CLASS_NORMALIZE = {
+    'nursery': 'Nursery/Preschool', 'preschool': 'Nursery/Preschool',
+    'pre school': 'Nursery/Preschool', 'pre-school': 'Nursery/Preschool',
+    'kg': 'Nursery/Preschool', 'lkg': 'Nursery/Preschool', 'ukg': 'Nursery/Preschool',
+    'pre primary': 'Nursery/Preschool', 'pre-primary': 'Nursery/Preschool',
+    'class 1 to 5': 'Class 1-5', 'class 1-5': 'Class 1-5',
+    'class 6 to 8': 'Class 6-8', 'class 6-8': 'Class 6-8',
+    'class 9': 'Class 9', 'class 9th': 'Class 9', '9th': 'Class 9',
+    'class 10': 'Class 10', 'class 10th': 'Class 10', '10th': 'Class 10',
+    'class 11': 'Class 11', 'class 11th': 'Class 11', '11th': 'Class 11',
+    'class 12': 'Class 12', 'class 12th': 'Class 12', '12th': 'Class 12',
+    'iit jee': 'IIT-JEE/NEET', 'iit-jee': 'IIT-JEE/NEET',
+    'neet': 'IIT-JEE/NEET', 'competitive': 'IIT-JEE/NEET',
+    '1st': 'Class 1-5', '2nd': 'Class 1-5', '3rd': 'Class 1-5',
+    '4th': 'Class 1-5', '5th': 'Class 1-5',
+    '6th': 'Class 6-8', '7th': 'Class 6-8', '8th': 'Class 6-8',
+}
+
+# Whole-token subject names used by import_tutors (exact, lower-cased lookups)
+IMPORT_SUBJECT_NORMALIZE = {
+    'maths': 'Mathematics', 'math': 'Mathematics', 'mathematics': 'Mathematics',
+    'physics': 'Physics', 'chemistry': 'Chemistry', 'biology': 'Biology',
+    'science': 'Science', 'english': 'English', 'hindi': 'Hindi',
+    'sanskrit': 'Sanskrit', 'social science': 'Social Science',
+    'sst': 'Social Science', 'social studies': 'Social Science',
+    'history': 'History', 'geography': 'Geography', 'civics': 'Civics',
+    'political science': 'Political Science',
+    'computer science': 'Computer Science', 'computer': 'Computer Science',
+    'computers': 'Computer Science', 'cs': 'Computer Science',
+    'it': 'Information Technology', 'information technology': 'Information Technology',
+    'coding': 'Coding', 'programming': 'Coding',
+    'accountancy': 'Accountancy', 'accounts': 'Accountancy',
+    'accounting': 'Accountancy', 'business studies': 'Business Studies',
+    'business': 'Business Studies', 'economics': 'Economics',
+    'commerce': 'Commerce', 'evs': 'EVS',
+    'environmental studies': 'EVS', 'environmental science': 'EVS',
+    'psychology': 'Psychology', 'sociology': 'Sociology',
+    'physical education': 'Physical Education', 'pe': 'Physical Education',
+    'general knowledge': 'General Knowledge', 'gk': 'General Knowledge',
+    'reasoning': 'Reasoning', 'aptitude': 'Aptitude',
+    'drawing': 'Drawing', 'art': 'Art', 'music': 'Music',
+}
+
+# Lower-cased synonym -> canonical subject name
+_SYNONYM_TO_CANONICAL = {
+    syn.lower(): canonical
+    for canonical, synonyms in SUBJECT_SYNONYMS.items()
+    for syn in synonyms + [canonical]
+}
+
+# A class key found at some position implies every shorter key it starts with
+# ("class 10th" -> "class 10"), since the substring semantics count all of them.
+_CLASS_PREFIX_VALUES = {
+    key: {value for other, value in CLASS_NORMALIZE.items() if key.startswith(other)}
+    for key in CLASS_NORMALIZE
+}
+
+
+def _alternation(words):
+    # Longest first so "Computer Science" wins over "Science"
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+_SUBJECT_RE = re.compile(r'\b(?:' + _alternation(_SYNONYM_TO_CANONICAL) + r')\b')
+_CLASS_KEY_RE = re.compile(_alternation(CLASS_NORMALIZE))
+
+_CLASS_RANGE_RE = re.compile(r'\bclass\s*(\d{1,2})\s*(?:-|to)\s*(\d{1,2})\b', re.IGNORECASE)
+_CLASS_RE = re.compile(r'\bclass\s*(\d{1,2})(?:st|nd|rd|th)?\b', re.IGNORECASE)
+
+
+def normalize_search_key(value, max_length=150):
+    """Collapse whitespace and lower-case a value for use as an index key."""
+    return ' '.join(str(value or '').split()).lower()[:max_length]
+
+
+_CLASS_VALUE_KEYS = {normalize_search_key(value) for value in CLASS_NORMALIZE.values()}
+
+
+def _classes_in(lowered):
+    classes = set()
+    match = _CLASS_KEY_RE.search(lowered)
+    while match:
+        classes |= _CLASS_PREFIX_VALUES[match.group(0)]
+        # Resume one character on, not at match.end(): class keys may overlap
+        match = _CLASS_KEY_RE.search(lowered, match.start() + 1)
+    return classes
+
+
+def scan_vocabulary(text):
+    """
+    Returns (canonical subjects in order of appearance, set of normalized classes)
+    mentioned in ``text``, using SUBJECT_SYNONYMS and CLASS_NORMALIZE.
+    """
+    lowered = str(text or '').lower()
+    subjects = []
+    for synonym in _SUBJECT_RE.findall(lowered):
+        canonical = _SYNONYM_TO_CANONICAL[synonym]
+        if canonical not in subjects:
+            subjects.append(canonical)
+    return subjects, _classes_in(lowered)
+
+
+def class_mentions(text):
+    """Normalized classes mentioned anywhere in ``text`` (CLASS_NORMALIZE substring semantics)."""
+    return _classes_in(str(text or '').lower())
+
+
+def subject_index_keys(value):
+    """
+    Resolve a free-form subject string to its index keys.
+    Returns the canonical names of every synonym mentioned in the string
+    (e.g. "Maths, Physics" -> mathematics, physics) plus the raw normalized
+    value, so subjects outside SUBJECT_SYNONYMS are still searchable.
+    """
+    keys = set()
+    raw = normalize_search_key(value)
+    if raw:
+        keys.add(raw)
+    for synonym in _SUBJECT_RE.findall(str(value or '').lower()):
+        keys.add(normalize_search_key(_SYNONYM_TO_CANONICAL[synonym]))
+    return keys
+
+
+def class_index_keys(value):
+    """
+    Resolve a class/grade string to its index keys.
+    Ranges such as "Class 1-5" are expanded to each individual class so a
+    search for "Class 3" matches a tutor who teaches "Class 1-5".
+    """
+    keys = set()
+    raw = normalize_search_key(value)
+    if raw:
+        keys.add(raw)
+    text = str(value or '')
+    for start, end in _CLASS_RANGE_RE.findall(text):
+        start, end = int(start), int(end)
+        if start <= end <= 12:
+            keys.update(f'class {n}' for n in range(start, end + 1))
+    for number in _CLASS_RE.findall(text):
+        keys.add(f'class {int(number)}')
+    return keys
+
+
+def subject_search_keys(subject_name):
+    """Index keys a subject search should match, including the "All Subjects" catch-all."""
+    if subject_name in SUBJECT_SYNONYMS:
+        keys = {normalize_search_key(subject_name)}
+    else:
+        keys = subject_index_keys(subject_name)
+    keys.add(ALL_SUBJECTS_KEY)
+    return keys
+
+
+def known_subject(value):
+    """True if ``value`` is a subject or synonym from SUBJECT_SYNONYMS (or "All Subjects")."""
+    key = normalize_search_key(value)
+    return key in _SYNONYM_TO_CANONICAL or key == ALL_SUBJECTS_KEY
+
+
+def known_class(value):
+    """True if ``value`` is a normalized class ("Class 10", "Class 1-5", "IIT-JEE/NEET", ...)."""
+    key = normalize_search_key(value)
+    return key in _CLASS_VALUE_KEYS or bool(_CLASS_RE.fullmatch(key) or _CLASS_RANGE_RE.fullmatch(key))
+
+
+def subject_match_pattern(subject_name):
+    """
+    Regex (for ``__iregex``) matching a subject's synonyms or "All Subjects" as
+    substrings: the single-clause form of the old per-synonym icontains chain.
+    """
+    synonyms = SUBJECT_SYNONYMS.get(subject_name, [subject_name])
+    words = {word.lower() for word in synonyms} | {ALL_SUBJECTS_KEY}
+    return _alternation(words)
@@ -4,6 +4,8 @@ from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.db.models import Q
 from .serializers import UserAdminSerializer
+from core.archive import include_archived
+from core.pagination import KeysetPagination
 from core.roles import ADMIN_ROLES, COUNSELLOR, SUPERADMIN, TUTOR_ADMIN
 
 User = get_user_model()
@@ -29,6 +31,8 @@ class UserManagementView(generics.ListAPIView):
     """
     serializer_class = UserAdminSerializer
     permission_classes = [IsSuperAdmin]
+    pagination_class = KeysetPagination
+    cursor_ordering = ('date_joined', 'id')
 
     def get_queryset(self):
         queryset = User.objects.all().select_related('admin_profile').order_by('-date_joined')
@@ -127,137 +131,136 @@ class SuperAdminAnalyticsView(APIView):
     """
     Superadmin: Get comprehensive analytics for dashboard.
     Returns KPIs, charts data, and stats.
+
+    Job, hire and revenue figures (chart buckets included) come from one
+    conditional-aggregate query over the daily rollup; users and KYC take one
+    query each. Cached per superadmin with stale-while-revalidate, since the
+    dashboard polls this endpoint.
     """
     permission_classes = [IsSuperAdmin]
+    cache_ttl = 30
+    stale_ttl = 300
 
     def get(self, request):
+        from core.cache import cached_swr
+
+        data = cached_swr(
+            f'superadmin_analytics:{request.user.id}', self.build_analytics, self.cache_ttl, self.stale_ttl
+        )
+        return Response(data)
+
+    @staticmethod
+    def _buckets(bounds, **filters):
+        """Conditional filters on DailyMetric.day, one per (start, end) bucket; end=None means open-ended."""
+        from django.db.models import Q
+
+        conditions = []
+        for start, end in bounds:
+            q = Q(day__gte=start, **filters)
+            if end is not None:
+                q &= Q(day__lt=end)
+            conditions.append(q)
+        return conditions
+
+    def build_analytics(self):
         from django.utils import timezone
-        from django.db.models import Count, Sum
-        from django.db.models.functions import TruncMonth, TruncWeek
+        from django.db.models import Count, Q, Sum
         from datetime import timedelta
-        from jobs.models import JobPost, Application
-        from wallet.models import Transaction, Wallet
-        from users.models import TutorProfile, TutorKYC
+        from jobs.models import DailyMetric
+        from users.models import TutorKYC
 
-        now = timezone.now()
-        this_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
-
-        # === KPI Metrics ===
-        total_leads = JobPost.objects.count()
-        fresh_leads = JobPost.objects.filter(created_at__gte=this_month_start).count()
-        rejected_leads = JobPost.objects.filter(status='REJECTED').count()
-        confirmed_tuitions = Application.objects.filter(status='HIRED').count()
-        
-        # Revenue from wallet credits (deposits)
-        total_revenue = Transaction.objects.filter(
-            transaction_type='CREDIT'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Follow-ups: Pending jobs needing attention
-        pending_jobs = JobPost.objects.filter(status='PENDING_APPROVAL').count()
-        
-        # User counts
-        total_parents = User.objects.filter(role='PARENT').count()
+        today = timezone.localdate()
+        this_month_start = today.replace(day=1)
+
+        # Last 6 calendar months (oldest first) and last 4 rolling weeks, as [start, end) day buckets
+        month_starts = [this_month_start]
+        for _ in range(5):
+            month_starts.insert(0, (month_starts[0] - timedelta(days=1)).replace(day=1))
+        month_bounds = list(zip(month_starts, month_starts[1:] + [None]))
+        week_starts = [today - timedelta(days=7 * (4 - i) - 1) for i in range(4)]
+        week_bounds = list(zip(week_starts, week_starts[1:] + [None]))
+
+        # Jobs, hires and revenue in one pass over the daily rollup (see jobs/rollup.py)
+        job = Q(kind='JOB')
+        hired = Q(kind='APPLICATION', status='HIRED')
+        credit = Q(kind='CREDIT')
+        metrics = DailyMetric.objects.aggregate(
+            total_leads=Sum('count', filter=job),
+            fresh=Sum('count', filter=job & Q(day__gte=this_month_start)),
+            rejected=Sum('count', filter=job & Q(status='REJECTED')),
+            pending=Sum('count', filter=job & Q(status='PENDING_APPROVAL')),
+            approved=Sum('count', filter=job & Q(status__in=['APPROVED', 'ACTIVE', 'ASSIGNED'])),
+            hired=Sum('count', filter=hired),
+            revenue=Sum('amount', filter=credit),
+            **{f'leads_{i}': Sum('count', filter=q) for i, q in enumerate(self._buckets(month_bounds, kind='JOB'))},
+            **{f'hires_{i}': Sum('count', filter=q)
+               for i, q in enumerate(self._buckets(month_bounds, kind='APPLICATION', status='HIRED'))},
+            **{f'revenue_{i}': Sum('amount', filter=q) for i, q in enumerate(self._buckets(week_bounds, kind='CREDIT'))},
+        )
+        metrics = {key: value or 0 for key, value in metrics.items()}
         # Role name inconsistency fix: 'TEACHER' is used for tutors in DB
-        total_tutors = User.objects.filter(role='TEACHER').count()
-        total_admins = User.objects.filter(role__in=[COUNSELLOR, TUTOR_ADMIN]).count()
-        total_institutions = User.objects.filter(role='INSTITUTION').count()
-        
-        # KYC stats
-        pending_kyc = TutorKYC.objects.filter(status='SUBMITTED').count()
-        verified_kyc = TutorKYC.objects.filter(status='APPROVED').count()
-
-        # === Chart Data: Leads vs Conversions (Last 6 months) ===
-        six_months_ago = now - timedelta(days=180)
-        leads_by_month = JobPost.objects.filter(
-            created_at__gte=six_months_ago
-        ).annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(
-            leads=Count('id')
-        ).order_by('month')
-
-        conversions_by_month = Application.objects.filter(
-            status='HIRED',
-            created_at__gte=six_months_ago
-        ).annotate(
-            month=TruncMonth('created_at')
-        ).values('month').annotate(
-            conversions=Count('id')
-        ).order_by('month')
-
-        # Merge leads and conversions data
-        leads_dict = {item['month'].strftime('%b'): item['leads'] for item in leads_by_month}
-        conversions_dict = {item['month'].strftime('%b'): item['conversions'] for item in conversions_by_month}
-        
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        current_month_idx = now.month - 1
-        last_6_months = [months[(current_month_idx - i) % 12] for i in range(5, -1, -1)]
-        
+        users = User.objects.aggregate(
+            parents=Count('id', filter=Q(role='PARENT')),
+            tutors=Count('id', filter=Q(role='TEACHER')),
+            admins=Count('id', filter=Q(role__in=[COUNSELLOR, TUTOR_ADMIN])),
+        )
+        kyc = TutorKYC.objects.aggregate(
+            pending=Count('id', filter=Q(status=TutorKYC.Status.SUBMITTED)),
+            verified=Count('id', filter=Q(status=TutorKYC.Status.VERIFIED)),
+        )
+
+        # === Chart Data: Leads vs Conversions (Last 6 months, zero-filled) ===
         leads_vs_conversions = [
             {
-                "name": month,
-                "Leads": leads_dict.get(month, 0),
-                "Conversions": conversions_dict.get(month, 0)
+                "name": start.strftime('%b'),
+                "Leads": metrics[f'leads_{i}'],
+                "Conversions": metrics[f'hires_{i}'],
             }
-            for month in last_6_months
+            for i, (start, _) in enumerate(month_bounds)
         ]
 
         # === Pie Chart: Lead Distribution ===
         lead_distribution = [
-            {"name": "Fresh", "value": fresh_leads, "color": "#10b981"},
-            {"name": "Pending", "value": pending_jobs, "color": "#f59e0b"},
-            {"name": "Approved", "value": JobPost.objects.filter(status__in=['APPROVED', 'ACTIVE', 'ASSIGNED']).count(), "color": "#3b82f6"},
-            {"name": "Rejected", "value": rejected_leads, "color": "#ef4444"},
+            {"name": "Fresh", "value": metrics['fresh'], "color": "#10b981"},
+            {"name": "Pending", "value": metrics['pending'], "color": "#f59e0b"},
+            {"name": "Approved", "value": metrics['approved'], "color": "#3b82f6"},
+            {"name": "Rejected", "value": metrics['rejected'], "color": "#ef4444"},
         ]
 
-        # === Line Chart: Weekly Revenue (Last 4 weeks) ===
-        four_weeks_ago = now - timedelta(weeks=4)
-        revenue_by_week = Transaction.objects.filter(
-            transaction_type='CREDIT',
-            created_at__gte=four_weeks_ago
-        ).annotate(
-            week=TruncWeek('created_at')
-        ).values('week').annotate(
-            revenue=Sum('amount')
-        ).order_by('week')
-
+        # === Line Chart: Weekly Revenue (Last 4 weeks, zero-filled) ===
         revenue_weekly = [
-            {"name": f"Week {i+1}", "Revenue": 0}
-            for i in range(4)
+            {"name": f"Week {i+1}", "Revenue": float(metrics[f'revenue_{i}'])}
+            for i in range(len(week_bounds))
         ]
-        for idx, item in enumerate(revenue_by_week):
-            if idx < 4:
-                revenue_weekly[idx]["Revenue"] = float(item['revenue'] or 0)
 
-        return Response({
+        return {
             # KPIs
-            "total_leads": total_leads,
-            "fresh_leads": fresh_leads,
-            "rejected_leads": rejected_leads,
-            "confirmed_tuitions": confirmed_tuitions,
-            "total_revenue": float(total_revenue),
-            "pending_jobs": pending_jobs,
+            "total_leads": metrics['total_leads'],
+            "fresh_leads": metrics['fresh'],
+            "rejected_leads": metrics['rejected'],
+            "confirmed_tuitions": metrics['hired'],
+            "total_revenue": float(metrics['revenue']),
+            "pending_jobs": metrics['pending'],
             
             # User stats
-            "total_parents": total_parents,
-            "total_tutors": total_tutors,
-            "total_admins": total_admins,
-            "pending_kyc": pending_kyc,
-            "verified_kyc": verified_kyc,
+            "total_parents": users['parents'],
+            "total_tutors": users['tutors'],
+            "total_admins": users['admins'],
+            "pending_kyc": kyc['pending'],
+            "verified_kyc": kyc['verified'],
             
             # Chart data
             "leads_vs_conversions": leads_vs_conversions,
             "lead_distribution": lead_distribution,
             "revenue_weekly": revenue_weekly,
-        })
+        }
 
 
 class AdminPerformanceView(APIView):
     """
     Superadmin: Get performance metrics for Admin users.
     Can filter by department: PARENT_OPS or TUTOR_OPS
+    ``?include_archived=1`` also counts archived KYC tasks.
     """
     permission_classes = [IsSuperAdmin]
 
@@ -266,8 +269,7 @@ class AdminPerformanceView(APIView):
         from django.db.models import Count, Q
         from datetime import timedelta
         from jobs.models import JobPost, Application
-        from jobs.admin_models import AdminProfile
-        from users.models import TutorKYC
+        from jobs.admin_models import AdminTask
 
         department = request.query_params.get('department')  # COUNSELLOR or TUTOR_OPS
         
@@ -275,14 +277,68 @@ class AdminPerformanceView(APIView):
         admins_query = User.objects.filter(role__in=[COUNSELLOR, TUTOR_ADMIN], is_active=True).select_related('admin_profile')
         if department:
             admins_query = admins_query.filter(admin_profile__department=department)
+        admins = list(admins_query)
+        admin_ids = [admin.id for admin in admins]
         
         now = timezone.now()
         this_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         this_week = now - timedelta(days=7)
+
+        # One grouped query per metric family instead of ~10 COUNTs per admin
+        job_stats = {}
+        hired_by_admin = {}
+        if not department or department == 'COUNSELLOR':
+            job_stats = {
+                row['assigned_admin']: row
+                for row in JobPost.objects.filter(assigned_admin__in=admin_ids).values('assigned_admin').annotate(
+                    total=Count('id'),
+                    approved=Count('id', filter=Q(status='APPROVED')),
+                    rejected=Count('id', filter=Q(status='REJECTED')),
+                    pending=Count('id', filter=Q(status='PENDING_APPROVAL')),
+                    this_month=Count('id', filter=Q(created_at__gte=this_month)),
+                ).order_by()
+            }
+            hired_by_admin = dict(
+                Application.objects.filter(job__assigned_admin__in=admin_ids, status='HIRED')
+                .values('job__assigned_admin').annotate(total=Count('id'))
+                .order_by().values_list('job__assigned_admin', 'total')
+            )
+
+        kyc_stats = {}
+        if not department or department == 'TUTOR_OPS':
+            # KYC volume comes from completed AdminTasks (TutorKYC has no verified_by)
+            kyc_stats = {
+                row['admin']: row
+                for row in AdminTask.objects.filter(
+                    admin__in=admin_ids,
+                    task_type__in=['KYC_VERIFICATION', 'TUTOR_VERIFICATION'],
+                    status='COMPLETED',
+                ).values('admin').annotate(
+                    total=Count('id'),
+                    this_month=Count('id', filter=Q(completed_at__gte=this_month)),
+                    this_week=Count('id', filter=Q(completed_at__gte=this_week)),
+                ).order_by()
+            }
+            if include_archived(request):
+                # Lifetime totals: add tasks moved to the archive by archive_old_rows
+                from jobs.archive_models import AdminTaskArchive
+
+                for row in AdminTaskArchive.objects.filter(
+                    admin__in=admin_ids,
+                    task_type__in=['KYC_VERIFICATION', 'TUTOR_VERIFICATION'],
+                    status='COMPLETED',
+                ).values('admin').annotate(
+                    total=Count('id'),
+                    this_month=Count('id', filter=Q(completed_at__gte=this_month)),
+                    this_week=Count('id', filter=Q(completed_at__gte=this_week)),
+                ).order_by():
+                    merged = kyc_stats.setdefault(row['admin'], {'total': 0, 'this_month': 0, 'this_week': 0})
+                    for key in ('total', 'this_month', 'this_week'):
+                        merged[key] += row[key]
         
         admin_performance = []
         
-        for admin in admins_query:
+        for admin in admins:
             # Get department from AdminProfile
             admin_dept = 'N/A'
             if hasattr(admin, 'admin_profile') and admin.admin_profile:
@@ -299,18 +355,16 @@ class AdminPerformanceView(APIView):
             
             # === COUNSELLOR Metrics ===
             if not department or department == 'COUNSELLOR':
-                assigned_jobs = JobPost.objects.filter(assigned_admin=admin)
-                jobs_count = assigned_jobs.count()
-                jobs_closed = assigned_jobs.filter(status__in=['CLOSED', 'ASSIGNED']).count() # jobs successfully assigned to tutor
-                
-                # Check applications on these jobs that resulted in HIRE
-                hired_apps = Application.objects.filter(job__assigned_admin=admin, status='HIRED').count()
+                jobs = job_stats.get(admin.id, {})
+                jobs_count = jobs.get('total', 0)
+                # Applications on these jobs that resulted in HIRE
+                hired_apps = hired_by_admin.get(admin.id, 0)
                 
                 metrics['jobs_assigned'] = jobs_count
-                metrics['jobs_approved'] = assigned_jobs.filter(status='APPROVED').count()
-                metrics['jobs_rejected'] = assigned_jobs.filter(status='REJECTED').count()
-                metrics['jobs_pending'] = assigned_jobs.filter(status='PENDING_APPROVAL').count()
-                metrics['jobs_this_month'] = assigned_jobs.filter(created_at__gte=this_month).count()
+                metrics['jobs_approved'] = jobs.get('approved', 0)
+                metrics['jobs_rejected'] = jobs.get('rejected', 0)
+                metrics['jobs_pending'] = jobs.get('pending', 0)
+                metrics['jobs_this_month'] = jobs.get('this_month', 0)
                 metrics['jobs_converted'] = hired_apps
                 
                 # Conversion Rate (Hired / Assigned)
@@ -318,24 +372,10 @@ class AdminPerformanceView(APIView):
 
             # === TUTOR_OPS Metrics ===
             if not department or department == 'TUTOR_OPS':
-                # Assuming verified_by is a field in TutorKYC (need to check model, if not, use logs or tasks)
-                # If verified_by is not on TutorKYC, we might need to rely on AdminTask for this stats
-                # For now using verified_by as assumed field or fallback to counting approved KYCs if we tracked them
-                
-                # Check if TutorKYC has 'verified_by' field. If not, we can't easily track individual perf unless we use AdminTask
-                # Fallback to AdminTask if needed:
-                # kyc_tasks = AdminTask.objects.filter(admin=admin, task_type='KYC_VERIFICATION', status='COMPLETED')
-                
-                # Let's assume we use AdminTask for more accuracy if verified_by is missing
-                from jobs.admin_models import AdminTask
-                kyc_tasks = AdminTask.objects.filter(admin=admin, task_type__in=['KYC_VERIFICATION', 'TUTOR_VERIFICATION'], status='COMPLETED')
-                
-                metrics['kyc_processed'] = kyc_tasks.count()
-                metrics['kyc_this_month'] = kyc_tasks.filter(completed_at__gte=this_month).count()
-                metrics['kyc_this_week'] = kyc_tasks.filter(completed_at__gte=this_week).count()
-                
-                # Simplified approval rate based on tasks logic (if we tracked decision in notes or status)
-                # For now just showing volume
+                kyc = kyc_stats.get(admin.id, {})
+                metrics['kyc_processed'] = kyc.get('total', 0)
+                metrics['kyc_this_month'] = kyc.get('this_month', 0)
+                metrics['kyc_this_week'] = kyc.get('this_week', 0)
             
             admin_performance.append(metrics)
         
@@ -356,7 +396,7 @@ class AdminPerformanceView(APIView):
 
         # Summary stats
         summary = {
-            'total_admins': admins_query.count(),
+            'total_admins': len(admins),
             'department': department or 'ALL',
             'top_performer_counsellor': top_converter,
             'top_performer_tutor_ops': top_kpi_user,
@@ -11,13 +11,19 @@ from django.utils import timezone
 
 from .models import TutorProfile, TutorKYC, TutorStatus
 from .serializers import TutorKYCSerializer
-from jobs.utils import assign_kyc_to_admin, send_notification
+from jobs.utils import assign_kyc_to_admin, close_admin_tasks, send_notification
 from jobs.admin_models import AdminTask
 from core.throttles import KYCUploadThrottle
 
 logger = logging.getLogger(__name__)
 
 
+def _complete_kyc_tasks(kyc_record, admin_user):
+    """Complete the reviewing admin's KYC task, cancel any other open one, and release their counters."""
+    tasks = AdminTask.objects.filter(related_kyc=kyc_record)
+    close_admin_tasks(tasks.filter(admin=admin_user))
+    close_admin_tasks(tasks.exclude(admin=admin_user), status='CANCELLED')
+
 class KYCDocumentUploadView(APIView):
     """
     Upload KYC documents
@@ -260,11 +266,7 @@ class AdminKYCVerifyView(APIView):
                 tutor_status.status = TutorStatus.State.REJECTED
                 tutor_status.save()
 
-                AdminTask.objects.filter(
-                    related_kyc=kyc_record,
-                    admin=request.user,
-                    status='PENDING'
-                ).update(status='COMPLETED', completed_at=timezone.now())
+                _complete_kyc_tasks(kyc_record, request.user)
 
                 # Format rejected doc names for display
                 display_names = [d.replace('_', ' ').title() for d in rejected_docs]
@@ -292,11 +294,7 @@ class AdminKYCVerifyView(APIView):
                 tutor_status.status = TutorStatus.State.APPROVED
                 tutor_status.save()
 
-                AdminTask.objects.filter(
-                    related_kyc=kyc_record,
-                    admin=request.user,
-                    status='PENDING'
-                ).update(status='COMPLETED', completed_at=timezone.now())
+                _complete_kyc_tasks(kyc_record, request.user)
 
                 send_notification(
                     user=kyc_record.tutor.user,
@@ -328,11 +326,7 @@ class AdminKYCVerifyView(APIView):
             tutor_status.save()
             
             # Mark admin task as completed
-            AdminTask.objects.filter(
-                related_kyc=kyc_record,
-                admin=request.user,
-                status='PENDING'
-            ).update(status='COMPLETED', completed_at=timezone.now())
+            _complete_kyc_tasks(kyc_record, request.user)
             
             # Send notification to tutor
             send_notification(
@@ -368,11 +362,7 @@ class AdminKYCVerifyView(APIView):
             tutor_status.save()
             
             # Mark admin task as completed
-            AdminTask.objects.filter(
-                related_kyc=kyc_record,
-                admin=request.user,
-                status='PENDING'
-            ).update(status='COMPLETED', completed_at=timezone.now())
+            _complete_kyc_tasks(kyc_record, request.user)
             
             # Send notification to tutor
             send_notification(
@@ -411,11 +401,7 @@ class AdminKYCVerifyView(APIView):
             tutor_status.save()
             
             # Mark admin task as completed
-            AdminTask.objects.filter(
-                related_kyc=kyc_record,
-                admin=request.user,
-                status='PENDING'
-            ).update(status='COMPLETED', completed_at=timezone.now())
+            _complete_kyc_tasks(kyc_record, request.user)
             
             # Send notification to tutor
             send_notification(
@@ -0,0 +1,47 @@
+"""Backfill listing-card thumbnails (users/thumbnails.py) for tutor profile images."""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import F, Q
+
+from users.models import TutorProfile
+from users.thumbnails import generate_tutor_thumbnails
+
+
+class Command(BaseCommand):
+    """Generate WebP/JPEG derivatives for every profile whose thumbnails are missing or stale."""
+
+    help = 'Generate listing-card thumbnails for tutor profile images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Regenerate even when the thumbnails match the current image')
+        parser.add_argument('--tutor-id', type=int, action='append', default=[],
+                            help='Only process the given TutorProfile id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        has_image = Q(profile_image__isnull=False) & ~Q(profile_image='')
+        # Profiles with an image, plus ones whose image was removed but still list derivatives
+        profiles = TutorProfile.objects.filter(has_image | ~Q(thumbnails_source=''))
+        if not options['force']:
+            profiles = profiles.exclude(thumbnails_source=F('profile_image'))
+        if options['tutor_id']:
+            profiles = profiles.filter(id__in=options['tutor_id'])
+        profiles = profiles.only('id', 'profile_image', 'thumbnails', 'thumbnails_source').order_by('id')
+
+        self.stdout.write(f"Generating thumbnails for {profiles.count()} tutor profile(s)...")
+        done = failed = 0
+        start = time.perf_counter()
+        for profile in profiles.iterator(chunk_size=options['batch_size']):
+            if generate_tutor_thumbnails(profile):
+                done += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"Profile {profile.id}: could not read {profile.profile_image.name}"))
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {done} updated, {failed} failed in {elapsed:.1f}s ({(done + failed) / elapsed:.1f} profiles/s)."
+        ))
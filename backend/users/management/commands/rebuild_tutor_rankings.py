@@ -0,0 +1,28 @@
+"""Recompute the precomputed tutor ranking table (users/ranking.py)."""
+
+from django.core.management.base import BaseCommand
+
+from users.models import TutorRanking
+from users.ranking import rebuild_tutor_rankings, refresh_tutor_rankings
+
+
+class Command(BaseCommand):
+    """Rebuild TutorRanking rows for every (or selected) tutor."""
+
+    help = 'Recompute tutor ranking scores used by search and recommendations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of tutors to recompute per query batch')
+        parser.add_argument('--tutor-id', type=int, action='append', default=[],
+                            help='Only recompute the given TutorProfile id (repeatable)')
+
+    def handle(self, *args, **options):
+        if options['tutor_id']:
+            total = refresh_tutor_rankings(options['tutor_id'], batch_size=options['batch_size'])
+        else:
+            total = rebuild_tutor_rankings(batch_size=options['batch_size'])
+        top = TutorRanking.objects.order_by('-score', 'tutor_id').values_list('tutor_id', 'score').first()
+        self.stdout.write(self.style.SUCCESS(
+            f"Done. {total} tutor ranking(s) recomputed." + (f" Top: tutor {top[0]} ({top[1]})." if top else "")
+        ))
@@ -0,0 +1,30 @@
+"""Backfill the normalized tutor subject/class search index (and full-text vectors on PostgreSQL)."""
+
+from django.core.management.base import BaseCommand
+
+from users.models import TutorProfile
+from users.search_index import rebuild_tutor_search_index
+
+
+class Command(BaseCommand):
+    """Rebuild TutorSubjectIndex / TutorClassIndex rows for every (or selected) tutor."""
+
+    help = 'Rebuild the normalized tutor subject/class search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of tutors to re-index per transaction')
+        parser.add_argument('--tutor-id', type=int, action='append', default=[],
+                            help='Only re-index the given TutorProfile id (repeatable)')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        profiles = TutorProfile.objects.select_related('user').only(
+            'id', 'subjects', 'classes', 'full_name', 'about_me', 'user__first_name'
+        ).order_by('id')
+        if options['tutor_id']:
+            profiles = profiles.filter(id__in=options['tutor_id'])
+
+        self.stdout.write(f"Indexing {profiles.count()} tutor profile(s)...")
+        total = rebuild_tutor_search_index(profiles.iterator(chunk_size=batch_size), batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} tutor profile(s) indexed."))
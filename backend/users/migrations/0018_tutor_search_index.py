@@ -0,0 +1,71 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_search_index(apps, schema_editor):
+    from jobs.utils import class_index_keys, normalize_search_key, subject_index_keys
+
+    TutorProfile = apps.get_model('users', 'TutorProfile')
+    TutorSubjectIndex = apps.get_model('users', 'TutorSubjectIndex')
+    TutorClassIndex = apps.get_model('users', 'TutorClassIndex')
+    Subject = apps.get_model('jobs', 'Subject')
+    ClassLevel = apps.get_model('jobs', 'ClassLevel')
+
+    subject_map = {normalize_search_key(name): pk for pk, name in Subject.objects.values_list('id', 'name')}
+    class_map = {normalize_search_key(name): pk for pk, name in ClassLevel.objects.values_list('id', 'name')}
+
+    subject_rows, class_rows = [], []
+    for profile in TutorProfile.objects.only('id', 'subjects', 'classes').iterator(chunk_size=1000):
+        subject_keys, class_keys = set(), set()
+        for value in profile.subjects if isinstance(profile.subjects, list) else [profile.subjects]:
+            subject_keys.update(subject_index_keys(value))
+        for value in profile.classes if isinstance(profile.classes, list) else [profile.classes]:
+            class_keys.update(class_index_keys(value))
+        subject_rows.extend(
+            TutorSubjectIndex(tutor_id=profile.id, key=key, subject_id=subject_map.get(key)) for key in subject_keys
+        )
+        class_rows.extend(
+            TutorClassIndex(tutor_id=profile.id, key=key, class_level_id=class_map.get(key)) for key in class_keys
+        )
+    TutorSubjectIndex.objects.bulk_create(subject_rows, batch_size=1000)
+    TutorClassIndex.objects.bulk_create(class_rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_add_payment_completion_to_application'),
+        ('users', '0017_rename_aadhaar_document_tutorkyc_aadhaar_back_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TutorSubjectIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=150)),
+                ('subject', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tutor_index', to='jobs.subject')),
+                ('tutor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_index', to='users.tutorprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'tutor'], name='tutor_subject_key_idx')],
+                'unique_together': {('tutor', 'key')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TutorClassIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=150)),
+                ('class_level', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tutor_index', to='jobs.classlevel')),
+                ('tutor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_index', to='users.tutorprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'tutor'], name='tutor_class_key_idx')],
+                'unique_together': {('tutor', 'key')},
+            },
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
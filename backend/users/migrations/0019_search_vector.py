@@ -0,0 +1,44 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:33
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from core.fulltext import update_search_vector
+    from users.search_index import tutor_search_parts
+
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS tutor_search_vector_gin ON users_tutorprofile USING gin (search_vector)'
+    )
+    TutorProfile = apps.get_model('users', 'TutorProfile')
+    profiles = TutorProfile.objects.select_related('user').only(
+        'id', 'full_name', 'about_me', 'subjects', 'user__first_name'
+    )
+    for profile in profiles.iterator(chunk_size=1000):
+        parts = tutor_search_parts(profile.full_name, profile.user.first_name, profile.subjects, profile.about_me)
+        update_search_vector(TutorProfile, profile.id, parts, using=schema_editor.connection.alias)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS tutor_search_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_tutor_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tutorprofile',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+        ),
+        # GIN indexes are PostgreSQL-only, so build it (and backfill the vectors) outside the model state.
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
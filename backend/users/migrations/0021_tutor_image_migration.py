@@ -0,0 +1,27 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0020_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TutorImageMigration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_url', models.URLField(max_length=500)),
+                ('status', models.CharField(choices=[('DONE', 'Done'), ('FAILED', 'Failed')], max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('bytes_downloaded', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tutor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='image_migration', to='users.tutorprofile')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0021_tutor_image_migration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tutorprofile',
+            name='thumbnails',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='tutorprofile',
+            name='thumbnails_source',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
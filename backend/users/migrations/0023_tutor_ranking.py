@@ -0,0 +1,40 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_rankings(apps, schema_editor):
+    from users.ranking import rebuild_tutor_rankings
+
+    rebuild_tutor_rankings(batch_size=1000, get_model=apps.get_model)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0025_archive_tables'),
+        ('users', '0022_tutor_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TutorRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('completion', models.PositiveIntegerField(default=0)),
+                ('experience_years', models.PositiveIntegerField(default=0)),
+                ('rating_avg', models.FloatField(blank=True, null=True)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('hire_count', models.PositiveIntegerField(default=0)),
+                ('kyc_verified', models.BooleanField(default=False)),
+                ('score', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tutor', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ranking', to='users.tutorprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', 'tutor'], name='tutor_ranking_score_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_rankings, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 
 class User(AbstractUser):
     class Role(models.TextChoices):
@@ -21,6 +22,8 @@ class User(AbstractUser):
     # We will use phone/email for auth eventually, but for now stick to default username/password 
     # or simple customization.
     
+    class Meta(AbstractUser.Meta):
+        indexes = [models.Index(fields=['date_joined', 'id'], name='user_date_joined_id_idx')]
 
     def __str__(self):
         return self.username
@@ -41,6 +44,9 @@ class TutorProfile(models.Model):
     about_me = models.TextField(blank=True, null=True)
     profile_image = models.ImageField(upload_to='tutor_profiles/', blank=True, null=True)
     external_profile_image_url = models.URLField(max_length=500, blank=True, null=True) # For imported Google Form images
+    # Derivative URLs from users/thumbnails.py, e.g. {'jpeg': {'320': url}, 'webp': {'160': url, ...}}
+    thumbnails = models.JSONField(default=dict, blank=True)
+    thumbnails_source = models.CharField(max_length=255, blank=True)  # profile_image name they were made from
     
     # Location & Mode
     state = models.CharField(max_length=100, default="Uttar Pradesh")
@@ -95,10 +101,89 @@ class TutorProfile(models.Model):
     
     profile_completion_percentage = models.PositiveIntegerField(default=0)
 
+    # Full-text search over name, subjects and bio (PostgreSQL only, see core/fulltext.py).
+    # The GIN index is created in migration 0019 because SQLite cannot build it.
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
+
+    COMPLETION_FIELDS = [
+        # Personal Information (6 fields)
+        'full_name', 'gender', 'dob', 'whatsapp_number', 'marital_status', 'about_me',
+        # Address (3 fields)
+        'local_address', 'permanent_address', 'locality',
+        # Teaching Details (5 fields)
+        'subjects', 'classes', 'teaching_mode', 'teaching_experience_years', 'expected_fee',
+        # Education (4 fields)
+        'highest_qualification', 'highest_stream', 'highest_university', 'intermediate_stream',
+        # Note: intro_video is optional and not required for 100% completion
+    ]
+
+    def calculate_completion_percentage(self):
+        """Share of COMPLETION_FIELDS that are filled in, as an int percentage. Runs no queries."""
+        completed = 0
+        for field in self.COMPLETION_FIELDS:
+            value = getattr(self, field)
+            if value is None:
+                continue
+            # Check for empty lists in JSON fields
+            if isinstance(value, list) and len(value) == 0:
+                continue
+            # Check for empty strings
+            if isinstance(value, str) and value.strip() == '':
+                continue
+            completed += 1
+        return int((completed / len(self.COMPLETION_FIELDS)) * 100)
+
     def __str__(self):
         return f"Profile of {self.user.username}"
 
 
+class TutorSubjectIndex(models.Model):
+    """Normalized tutor↔subject rows so subject search is an indexed join instead of a JSON scan."""
+    tutor = models.ForeignKey(TutorProfile, on_delete=models.CASCADE, related_name='subject_index')
+    key = models.CharField(max_length=150)  # canonical, lower-cased subject name
+    subject = models.ForeignKey('jobs.Subject', on_delete=models.SET_NULL, null=True, blank=True, related_name='tutor_index')
+
+    class Meta:
+        unique_together = ('tutor', 'key')
+        indexes = [models.Index(fields=['key', 'tutor'], name='tutor_subject_key_idx')]
+
+    def __str__(self):
+        return f"{self.tutor_id}: {self.key}"
+
+
+class TutorClassIndex(models.Model):
+    """Normalized tutor↔class rows; ranges like "Class 1-5" are stored per class."""
+    tutor = models.ForeignKey(TutorProfile, on_delete=models.CASCADE, related_name='class_index')
+    key = models.CharField(max_length=150)  # lower-cased class name, e.g. "class 10"
+    class_level = models.ForeignKey('jobs.ClassLevel', on_delete=models.SET_NULL, null=True, blank=True, related_name='tutor_index')
+
+    class Meta:
+        unique_together = ('tutor', 'key')
+        indexes = [models.Index(fields=['key', 'tutor'], name='tutor_class_key_idx')]
+
+    def __str__(self):
+        return f"{self.tutor_id}: {self.key}"
+
+
+class TutorRanking(models.Model):
+    """Precomputed ranking score and its inputs, one row per tutor (see users/ranking.py)."""
+    tutor = models.OneToOneField(TutorProfile, on_delete=models.CASCADE, related_name='ranking')
+    completion = models.PositiveIntegerField(default=0)
+    experience_years = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(null=True, blank=True)
+    rating_count = models.PositiveIntegerField(default=0)
+    hire_count = models.PositiveIntegerField(default=0)
+    kyc_verified = models.BooleanField(default=False)
+    score = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['-score', 'tutor'], name='tutor_ranking_score_idx')]
+
+    def __str__(self):
+        return f"{self.tutor_id}: {self.score}"
+
+
 class TutorKYC(models.Model):
     class Status(models.TextChoices):
         DRAFT = 'DRAFT', 'Draft'
@@ -245,3 +330,26 @@ class FavouriteTutor(models.Model):
 
     def __str__(self):
         return f"{self.parent.username} loves {self.tutor.user.username}"
+
+
+class TutorImageMigration(models.Model):
+    """
+    Checkpoint written by migrate_tutor_images, one row per profile. A profile
+    is skipped on later runs while it has a DONE row for its current
+    external_profile_image_url; a new URL (e.g. from restore_tutor_images) or a
+    FAILED row makes it eligible again.
+    """
+    class Status(models.TextChoices):
+        DONE = 'DONE', 'Done'
+        FAILED = 'FAILED', 'Failed'
+
+    tutor = models.OneToOneField(TutorProfile, on_delete=models.CASCADE, related_name='image_migration')
+    source_url = models.URLField(max_length=500)
+    status = models.CharField(max_length=10, choices=Status.choices)
+    attempts = models.PositiveIntegerField(default=0)
+    bytes_downloaded = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tutor_id}: {self.status}"
@@ -14,6 +14,7 @@ from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from core.throttles import LoginThrottle
+from jobs.tasks import enqueue
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -31,7 +32,7 @@ class PasswordResetRequestView(APIView):
         try:
             user = User.objects.get(email__iexact=email)
             self._send_reset_email(user)
-            logger.info('Password reset email sent to %s', email)
+            logger.info('Password reset email queued for %s', email)
         except User.DoesNotExist:
             logger.warning('Password reset requested for unknown email: %s', email)
 
@@ -41,13 +42,20 @@ class PasswordResetRequestView(APIView):
         )
 
     def _send_reset_email(self, user):
-        uid = urlsafe_base64_encode(force_bytes(user.pk))
-        token = default_token_generator.make_token(user)
-        frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')
-        reset_url = f"{frontend_url}/reset-password?uid={uid}&token={token}"
+        # SMTP runs in the worker (run_worker), not in the request
+        enqueue('users.password_reset_views.send_password_reset_email', user_id=user.pk)
 
-        subject = 'Reset Your Password — The Home Tuitions'
-        message = f"""Hi {user.first_name or user.username},
+
+def send_password_reset_email(user_id):
+    """Background task (jobs/tasks.py): email the reset link. Raises on SMTP errors so it is retried."""
+    user = User.objects.get(pk=user_id)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    frontend_url = getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')
+    reset_url = f"{frontend_url}/reset-password?uid={uid}&token={token}"
+
+    subject = 'Reset Your Password — The Home Tuitions'
+    message = f"""Hi {user.first_name or user.username},
 
 We received a request to reset the password for your account on The Home Tuitions.
 
@@ -60,7 +68,7 @@ If you did not request a password reset, you can safely ignore this email.
 — The Home Tuitions Team
 support@thehometuitions.in | +91 6387488141
 """
-        html_message = f"""
+    html_message = f"""
 <!DOCTYPE html>
 <html>
 <body style="font-family: Arial, sans-serif; background: #f8fafc; padding: 40px 0;">
@@ -92,14 +100,14 @@ support@thehometuitions.in | +91 6387488141
 </body>
 </html>
 """
-        send_mail(
-            subject=subject,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=html_message,
-            fail_silently=False,
-        )
+    send_mail(
+        subject=subject,
+        message=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[user.email],
+        html_message=html_message,
+        fail_silently=False,
+    )
 
 
 class PasswordResetConfirmView(APIView):
@@ -0,0 +1,132 @@
+"""
+Precomputed tutor ranking for public search and parent recommendations.
+
+A tutor's score (0-100) combines profile completion, teaching experience,
+the average TutorRating, the number of HIRED applications and whether a KYC
+record is VERIFIED. Computing that per request means aggregating ratings and
+applications for every candidate tutor, so the score and its inputs are
+stored in TutorRanking, whose index on score serves "top K" queries.
+
+Signals in users/signals.py and jobs/signals.py refresh a tutor's row when
+one of the inputs is written. ``rebuild_tutor_rankings`` (and the
+rebuild_tutor_rankings command) recompute every row, to repair drift from
+bulk ``QuerySet.update()`` calls, which bypass signals.
+
+Eligibility stays on TutorStatus: callers filter on status_record and only
+order by the ranking, so a stale row can misplace a tutor but never list an
+inactive one.
+"""
+from django.apps import apps
+from django.db.models import Count, F, Sum
+
+# Points per input, summing to 100
+WEIGHTS = {'completion': 30, 'experience': 20, 'rating': 25, 'hires': 15, 'kyc': 10}
+EXPERIENCE_CAP = 10  # years; more experience earns no extra points
+HIRE_CAP = 10
+# Ratings are averaged with RATING_PRIOR_WEIGHT imaginary RATING_PRIOR_MEAN
+# ratings, so a single 5-star review does not outrank a long good record.
+RATING_PRIOR_MEAN = 3.5
+RATING_PRIOR_WEIGHT = 3
+
+RANKING_FIELDS = [
+    'completion', 'experience_years', 'rating_avg', 'rating_count', 'hire_count', 'kyc_verified', 'score', 'updated_at',
+]
+
+
+def ranking_score(completion, experience_years, rating_sum, rating_count, hire_count, kyc_verified):
+    rating = (rating_sum + RATING_PRIOR_MEAN * RATING_PRIOR_WEIGHT) / (rating_count + RATING_PRIOR_WEIGHT)
+    score = (
+        WEIGHTS['completion'] * min(completion, 100) / 100
+        + WEIGHTS['experience'] * min(experience_years, EXPERIENCE_CAP) / EXPERIENCE_CAP
+        + WEIGHTS['rating'] * min(max(rating, 0), 5) / 5
+        + WEIGHTS['hires'] * min(hire_count, HIRE_CAP) / HIRE_CAP
+        + WEIGHTS['kyc'] * bool(kyc_verified)
+    )
+    return round(score, 3)
+
+
+def ranking_rows(tutor_ids, get_model=apps.get_model):
+    """
+    Unsaved TutorRanking rows for the given tutors, from four grouped queries.
+    ``get_model`` lets migrations pass their historical models.
+    """
+    TutorProfile = get_model('users', 'TutorProfile')
+    TutorKYC = get_model('users', 'TutorKYC')
+    TutorRanking = get_model('users', 'TutorRanking')
+    TutorRating = get_model('jobs', 'TutorRating')
+    Application = get_model('jobs', 'Application')
+
+    ratings = {
+        row['tutor_id']: (row['total'], row['count'])
+        for row in TutorRating.objects.filter(tutor_id__in=tutor_ids)
+        .values('tutor_id').annotate(total=Sum('rating'), count=Count('id')).order_by()
+    }
+    hires = dict(
+        Application.objects.filter(tutor_id__in=tutor_ids, status='HIRED')
+        .values('tutor_id').annotate(count=Count('id')).order_by().values_list('tutor_id', 'count')
+    )
+    verified = set(
+        TutorKYC.objects.filter(tutor_id__in=tutor_ids, status='VERIFIED').values_list('tutor_id', flat=True)
+    )
+
+    rows = []
+    for tutor_id, completion, experience in TutorProfile.objects.filter(id__in=tutor_ids).values_list(
+        'id', 'profile_completion_percentage', 'teaching_experience_years'
+    ):
+        rating_sum, rating_count = ratings.get(tutor_id, (0, 0))
+        row = TutorRanking(
+            tutor_id=tutor_id,
+            completion=completion,
+            experience_years=experience,
+            rating_avg=round(rating_sum / rating_count, 2) if rating_count else None,
+            rating_count=rating_count,
+            hire_count=hires.get(tutor_id, 0),
+            kyc_verified=tutor_id in verified,
+        )
+        row.score = ranking_score(completion, experience, rating_sum, rating_count, row.hire_count, row.kyc_verified)
+        rows.append(row)
+    return rows
+
+
+def refresh_tutor_rankings(tutor_ids, batch_size=500, get_model=apps.get_model):
+    """Recompute and upsert the ranking rows of the given tutors. Returns the number of rows written."""
+    TutorRanking = get_model('users', 'TutorRanking')
+    tutor_ids = sorted(set(tutor_ids))
+    total = 0
+    for start in range(0, len(tutor_ids), batch_size):
+        rows = ranking_rows(tutor_ids[start:start + batch_size], get_model=get_model)
+        TutorRanking.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=['tutor'], update_fields=RANKING_FIELDS,
+        )
+        total += len(rows)
+    return total
+
+
+def rebuild_tutor_rankings(batch_size=500, get_model=apps.get_model):
+    """Recompute the ranking of every tutor. Returns the number of rows written."""
+    tutor_ids = get_model('users', 'TutorProfile').objects.order_by('id').values_list('id', flat=True)
+    return refresh_tutor_rankings(list(tutor_ids), batch_size=batch_size, get_model=get_model)
+
+
+def order_by_ranking(queryset):
+    """Order a TutorProfile queryset best-ranked first; tutors without a row yet go last."""
+    return queryset.order_by(F('ranking__score').desc(nulls_last=True), '-teaching_experience_years', 'id')
+
+
+def top_ranked_tutors(limit, statuses=('ACTIVE',), locality=None):
+    """
+    The ``limit`` best-ranked TutorRanking rows (with tutor and user loaded) of
+    tutors in ``statuses``. With ``locality``, tutors whose locality matches
+    come first and the rest of the list is filled from everyone else.
+    """
+    from .models import TutorRanking
+
+    ranked = TutorRanking.objects.filter(
+        tutor__status_record__status__in=statuses,
+    ).select_related('tutor__user').order_by('-score', 'tutor_id')
+    picked = []
+    if locality:
+        picked = list(ranked.filter(tutor__locality__icontains=locality)[:limit])
+    if len(picked) < limit:
+        picked += list(ranked.exclude(tutor_id__in=[row.tutor_id for row in picked])[:limit - len(picked)])
+    return picked
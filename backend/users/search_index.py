@@ -0,0 +1,179 @@
+"""
+Normalized subject/class index for tutor search.
+
+TutorProfile.subjects and TutorProfile.classes are free-form JSON lists.
+Searching them means casting every row to text and running icontains, so
+we mirror them into TutorSubjectIndex / TutorClassIndex rows keyed on the
+canonical names from SUBJECT_SYNONYMS and filter with indexed semi-joins.
+Values outside that vocabulary fall back to substring matches on the raw
+JSON, as the old filters did.
+
+Free-text ``q`` search goes through TutorProfile.search_vector on PostgreSQL
+(see core/fulltext.py) and falls back to icontains elsewhere.
+"""
+from django.db import transaction
+from django.db.models import CharField, Q
+from django.db.models.functions import Cast
+
+from core.fulltext import fulltext_enabled, fulltext_search, update_search_vector
+from jobs.vocabulary import (
+    class_index_keys, known_class, known_subject, normalize_search_key, subject_index_keys, subject_search_keys,
+)
+from .models import TutorClassIndex, TutorProfile, TutorSubjectIndex
+
+
+def _as_list(value):
+    if isinstance(value, list):
+        return value
+    if value in (None, ''):
+        return []
+    return [value]
+
+
+def load_master_maps():
+    """Return ({subject key: Subject id}, {class key: ClassLevel id}) from the master tables."""
+    from jobs.models import ClassLevel, Subject
+
+    subject_map = {normalize_search_key(name): pk for pk, name in Subject.objects.values_list('id', 'name')}
+    class_map = {normalize_search_key(name): pk for pk, name in ClassLevel.objects.values_list('id', 'name')}
+    return subject_map, class_map
+
+
+def build_index_rows(profile, subject_map, class_map):
+    """Build unsaved index rows for one TutorProfile."""
+    subject_keys = set()
+    for value in _as_list(profile.subjects):
+        subject_keys.update(subject_index_keys(value))
+
+    class_keys = set()
+    for value in _as_list(profile.classes):
+        class_keys.update(class_index_keys(value))
+
+    subject_rows = [
+        TutorSubjectIndex(tutor_id=profile.id, key=key, subject_id=subject_map.get(key))
+        for key in sorted(subject_keys)
+    ]
+    class_rows = [
+        TutorClassIndex(tutor_id=profile.id, key=key, class_level_id=class_map.get(key))
+        for key in sorted(class_keys)
+    ]
+    return subject_rows, class_rows
+
+
+def sync_tutor_search_index(profile, subject_map=None, class_map=None):
+    """Replace the index rows of a single tutor with ones derived from its current JSON fields."""
+    if subject_map is None or class_map is None:
+        subject_map, class_map = load_master_maps()
+    subject_rows, class_rows = build_index_rows(profile, subject_map, class_map)
+    with transaction.atomic():
+        TutorSubjectIndex.objects.filter(tutor_id=profile.id).delete()
+        TutorClassIndex.objects.filter(tutor_id=profile.id).delete()
+        TutorSubjectIndex.objects.bulk_create(subject_rows)
+        TutorClassIndex.objects.bulk_create(class_rows)
+
+
+def tutor_search_parts(full_name, first_name, subjects, about_me):
+    """Weighted text for a tutor's search vector: names, then subjects (with canonical names), then bio."""
+    subject_words = set()
+    for value in _as_list(subjects):
+        subject_words.update(subject_index_keys(value))
+    return {
+        'A': ' '.join(filter(None, [full_name, first_name])),
+        'B': ' '.join(sorted(subject_words)),
+        'C': about_me or '',
+    }
+
+
+def sync_tutor_search_vector(profile):
+    """Refresh one tutor's full-text vector. No-op off PostgreSQL."""
+    if not fulltext_enabled():
+        return
+    parts = tutor_search_parts(profile.full_name, profile.user.first_name, profile.subjects, profile.about_me)
+    update_search_vector(TutorProfile, profile.id, parts)
+
+
+def rebuild_tutor_search_index(profiles, batch_size=500):
+    """Rebuild the index for an iterable of profiles in batches. Returns the number of tutors indexed."""
+    subject_map, class_map = load_master_maps()
+    total = 0
+    batch = []
+
+    def flush(batch):
+        ids = [p.id for p in batch]
+        subject_rows, class_rows = [], []
+        for profile in batch:
+            s_rows, c_rows = build_index_rows(profile, subject_map, class_map)
+            subject_rows.extend(s_rows)
+            class_rows.extend(c_rows)
+        with transaction.atomic():
+            TutorSubjectIndex.objects.filter(tutor_id__in=ids).delete()
+            TutorClassIndex.objects.filter(tutor_id__in=ids).delete()
+            TutorSubjectIndex.objects.bulk_create(subject_rows, batch_size=batch_size)
+            TutorClassIndex.objects.bulk_create(class_rows, batch_size=batch_size)
+            for profile in batch:
+                sync_tutor_search_vector(profile)
+
+    for profile in profiles:
+        batch.append(profile)
+        if len(batch) >= batch_size:
+            flush(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        flush(batch)
+        total += len(batch)
+    return total
+
+
+def _with_text(queryset, field):
+    """Annotate ``<field>_str``, the JSON list cast to text, for substring matching."""
+    return queryset.annotate(**{f'{field}_str': Cast(field, CharField())})
+
+
+def filter_tutors_by_subject(queryset, subject_name):
+    """
+    Filter a TutorProfile queryset to tutors teaching the subject (or "All
+    Subjects"). Names outside SUBJECT_SYNONYMS also match as a substring of
+    the raw subjects, so "French" still finds "French Language".
+    """
+    if not subject_name:
+        return queryset
+    condition = Q(pk__in=TutorSubjectIndex.objects.filter(key__in=subject_search_keys(subject_name)).values('tutor_id'))
+    if known_subject(subject_name):
+        return queryset.filter(condition)
+    return _with_text(queryset, 'subjects').filter(condition | Q(subjects_str__icontains=subject_name))
+
+
+def filter_tutors_by_class(queryset, grade):
+    """
+    Filter to tutors teaching the class; tutors with no class data are kept,
+    as before, and so are tutors who list the grade under subjects (e.g.
+    "IIT-JEE/NEET"). Grades outside the class vocabulary, such as "10", also
+    match as a substring of the raw classes.
+    """
+    if not grade:
+        return queryset
+    condition = (
+        Q(pk__in=TutorClassIndex.objects.filter(key__in=class_index_keys(grade)).values('tutor_id'))
+        | ~Q(pk__in=TutorClassIndex.objects.values('tutor_id'))
+        | Q(subjects_str__icontains=grade)
+    )
+    queryset = _with_text(queryset, 'subjects')
+    if not known_class(grade):
+        queryset = _with_text(queryset, 'classes')
+        condition |= Q(classes_str__icontains=grade)
+    return queryset.filter(condition)
+
+
+def search_tutors(queryset, q):
+    """Free-text tutor search: ranked full-text on PostgreSQL, chained icontains elsewhere."""
+    if not q:
+        return queryset
+    if fulltext_enabled():
+        return fulltext_search(queryset, q)
+    return queryset.annotate(subjects_str=Cast('subjects', CharField())).filter(
+        Q(user__first_name__icontains=q) |
+        Q(full_name__icontains=q) |
+        Q(about_me__icontains=q) |
+        Q(subjects_str__icontains=q)
+    )
@@ -43,7 +43,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
 from .models import TutorProfile
 
 from .models import TutorProfile, TutorKYC, TutorStatus, Enquiry, InstitutionProfile, FavouriteTutor
-from .utils import generate_signed_kyc_url, get_tutor_image_url
+from .utils import generate_signed_kyc_url, get_tutor_image_url, get_tutor_thumbnail_srcset, get_tutor_thumbnail_url
 from core.roles import ADMIN_ROLES
 
 class FavouriteTutorSerializer(serializers.ModelSerializer):
@@ -146,6 +146,8 @@ class TutorProfileSerializer(serializers.ModelSerializer):
     kyc = TutorKYCSerializer(source='kyc_records', many=True, read_only=True)
     status_msg = TutorStatusSerializer(source='status_record', read_only=True)
     image = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
     is_unlocked = serializers.SerializerMethodField()
     contact_info = serializers.SerializerMethodField()
     
@@ -158,7 +160,7 @@ class TutorProfileSerializer(serializers.ModelSerializer):
             'expected_fee', 'highest_qualification', 'is_bed', 'is_tet', 
             'other_certifications', 'profile_image', 'external_profile_image_url',
             'intro_video', 'profile_completion_percentage',
-            'kyc', 'status_msg', 'image', 'is_unlocked', 'contact_info'
+            'kyc', 'status_msg', 'image', 'thumbnail', 'thumbnail_srcset', 'is_unlocked', 'contact_info'
         ]
         read_only_fields = ['user', 'profile_completion_percentage']
 
@@ -210,6 +212,12 @@ class TutorProfileSerializer(serializers.ModelSerializer):
     def get_image(self, obj):
         return get_tutor_image_url(obj)
 
+    def get_thumbnail(self, obj):
+        return get_tutor_thumbnail_url(obj)
+
+    def get_thumbnail_srcset(self, obj):
+        return get_tutor_thumbnail_srcset(obj)
+
 
 
 
@@ -254,6 +262,8 @@ class PublicTutorProfileSerializer(serializers.ModelSerializer):
     subjects = serializers.ListField(read_only=True) # Ensure JSON parsed
     classes = serializers.ListField(read_only=True)
     image = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    thumbnail_srcset = serializers.SerializerMethodField()
     is_unlocked = serializers.SerializerMethodField()
     is_favourite = serializers.SerializerMethodField()
     contact_info = serializers.SerializerMethodField()
@@ -265,7 +275,7 @@ class PublicTutorProfileSerializer(serializers.ModelSerializer):
             'subjects', 'classes', 'class_subjects', 'locality', 'teaching_mode', 
             'teaching_experience_years', 'expected_fee', 
             'highest_qualification', 'is_bed', 'is_tet', 
-            'profile_completion_percentage', 'image', 'intro_video',
+            'profile_completion_percentage', 'image', 'thumbnail', 'thumbnail_srcset', 'intro_video',
             'is_unlocked', 'is_favourite', 'contact_info'
         ]
         
@@ -314,6 +324,12 @@ class PublicTutorProfileSerializer(serializers.ModelSerializer):
     def get_image(self, obj):
         return get_tutor_image_url(obj)
 
+    def get_thumbnail(self, obj):
+        return get_tutor_thumbnail_url(obj)
+
+    def get_thumbnail_srcset(self, obj):
+        return get_tutor_thumbnail_srcset(obj)
+
 
 class InstitutionProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import TutorProfile, TutorStatus
+from .models import TutorKYC, TutorProfile, TutorStatus
+from .ranking import refresh_tutor_rankings
+from .search_index import sync_tutor_search_index, sync_tutor_search_vector
+from .thumbnails import THUMBNAIL_TASK, thumbnails_stale
+from jobs.tasks import enqueue
 
 User = get_user_model()
 
@@ -23,33 +28,7 @@ def update_profile_completion(sender, instance, **kwargs):
     if kwargs.get('update_fields') and 'profile_completion_percentage' in kwargs['update_fields']:
         return
 
-    fields_to_check = [
-        # Personal Information (6 fields)
-        'full_name', 'gender', 'dob', 'whatsapp_number', 'marital_status', 'about_me',
-        # Address (3 fields)
-        'local_address', 'permanent_address', 'locality',
-        # Teaching Details (5 fields)
-        'subjects', 'classes', 'teaching_mode', 'teaching_experience_years', 'expected_fee',
-        # Education (4 fields)
-        'highest_qualification', 'highest_stream', 'highest_university', 'intermediate_stream',
-        # Note: intro_video is optional and not required for 100% completion
-    ]
-    
-    completed = 0
-    total = len(fields_to_check)
-    
-    for field in fields_to_check:
-        value = getattr(instance, field)
-        if value is not None:
-             # Check for empty lists in JSON fields
-            if isinstance(value, list) and len(value) == 0:
-                continue
-            # Check for empty strings
-            if isinstance(value, str) and value.strip() == '':
-                continue
-            completed += 1
-            
-    percentage = int((completed / total) * 100)
+    percentage = instance.calculate_completion_percentage()
     
     if instance.profile_completion_percentage != percentage:
         instance.profile_completion_percentage = percentage
@@ -64,3 +43,71 @@ def update_profile_completion(sender, instance, **kwargs):
                 pass 
         except TutorStatus.DoesNotExist:
             pass
+
+
+@receiver(post_save, sender=TutorProfile)
+def sync_search_index(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the normalized subject/class search index in step with the JSON fields.
+    """
+    if update_fields and not {'subjects', 'classes'} & set(update_fields):
+        return
+    sync_tutor_search_index(instance)
+
+
+@receiver(post_save, sender=TutorProfile)
+def sync_search_vector(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the full-text search vector in step with the searchable profile fields.
+    """
+    if update_fields and not {'full_name', 'about_me', 'subjects'} & set(update_fields):
+        return
+    sync_tutor_search_vector(instance)
+
+
+@receiver(post_save, sender=TutorProfile)
+def refresh_thumbnails(sender, instance, update_fields=None, **kwargs):
+    """
+    Queue the listing-card thumbnails build when a new profile image is uploaded.
+    """
+    if update_fields and 'profile_image' not in update_fields:
+        return
+    if thumbnails_stale(instance):
+        enqueue(THUMBNAIL_TASK, profile_id=instance.pk)
+
+
+@receiver(post_save, sender=TutorProfile)
+def refresh_ranking(sender, instance, update_fields=None, **kwargs):
+    """
+    Keep the tutor's TutorRanking row in step with completion and experience.
+    """
+    if update_fields and not {'profile_completion_percentage', 'teaching_experience_years'} & set(update_fields):
+        return
+    refresh_tutor_rankings([instance.id])
+
+
+@receiver(post_save, sender=TutorKYC)
+def refresh_ranking_on_kyc(sender, instance, **kwargs):
+    refresh_tutor_rankings([instance.tutor_id])
+
+
+@receiver(post_delete, sender=TutorKYC)
+def refresh_ranking_on_kyc_delete(sender, instance, **kwargs):
+    # May be part of deleting the profile itself; by commit time its row is gone too
+    tutor_id = instance.tutor_id
+    transaction.on_commit(lambda: refresh_tutor_rankings([tutor_id]))
+
+
+@receiver(post_save, sender=User)
+def sync_tutor_name_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    """
+    The tutor vector includes User.first_name, so refresh it when that changes.
+    """
+    if created or instance.role != User.Role.TEACHER:
+        return
+    if update_fields and 'first_name' not in update_fields:
+        return
+    profile = TutorProfile.objects.filter(user=instance).first()
+    if profile:
+        profile.user = instance
+        sync_tutor_search_vector(profile)
@@ -1,3 +1,363 @@
 from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from jobs.admin_models import AdminProfile, AdminTask
+from jobs.models import Application, JobPost, Subject
+from users.models import TutorProfile, TutorStatus, TutorSubjectIndex, TutorClassIndex
+
+User = get_user_model()
+
+
+class TutorSearchIndexTestCase(TestCase):
+    def setUp(self):
+        self.maths = Subject.objects.create(name='Mathematics')
+
+        self.tutor1 = self._make_tutor('tutor1', ['Maths', 'Physics'], ['Class 10'])
+        self.tutor2 = self._make_tutor('tutor2', ['Computer Science'], ['Class 1-5'])
+        self.tutor3 = self._make_tutor('tutor3', ['All Subjects'], [])
+
+        self.parent = User.objects.create(username='parent1', role='PARENT')
+        self.client = APIClient()
+        self.client.force_authenticate(self.parent)
+
+    def _make_tutor(self, username, subjects, classes):
+        user = User.objects.create(username=username, role='TEACHER')
+        profile = user.tutor_profile
+        profile.subjects = subjects
+        profile.classes = classes
+        profile.save()
+        TutorStatus.objects.filter(tutor=profile).update(status='ACTIVE')
+        return profile
+
+    def _search(self, **params):
+        response = self.client.get('/api/users/tutors/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return {row['id'] for row in response.data['results']}
+
+    def test_index_rows_follow_profile_save(self):
+        keys = set(TutorSubjectIndex.objects.filter(tutor=self.tutor1).values_list('key', flat=True))
+        self.assertIn('mathematics', keys)
+        self.assertIn('physics', keys)
+        self.assertEqual(
+            TutorSubjectIndex.objects.get(tutor=self.tutor1, key='mathematics').subject_id, self.maths.id
+        )
+
+        self.tutor1.subjects = ['Chemistry']
+        self.tutor1.save()
+        keys = set(TutorSubjectIndex.objects.filter(tutor=self.tutor1).values_list('key', flat=True))
+        self.assertEqual(keys, {'chemistry'})
+
+    def test_class_ranges_are_expanded(self):
+        keys = set(TutorClassIndex.objects.filter(tutor=self.tutor2).values_list('key', flat=True))
+        self.assertTrue({'class 1', 'class 3', 'class 5'} <= keys)
+
+    def test_subject_search_uses_synonyms_and_catch_all(self):
+        self.assertEqual(self._search(subject='Mathematics'), {self.tutor1.id, self.tutor3.id})
+        self.assertEqual(self._search(subject='Science'), {self.tutor3.id})
+        self.assertEqual(self._search(subject='Computer Science'), {self.tutor2.id, self.tutor3.id})
+
+    def test_class_search_keeps_tutors_without_class_data(self):
+        self.assertEqual(self._search(grade='Class 3'), {self.tutor2.id, self.tutor3.id})
+        self.assertEqual(self._search(grade='Class 10'), {self.tutor1.id, self.tutor3.id})
+
+    def test_subjects_outside_vocabulary_match_as_substrings(self):
+        french = self._make_tutor('tutor4', ['French Language'], ['Class 9'])
+        self.assertEqual(self._search(subject='French'), {french.id, self.tutor3.id})
+        # Vocabulary subjects stay on the index: "Science" is not read into "Computer Science"
+        self.assertEqual(self._search(subject='Science'), {self.tutor3.id})
+
+    def test_class_search_matches_subjects_and_partial_grades(self):
+        jee = self._make_tutor('tutor4', ['Physics', 'IIT-JEE/NEET'], ['Class 12'])
+        self.assertEqual(self._search(grade='IIT-JEE/NEET'), {jee.id, self.tutor3.id})
+        self.assertEqual(self._search(grade='10'), {self.tutor1.id, self.tutor3.id})
+        self.assertEqual(self._search(q='physics', subject='French', grade='10'), set())
+        self.assertEqual(self._search(q='physics', subject='Physics', grade='10'), {self.tutor1.id})
+
+    def test_text_search_falls_back_to_icontains(self):
+        self.tutor2.full_name = 'Anita Verma'
+        self.tutor2.save()
+        self.assertEqual(self._search(q='anita'), {self.tutor2.id})
+        self.assertEqual(self._search(q='physics'), {self.tutor1.id})
+
+    def test_search_vector_parts_include_canonical_subjects(self):
+        from users.search_index import tutor_search_parts
+
+        parts = tutor_search_parts('Anita Verma', 'Anita', ['Maths'], None)
+        self.assertEqual(parts['A'], 'Anita Verma Anita')
+        self.assertEqual(parts['B'], 'mathematics maths')
+        self.assertEqual(parts['C'], '')
+
+    def test_rebuild_command_restores_index(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        TutorSubjectIndex.objects.all().delete()
+        TutorClassIndex.objects.all().delete()
+        call_command('rebuild_tutor_search_index', stdout=StringIO())
+        self.assertEqual(self._search(subject='Physics'), {self.tutor1.id, self.tutor3.id})
+
+
+class AdminPerformanceViewTestCase(TestCase):
+    def setUp(self):
+        self.superadmin = User.objects.create(username='boss', role='SUPERADMIN')
+        self.client = APIClient()
+        self.client.force_authenticate(self.superadmin)
+        self.parent = User.objects.create(username='parent1', role='PARENT')
+        self.tutor = User.objects.create(username='tutor1', role='TEACHER').tutor_profile
+        for i in range(2):
+            self._add_admin(i)
+
+    def _add_admin(self, i):
+        counsellor = User.objects.create(username=f'counsellor{i}', role='COUNSELLOR')
+        AdminProfile.objects.create(user=counsellor, department='COUNSELLOR')
+        approved = JobPost.objects.create(posted_by=self.parent, assigned_admin=counsellor, status='APPROVED')
+        JobPost.objects.create(posted_by=self.parent, assigned_admin=counsellor, status='PENDING_APPROVAL')
+        Application.objects.create(job=approved, tutor=self.tutor, status='HIRED')
+
+        tutor_admin = User.objects.create(username=f'tutoradmin{i}', role='TUTOR_ADMIN')
+        AdminProfile.objects.create(user=tutor_admin, department='TUTOR_OPS')
+        AdminTask.objects.create(
+            admin=tutor_admin, task_type='KYC_VERIFICATION', status='COMPLETED', completed_at=timezone.now()
+        )
+
+    def _get(self):
+        response = self.client.get('/api/users/superadmin/admin-performance/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_metrics(self):
+        data = self._get()
+        rows = {row['username']: row for row in data['admins']}
+        self.assertEqual(data['summary']['total_admins'], 4)
+        self.assertEqual(rows['counsellor0']['jobs_assigned'], 2)
+        self.assertEqual(rows['counsellor0']['jobs_approved'], 1)
+        self.assertEqual(rows['counsellor0']['jobs_pending'], 1)
+        self.assertEqual(rows['counsellor0']['jobs_converted'], 1)
+        self.assertEqual(rows['counsellor0']['conversion_rate'], 50.0)
+        self.assertEqual(rows['tutoradmin0']['kyc_processed'], 1)
+        self.assertEqual(rows['tutoradmin0']['kyc_this_week'], 1)
+
+    def test_query_count_does_not_grow_with_admins(self):
+        with self.assertNumQueries(4):
+            self._get()
+        for i in range(2, 8):
+            self._add_admin(i)
+        with self.assertNumQueries(4):
+            self._get()
+
+    def test_include_archived_adds_archived_kyc_tasks(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+
+        AdminTask.objects.update(assigned_at=timezone.now() - timedelta(days=400))
+        call_command('archive_old_rows', '--policy', 'admin_tasks', stdout=StringIO())
+        self.assertFalse(AdminTask.objects.exists())
+
+        response = self.client.get('/api/users/superadmin/admin-performance/?include_archived=1')
+        rows = {row['username']: row for row in response.data['admins']}
+        self.assertEqual(rows['tutoradmin0']['kyc_processed'], 1)
+        self.assertEqual(rows['tutoradmin0']['kyc_this_week'], 1)
+        self.assertEqual({row['username']: row for row in self._get()['admins']}['tutoradmin0']['kyc_processed'], 0)
+
+
+class SuperAdminAnalyticsViewTestCase(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.superadmin = User.objects.create(username='boss', role='SUPERADMIN')
+        self.client = APIClient()
+        self.client.force_authenticate(self.superadmin)
+        parent = User.objects.create(username='parent1', role='PARENT')
+        JobPost.objects.create(posted_by=parent, status='PENDING_APPROVAL')
+        JobPost.objects.create(posted_by=parent, status='APPROVED')
+
+    def _get(self):
+        response = self.client.get('/api/users/superadmin/analytics/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_rollup_and_one_query_per_table_then_cached(self):
+        with self.assertNumQueries(3):
+            data = self._get()
+        self.assertEqual(data['total_leads'], 2)
+        self.assertEqual(data['pending_jobs'], 1)
+        self.assertEqual(data['total_parents'], 1)
+        self.assertEqual(len(data['leads_vs_conversions']), 6)
+        self.assertEqual(data['leads_vs_conversions'][-1]['Leads'], 2)
+        self.assertEqual([w['Revenue'] for w in data['revenue_weekly']], [0.0] * 4)
+
+        with self.assertNumQueries(0):
+            self._get()
+
+    def test_stale_entry_is_served_while_revalidating(self):
+        from unittest import mock
+        from django.core.cache import cache
+
+        key = f'superadmin_analytics:{self.superadmin.id}'
+        cache.set(key, {'value': {'total_leads': 99}, 'fresh_until': 0}, 60)
+        with mock.patch('core.cache._refresh_in_background') as refresh:
+            self.assertEqual(self._get()['total_leads'], 99)
+            self.assertEqual(self._get()['total_leads'], 99)
+        refresh.assert_called_once()
+
+
+class TutorThumbnailTestCase(TestCase):
+    def setUp(self):
+        import tempfile
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = self.settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create(username='thumb_tutor', role='TEACHER')
+        self.profile = TutorProfile.objects.get(user=self.user)
+
+    def jpeg(self, size=(1200, 800)):
+        from io import BytesIO
+        from PIL import Image
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        buffer = BytesIO()
+        Image.new('RGB', size, (200, 40, 40)).save(buffer, 'JPEG')
+        return SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+    def serialized(self):
+        from users.serializers import PublicTutorProfileSerializer
+        return PublicTutorProfileSerializer(TutorProfile.objects.get(pk=self.profile.pk)).data
+
+    def test_upload_builds_thumbnails_and_serializer_exposes_them(self):
+        from PIL import Image
+        from users.thumbnails import THUMBNAIL_WIDTHS
+
+        from jobs.tasks import run_pending
+
+        self.profile.profile_image = self.jpeg()
+        self.profile.save()
+        # Rendered by the task worker, not in the upload request
+        self.assertEqual(TutorProfile.objects.get(pk=self.profile.pk).thumbnails, {})
+        self.assertEqual(run_pending(), (1, 0))
+
+        profile = TutorProfile.objects.get(pk=self.profile.pk)
+        self.assertEqual(profile.thumbnails_source, profile.profile_image.name)
+        self.assertEqual(sorted(map(int, profile.thumbnails['webp'])), list(THUMBNAIL_WIDTHS))
+        webp_name = profile.thumbnails['webp']['320'].replace('/media/', '', 1)
+        with profile.profile_image.storage.open(webp_name) as f:
+            image = Image.open(f)
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 320)))
+
+        data = self.serialized()
+        self.assertTrue(data['thumbnail'].endswith('_320.jpeg'))
+        self.assertEqual(data['thumbnail_srcset'].count('w, '), len(THUMBNAIL_WIDTHS) - 1)
+        self.assertTrue(data['image'].endswith('.jpg'))
+
+        # A new upload replaces the derivatives and deletes the old files
+        storage = profile.profile_image.storage
+        old_files = profile.thumbnails['files']
+        profile.profile_image = self.jpeg()
+        profile.save()
+        self.assertEqual(run_pending(), (1, 0))
+        profile.refresh_from_db()
+        self.assertEqual(profile.thumbnails_source, profile.profile_image.name)
+        self.assertFalse(set(old_files) & set(profile.thumbnails['files']))
+        self.assertFalse(any(storage.exists(name) for name in old_files))
+        self.assertTrue(all(storage.exists(name) for name in profile.thumbnails['files']))
+
+    def test_backfill_command_fills_missing_and_skips_current(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        # Written with update(), as migrate_tutor_images does, so no signal ran
+        name = TutorProfile._meta.get_field('profile_image').storage.save('tutor_profiles/old.jpg', self.jpeg())
+        TutorProfile.objects.filter(pk=self.profile.pk).update(profile_image=name)
+        self.assertIsNone(self.serialized()['thumbnail_srcset'])
+
+        out = StringIO()
+        call_command('generate_tutor_thumbnails', stdout=out)
+        self.assertIn('1 updated', out.getvalue())
+        self.assertIsNotNone(self.serialized()['thumbnail_srcset'])
+
+        out = StringIO()
+        call_command('generate_tutor_thumbnails', stdout=out)
+        self.assertIn('for 0 tutor profile(s)', out.getvalue())
+
+
+
+class TutorRankingTestCase(TestCase):
+    def setUp(self):
+        self.parent = User.objects.create(username='rank_parent', role='PARENT')
+        self.client = APIClient()
+        self.client.force_authenticate(self.parent)
+        self.veteran = self._make_tutor('veteran', experience=12, locality='Gomti Nagar')
+        self.rookie = self._make_tutor('rookie', experience=1, locality='Aliganj')
+
+    def _make_tutor(self, username, experience, locality):
+        user = User.objects.create(username=username, role='TEACHER')
+        profile = user.tutor_profile
+        profile.teaching_experience_years = experience
+        profile.locality = locality
+        profile.save()
+        TutorStatus.objects.filter(tutor=profile).update(status='ACTIVE')
+        return profile
+
+    def _ranking(self, profile):
+        from users.models import TutorRanking
+        return TutorRanking.objects.get(tutor=profile)
+
+    def test_ranking_follows_ratings_hires_and_kyc(self):
+        from jobs.models import TutorRating
+        from users.models import TutorKYC
+
+        before = self._ranking(self.rookie)
+        self.assertEqual(before.experience_years, 1)
+        self.assertIsNone(before.rating_avg)
+
+        job = JobPost.objects.create(posted_by=self.parent, status='APPROVED')
+        application = Application.objects.create(job=job, tutor=self.rookie)
+        self.assertEqual(self._ranking(self.rookie).hire_count, 0)
+        application.status = 'HIRED'
+        application.save()
+        TutorRating.objects.create(tutor=self.rookie, parent=self.parent, job=job, rating=5)
+        TutorKYC.objects.create(tutor=self.rookie, status=TutorKYC.Status.VERIFIED)
+
+        after = self._ranking(self.rookie)
+        self.assertEqual((after.hire_count, after.rating_count, after.rating_avg), (1, 1, 5.0))
+        self.assertTrue(after.kyc_verified)
+        self.assertGreater(after.score, before.score)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            application.delete()
+        self.assertEqual(self._ranking(self.rookie).hire_count, 0)
+
+    def test_search_and_recommendations_use_ranking(self):
+        response = self.client.get('/api/users/tutors/search/')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.veteran.id, self.rookie.id])
+
+        # The parent's locality comes first, then the best-ranked of the rest
+        JobPost.objects.create(posted_by=self.parent, status='APPROVED', locality='Aliganj')
+        response = self.client.get('/api/jobs/stats/parent/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['recommended_tutors']], [self.rookie.id, self.veteran.id])
+
+    def test_rebuild_command_repairs_drift(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        TutorProfile.objects.filter(pk=self.rookie.pk).update(teaching_experience_years=20)
+        self.assertEqual(self._ranking(self.rookie).experience_years, 1)
+
+        out = StringIO()
+        call_command('rebuild_tutor_rankings', stdout=out)
+        self.assertIn('2 tutor ranking(s) recomputed', out.getvalue())
+        self.assertEqual(self._ranking(self.rookie).experience_years, 20)
+        self.assertEqual(self._ranking(self.rookie).score, self._ranking(self.veteran).score)
+
+    def test_deleting_tutor_with_kyc_leaves_no_ranking(self):
+        from users.models import TutorKYC, TutorRanking
+
+        TutorKYC.objects.create(tutor=self.rookie, status=TutorKYC.Status.VERIFIED)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rookie.user.delete()
+        self.assertFalse(TutorRanking.objects.filter(tutor_id=self.rookie.id).exists())
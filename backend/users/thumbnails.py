@@ -0,0 +1,118 @@
+"""
+Fixed-size derivatives of TutorProfile.profile_image for listing cards.
+
+Cards show a square photo, so each image is centre-cropped once and rendered
+as WebP at THUMBNAIL_WIDTHS (served as a srcset) plus one JPEG fallback. The
+files go through the profile_image storage backend and their URLs are kept in
+TutorProfile.thumbnails. thumbnails_source records which profile_image name
+they were made from, so a new upload shows up as a plain string mismatch.
+The storage names of the files are kept under ``files`` so the previous set
+can be deleted when the image changes.
+
+Built in the task worker after an upload (the post_save signal queues
+THUMBNAIL_TASK, so the upload request never renders or uploads images), by
+migrate_tutor_images for Drive photos, and by ``generate_tutor_thumbnails``
+for everything else.
+"""
+import logging
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .models import TutorProfile
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTHS = (160, 320, 640)
+JPEG_WIDTH = 320
+THUMBNAIL_DIR = 'tutor_profiles/thumbs'
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+THUMBNAIL_TASK = 'users.thumbnails.generate_thumbnails_task'
+
+
+def thumbnails_stale(profile):
+    """True when the stored derivatives were not made from the current profile_image."""
+    return (profile.profile_image.name or '') != profile.thumbnails_source
+
+
+def render_thumbnail(image, width, image_format):
+    thumb = ImageOps.fit(image, (width, width), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    if image_format == 'WEBP':
+        thumb.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        thumb.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def build_thumbnails(fileobj, source_name, storage):
+    """
+    Render and store the derivatives of the image in ``fileobj``.
+    Returns {'webp': {width: url}, 'jpeg': {width: url}, 'files': [storage names]}
+    (widths as strings, for JSON).
+    Raises OSError / ValueError if the file is not a readable image.
+    """
+    image = Image.open(fileobj)
+    # Let the JPEG decoder downscale by a power of two while still covering the largest size
+    image.draft('RGB', (max(THUMBNAIL_WIDTHS), max(THUMBNAIL_WIDTHS)))
+    image = ImageOps.exif_transpose(image).convert('RGB')
+
+    stem = posixpath.splitext(posixpath.basename(source_name))[0]
+    thumbnails = {'webp': {}, 'jpeg': {}, 'files': []}
+    renditions = [('webp', 'WEBP', width) for width in THUMBNAIL_WIDTHS] + [('jpeg', 'JPEG', JPEG_WIDTH)]
+    for key, image_format, width in renditions:
+        name = storage.save(f'{THUMBNAIL_DIR}/{stem}_{width}.{key}',
+                            ContentFile(render_thumbnail(image, width, image_format)))
+        thumbnails[key][str(width)] = storage.url(name)
+        thumbnails['files'].append(name)
+    return thumbnails
+
+
+def delete_thumbnail_files(thumbnails, storage, keep=()):
+    """Delete the stored files of a previous ``thumbnails`` dict, except names in ``keep``."""
+    for name in (thumbnails or {}).get('files', []):
+        if name in keep:
+            continue
+        try:
+            storage.delete(name)
+        except Exception as e:  # noqa: BLE001 - an orphaned file is not worth failing the rebuild
+            logger.warning('Could not delete old thumbnail %s: %s', name, e)
+
+
+def generate_tutor_thumbnails(profile):
+    """
+    Rebuild ``profile``'s derivatives from its profile_image (clearing them if the
+    image was removed) and save the URLs. Returns False if the image could not be read.
+    """
+    source = profile.profile_image.name or ''
+    storage = profile.profile_image.storage
+    previous = TutorProfile.objects.filter(pk=profile.pk).values_list('thumbnails', flat=True).first()
+    thumbnails = {}
+    if source:
+        try:
+            with storage.open(source, 'rb') as f:
+                thumbnails = build_thumbnails(f, source, storage)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            logger.warning('Could not build thumbnails for tutor %s from %s: %s', profile.pk, source, e)
+            return False
+
+    # update() rather than save(): no post_save round trip for a derived field
+    TutorProfile.objects.filter(pk=profile.pk).update(thumbnails=thumbnails, thumbnails_source=source)
+    profile.thumbnails, profile.thumbnails_source = thumbnails, source
+    delete_thumbnail_files(previous, storage, keep=thumbnails.get('files', ()))
+    return True
+
+
+def generate_thumbnails_task(profile_id):
+    """Background task (jobs/tasks.py): build a tutor's thumbnails after an upload."""
+    profile = TutorProfile.objects.filter(pk=profile_id).only(
+        'id', 'profile_image', 'thumbnails', 'thumbnails_source',
+    ).first()
+    # Gone, or already rebuilt by a later task / the backfill command
+    if profile is None or not thumbnails_stale(profile):
+        return
+    # An unreadable image will not get better on retry; it is logged and left stale
+    generate_tutor_thumbnails(profile)
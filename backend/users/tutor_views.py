@@ -6,14 +6,16 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django.shortcuts import get_object_or_404
-from django.db import transaction
-from django.db.models import Q, CharField
-from django.db.models.functions import Cast
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 
 from .models import TutorProfile, TutorStatus, ContactUnlock
 from .serializers import TutorProfileSerializer, PublicTutorProfileSerializer
-from wallet.models import Wallet
-from jobs.utils import filter_by_subject
+from wallet.ledger import InsufficientFunds, debit
+from wallet.snapshot import check_credits, get_wallet_snapshot
+from .ranking import order_by_ranking
+from .search_index import filter_tutors_by_class, filter_tutors_by_subject, search_tutors
+from .utils import get_tutor_thumbnail_srcset, get_tutor_thumbnail_url
 from core.throttles import ContactUnlockThrottle
 
 
@@ -66,12 +68,9 @@ class PublicTutorSearchView(generics.ListAPIView):
 
         user = self.request.user
 
-        queryset = TutorProfile.objects.filter(
+        queryset = order_by_ranking(TutorProfile.objects.filter(
             status_record__status__in=['ACTIVE', 'APPROVED']
-        ).select_related('user', 'status_record').annotate(
-            subjects_str=Cast('subjects', CharField()),
-            classes_str=Cast('classes', CharField()),
-        ).order_by('-profile_completion_percentage', '-teaching_experience_years')
+        ).select_related('user', 'status_record'))
 
         if user.is_authenticated:
             queryset = queryset.prefetch_related(
@@ -84,27 +83,17 @@ class PublicTutorSearchView(generics.ListAPIView):
         # 1. Text Search
         q = params.get('q')
         if q:
-            queryset = queryset.filter(
-                Q(user__first_name__icontains=q) |
-                Q(full_name__icontains=q) |
-                Q(about_me__icontains=q) |
-                Q(subjects_str__icontains=q)
-            )
+            queryset = search_tutors(queryset, q)
 
         # 2. Subject Filter
         subject = params.get('subject')
         if subject:
-            queryset = filter_by_subject(queryset, subject)
+            queryset = filter_tutors_by_subject(queryset, subject)
 
         # 3. Class/Grade Filter — also include tutors with no class data
         grade = params.get('class') or params.get('grade')
         if grade:
-            queryset = queryset.filter(
-                Q(classes_str__in=['[]', '""', 'null', '']) |
-                Q(classes_str__isnull=True) |
-                Q(classes_str__icontains=grade) |
-                Q(subjects_str__icontains=grade)
-            )
+            queryset = filter_tutors_by_class(queryset, grade)
 
         # 4. Location Filters
         state = params.get('state')
@@ -181,30 +170,46 @@ class ContactUnlockView(APIView):
                 "email": tutor_profile.user.email,
             })
 
-        # Check Credits
-        wallet, _ = Wallet.objects.get_or_create(user=request.user)
-        if wallet.balance < self.UNLOCK_COST:
+        # Check Credits (cached wallet snapshot)
+        has_credit, wallet = check_credits(request.user, self.UNLOCK_COST)
+        if not has_credit:
             return Response({
                 "error": "Insufficient credits",
                 "required": self.UNLOCK_COST,
-                "current": wallet.balance,
+                "current": wallet['balance'],
             }, status=402)
 
-        # Deduct & Unlock (Atomic)
+        # Deduct & Unlock (Atomic). The balance check above is only a fast path: the
+        # conditional debit is what guarantees concurrent unlocks cannot overdraw.
         try:
             with transaction.atomic():
-                wallet.debit(self.UNLOCK_COST, f"Unlocked contact of {tutor_profile.user.username}")
+                remaining_balance = debit(
+                    wallet['wallet_id'], self.UNLOCK_COST, f"Unlocked contact of {tutor_profile.user.username}",
+                )
                 ContactUnlock.objects.create(parent=request.user, tutor=tutor_profile)
-
+        except InsufficientFunds:
+            return Response({
+                "error": "Insufficient credits",
+                "required": self.UNLOCK_COST,
+                "current": get_wallet_snapshot(request.user, refresh=True)['balance'],
+            }, status=402)
+        except IntegrityError:
+            # A concurrent request unlocked it first; its debit stands, ours rolled back
             return Response({
-                "message": "Contact unlocked successfully!",
+                "message": "Already unlocked",
                 "phone": tutor_profile.user.phone,
                 "email": tutor_profile.user.email,
-                "remaining_balance": wallet.balance,
             })
         except Exception as e:
             return Response({"error": str(e)}, status=500)
 
+        return Response({
+            "message": "Contact unlocked successfully!",
+            "phone": tutor_profile.user.phone,
+            "email": tutor_profile.user.email,
+            "remaining_balance": remaining_balance,
+        })
+
 
 class UnlockedContactsView(APIView):
     """Get a list of all tutors whose contacts a parent has unlocked."""
@@ -230,6 +235,8 @@ class UnlockedContactsView(APIView):
                 "subjects": tutor.subjects if isinstance(tutor.subjects, list) else [],
                 "locality": tutor.locality,
                 "profile_image": tutor.profile_image.url if tutor.profile_image else (tutor.external_profile_image_url or None),
+                "thumbnail": get_tutor_thumbnail_url(tutor),
+                "thumbnail_srcset": get_tutor_thumbnail_srcset(tutor),
                 "unlocked_at": unlock.unlocked_at,
             })
             
@@ -19,6 +19,18 @@ def generate_otp():
 
 
 def send_otp_to_phone(phone, otp):
+    """
+    Queue an OTP SMS for the task worker (jobs/tasks.py) instead of calling
+    MSG91 in the request thread. The task is marked sensitive, so the OTP is
+    hidden in the admin and wiped from the queue once sent or given up on.
+    """
+    from jobs.tasks import enqueue
+    # OTPs expire quickly, so give up after a few minutes of retries
+    enqueue('users.utils.send_otp_task', max_attempts=3, sensitive=True, phone=phone, otp=otp)
+    return True
+
+
+def deliver_otp(phone, otp):
     """Send OTP through MSG91 Flow API with development fallback logging."""
     if not settings.MSG91_AUTH_KEY or not settings.MSG91_TEMPLATE_ID:
         if settings.DEBUG:
@@ -50,6 +62,12 @@ def send_otp_to_phone(phone, otp):
         return False
 
 
+def send_otp_task(phone, otp):
+    """Background task (jobs/tasks.py): raise on a failed send so the queue retries it."""
+    if not deliver_otp(phone, otp):
+        raise RuntimeError(f'MSG91 OTP send to {phone} failed')
+
+
 def verify_google_token(token):
     """Verify Google token and enforce strict audience validation."""
     try:
@@ -130,3 +148,29 @@ def get_tutor_image_url(profile):
             return f"https://lh3.googleusercontent.com/d/{file_id}"
 
     return url
+
+
+def _current_thumbnails(profile):
+    if not profile or not profile.thumbnails:
+        return {}
+    # Ignore derivatives of an image that has since been replaced
+    if profile.thumbnails_source != (profile.profile_image.name or ''):
+        return {}
+    return profile.thumbnails
+
+
+def get_tutor_thumbnail_url(profile):
+    """
+    JPEG listing-card thumbnail, falling back to get_tutor_image_url for
+    profiles whose thumbnails have not been generated.
+    """
+    jpeg = _current_thumbnails(profile).get('jpeg')
+    if jpeg:
+        return next(iter(jpeg.values()))
+    return get_tutor_image_url(profile)
+
+
+def get_tutor_thumbnail_srcset(profile):
+    """WebP ``srcset`` string ("url 160w, url 320w, ...") or None."""
+    webp = _current_thumbnails(profile).get('webp') or {}
+    return ', '.join(f'{url} {width}w' for width, url in sorted(webp.items(), key=lambda item: int(item[0]))) or None
@@ -16,6 +16,7 @@ from .serializers import (
     CustomTokenObtainPairSerializer, TutorKYCSerializer,
 )
 from .models import TutorProfile, TutorKYC, TutorStatus, InstitutionProfile
+from .ranking import refresh_tutor_rankings
 from .utils import verify_google_token
 from core.permissions import IsAdminRole
 from core.throttles import LoginThrottle
@@ -233,6 +234,7 @@ class AdminReviewView(APIView):
                 aadhaar_back_verified=True,
                 qualification_verified=True
             )
+            refresh_tutor_rankings([profile.id])
             return Response({"message": "Tutor approved successfully.", "status": "APPROVED"})
 
         elif action == 'reject':
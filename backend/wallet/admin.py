@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Wallet, Transaction
+from .models import RazorpayWebhookEvent, Wallet, Transaction, WalletBatch
 
 class TransactionInline(admin.TabularInline):
     model = Transaction
@@ -10,6 +10,7 @@ class TransactionInline(admin.TabularInline):
 class WalletAdmin(admin.ModelAdmin):
     list_display = ['user', 'balance', 'updated_at']
     search_fields = ['user__username', 'user__phone']
+    readonly_fields = ['balance']  # changes go through the ledger (credit/debit) so they are recorded
     inlines = [TransactionInline]
 
 @admin.register(Transaction)
@@ -17,3 +18,17 @@ class TransactionAdmin(admin.ModelAdmin):
     list_display = ['wallet', 'amount', 'transaction_type', 'description', 'created_at']
     list_filter = ['transaction_type', 'created_at']
     search_fields = ['wallet__user__username', 'description']
+
+@admin.register(WalletBatch)
+class WalletBatchAdmin(admin.ModelAdmin):
+    list_display = ['batch_key', 'status', 'applied_rows', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status']
+    search_fields = ['batch_key']
+    readonly_fields = ['rows', 'results']
+
+@admin.register(RazorpayWebhookEvent)
+class RazorpayWebhookEventAdmin(admin.ModelAdmin):
+    list_display = ['event_id', 'event', 'razorpay_order_id', 'status', 'attempts', 'received_at', 'processed_at']
+    list_filter = ['status', 'event']
+    search_fields = ['event_id', 'razorpay_order_id']
+    readonly_fields = ['payload', 'last_error']
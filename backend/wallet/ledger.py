@@ -0,0 +1,220 @@
+"""
+Wallet ledger: every balance change is a single conditional UPDATE plus the
+Transaction row that records it, in one database transaction.
+
+    UPDATE wallet_wallet SET balance = balance - x WHERE id = w AND balance >= x
+
+The balance is never read into Python, changed and saved back, so
+concurrent unlocks, applications, webhooks and admin corrections cannot lose
+updates or overdraw a wallet. A debit that finds too little balance matches
+no row and raises InsufficientFunds; nothing is written.
+
+The ledger invariant is ``balance == SUM(credits) - SUM(debits)`` over
+Transaction and TransactionArchive. ``ledger_mismatches`` (run by the
+verify_wallet_ledger command) checks it. Anything that sets ``balance``
+directly (the admin, shell fixes, ``QuerySet.update``) shows up there.
+
+``apply_batch`` applies thousands of grants/revocations at once: per chunk,
+one locked read of the wallets, one balance UPDATE and one Transaction
+bulk insert.
+"""
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Transaction, TransactionArchive, Wallet, WalletBatch
+from .snapshot import invalidate_wallet_snapshots
+
+CENT = Decimal('0.01')
+
+
+class InsufficientFunds(ValueError):
+    def __init__(self, message='Insufficient balance'):
+        super().__init__(message)
+
+
+def _positive(amount):
+    amount = Decimal(str(amount))
+    if amount <= 0:
+        raise ValueError("Amount must be positive")
+    return amount
+
+
+def post_entry(wallet_id, amount, transaction_type, description=''):
+    """
+    Apply one CREDIT or DEBIT to a wallet and record it. Returns the new
+    balance; raises InsufficientFunds when a debit would overdraw.
+    """
+    amount = _positive(amount)
+    wallets = Wallet.objects.filter(pk=wallet_id)
+    with transaction.atomic():
+        if transaction_type == 'DEBIT':
+            changed = wallets.filter(balance__gte=amount).update(balance=F('balance') - amount, updated_at=timezone.now())
+            if not changed:
+                raise InsufficientFunds()
+        else:
+            changed = wallets.update(balance=F('balance') + amount, updated_at=timezone.now())
+            if not changed:
+                raise Wallet.DoesNotExist(f"Wallet {wallet_id} does not exist")
+        Transaction.objects.create(
+            wallet_id=wallet_id, amount=amount, transaction_type=transaction_type, description=description,
+        )
+        # Our UPDATE holds the row lock, so this reads our own write
+        balance, user_id = wallets.values_list('balance', 'user_id').get()
+        invalidate_wallet_snapshots([user_id])
+        return balance
+
+
+def credit(wallet_id, amount, description=''):
+    return post_entry(wallet_id, amount, 'CREDIT', description)
+
+
+def debit(wallet_id, amount, description=''):
+    return post_entry(wallet_id, amount, 'DEBIT', description)
+
+
+def _net_of(model):
+    signed = Case(When(transaction_type='DEBIT', then=-F('amount')), default=F('amount'))
+    return Subquery(
+        model.objects.filter(wallet=OuterRef('pk')).order_by().values('wallet')
+        .annotate(net=Sum(signed)).values('net'),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def ledger_mismatches(wallet_ids=None, chunk_size=2000):
+    """
+    Yield (wallet_id, balance, ledger_sum) for wallets whose balance differs
+    from the sum of their live and archived transactions. Each chunk is one
+    statement, so a wallet's balance and its transactions are read from the
+    same snapshot.
+    """
+    zero = Value(Decimal('0'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    wallets = Wallet.objects.order_by('pk').annotate(
+        ledger=Coalesce(_net_of(Transaction), zero) + Coalesce(_net_of(TransactionArchive), zero),
+    )
+    if wallet_ids is not None:
+        wallets = wallets.filter(pk__in=wallet_ids)
+    after = 0
+    while True:
+        rows = list(wallets.filter(pk__gt=after).values_list('pk', 'balance', 'ledger')[:chunk_size])
+        if not rows:
+            return
+        for wallet_id, balance, ledger in rows:
+            ledger = Decimal(str(ledger)).quantize(CENT)
+            if Decimal(str(balance)).quantize(CENT) != ledger:
+                yield wallet_id, balance, ledger
+        after = rows[-1][0]
+
+
+def _parse_row(row):
+    """(user_id, amount, reason) from a submitted row, or None if it is malformed."""
+    try:
+        user_id = int(row['user_id'])
+        amount = Decimal(str(row['amount'])).quantize(CENT)
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return None
+    if not amount:
+        return None
+    reason = str(row.get('reason') or ('Bulk credit grant' if amount > 0 else 'Bulk revocation'))
+    return user_id, amount, reason[:255]
+
+
+def _add_to_balances(deltas):
+    """``balance += delta`` for ``{wallet_id: delta}`` in one UPDATE."""
+    now = timezone.now()
+    if connection.vendor == 'postgresql':
+        values = ', '.join(['(%s, %s::numeric)'] * len(deltas))
+        params = [now] + [value for item in deltas.items() for value in item]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Wallet._meta.db_table} AS w SET balance = w.balance + v.delta, updated_at = %s '
+                f'FROM (VALUES {values}) AS v(id, delta) WHERE w.id = v.id',
+                params,
+            )
+        return
+    delta = Case(
+        *[When(pk=wallet_id, then=Value(d)) for wallet_id, d in deltas.items()],
+        default=Value(Decimal('0')), output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+    Wallet.objects.filter(pk__in=deltas).update(balance=F('balance') + delta, updated_at=now)
+
+
+def _apply_chunk(rows, offset):
+    """Apply ``rows`` (inside the caller's transaction) and return their results."""
+    from jobs.rollup import bump, metric_day
+
+    parsed = {index: _parse_row(row) for index, row in enumerate(rows, offset)}
+    user_ids = {row[0] for row in parsed.values() if row}
+    user_ids = set(get_user_model().objects.filter(id__in=user_ids).values_list('id', flat=True))
+    Wallet.objects.bulk_create([Wallet(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+    wallets = Wallet.objects.filter(user_id__in=user_ids).order_by('pk')
+    if connection.features.has_select_for_update:
+        wallets = wallets.select_for_update()
+    balances = {user_id: [wallet_id, balance] for wallet_id, user_id, balance in wallets.values_list('pk', 'user_id', 'balance')}
+
+    results = []
+    deltas = defaultdict(Decimal)
+    entries = []
+    for index, row in parsed.items():
+        if row is None:
+            results.append({'row': index, 'status': 'invalid'})
+            continue
+        user_id, amount, reason = row
+        result = {'row': index, 'user_id': user_id, 'amount': str(amount)}
+        if user_id not in balances:
+            result['status'] = 'user_not_found'
+        elif amount < 0 and balances[user_id][1] < -amount:
+            result.update(status='insufficient_funds', balance=str(balances[user_id][1]))
+        else:
+            wallet_id = balances[user_id][0]
+            balances[user_id][1] += amount
+            deltas[wallet_id] += amount
+            entries.append(Transaction(
+                wallet_id=wallet_id, amount=abs(amount),
+                transaction_type='CREDIT' if amount > 0 else 'DEBIT', description=reason,
+            ))
+            result.update(status='applied', balance=str(balances[user_id][1]))
+        results.append(result)
+
+    if deltas:
+        _add_to_balances(deltas)
+        invalidate_wallet_snapshots({user_id for user_id, (wallet_id, _) in balances.items() if wallet_id in deltas})
+        Transaction.objects.bulk_create(entries)
+        # bulk_create skips the post_save signal that feeds the CREDIT rollup
+        credits = [entry.amount for entry in entries if entry.transaction_type == 'CREDIT']
+        if credits:
+            bump(metric_day(timezone.now()), 'CREDIT', count=len(credits), amount=sum(credits))
+    return results
+
+
+def apply_batch(batch_key, rows, created_by=None, chunk_size=500):
+    """
+    Apply ``[{"user_id", "amount", "reason"}]`` (negative amounts revoke) as
+    batch ``batch_key``. Each chunk commits on its own together with the
+    batch's progress. Resubmitting a key resumes an unfinished batch with its
+    stored rows, or returns a finished one untouched.
+    Returns (WalletBatch, created).
+    """
+    batch, created = WalletBatch.objects.get_or_create(
+        batch_key=batch_key, defaults={'rows': list(rows), 'created_by': created_by},
+    )
+    while batch.status != WalletBatch.Status.DONE:
+        with transaction.atomic():
+            # Serialises concurrent runs of the same key; each sees the other's progress
+            batch = WalletBatch.objects.select_for_update().get(pk=batch.pk)
+            start = batch.applied_rows
+            chunk = batch.rows[start:start + chunk_size]
+            if chunk:
+                batch.results += _apply_chunk(chunk, start)
+                batch.applied_rows = start + len(chunk)
+            if batch.applied_rows >= len(batch.rows):
+                batch.status = WalletBatch.Status.DONE
+                batch.finished_at = timezone.now()
+            batch.save(update_fields=['results', 'applied_rows', 'status', 'finished_at'])
+    return batch, created
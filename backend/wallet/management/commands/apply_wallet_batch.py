@@ -0,0 +1,61 @@
+"""
+Apply bulk wallet credits/revocations (wallet.ledger.apply_batch).
+
+USAGE:
+  python manage.py apply_wallet_batch grants.csv --batch-key diwali-2026
+  python manage.py apply_wallet_batch --role TEACHER --amount 3 --reason "Welcome bonus" --batch-key welcome-oct-2026
+
+The CSV needs a header with user_id, amount and reason columns; a negative
+amount revokes. --role grants the same amount to every active user of that
+role (campaigns, welcome bonuses). Re-running with the same --batch-key
+resumes an interrupted batch or reports a finished one without applying it
+again.
+"""
+import csv
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet.ledger import apply_batch
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Credit or revoke many wallets from a CSV file or for a whole role'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', nargs='?', help='CSV with user_id,amount,reason columns')
+        parser.add_argument('--batch-key', required=True, help='Idempotency key for this batch')
+        parser.add_argument('--role', help='Apply --amount to every active user with this role instead of a CSV')
+        parser.add_argument('--amount', help='Amount per user with --role (negative revokes)')
+        parser.add_argument('--reason', default='', help='Transaction description with --role')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per transaction (default: 500)')
+        parser.add_argument('--show-failures', type=int, default=20, help='Failed rows to print (default: 20)')
+
+    def handle(self, *args, **options):
+        if options['role']:
+            if not options['amount']:
+                raise CommandError('--role needs --amount')
+            user_ids = User.objects.filter(role=options['role'], is_active=True).order_by('id').values_list('id', flat=True)
+            rows = [{'user_id': user_id, 'amount': options['amount'], 'reason': options['reason']} for user_id in user_ids]
+        elif options['csv_file']:
+            with open(options['csv_file'], newline='', encoding='utf-8') as fh:
+                rows = [
+                    {'user_id': row.get('user_id'), 'amount': row.get('amount'), 'reason': row.get('reason', '')}
+                    for row in csv.DictReader(fh)
+                ]
+        else:
+            raise CommandError('Pass a CSV file or --role')
+
+        batch, created = apply_batch(options['batch_key'], rows, chunk_size=options['chunk_size'])
+        if not created:
+            self.stdout.write(self.style.WARNING(f"Batch {batch.batch_key} was already submitted; stored results:"))
+
+        statuses = Counter(result['status'] for result in batch.results)
+        failures = [result for result in batch.results if result['status'] != 'applied']
+        for result in failures[:options['show_failures']]:
+            self.stdout.write(f"  row {result['row']}: {result['status']} (user {result.get('user_id', '?')})")
+        summary = ', '.join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+        self.stdout.write(self.style.SUCCESS(f"Batch {batch.batch_key}: {len(batch.results)} row(s). {summary}"))
@@ -0,0 +1,140 @@
+"""
+Load test for Razorpay webhook ingestion: fire signed synthetic
+payment.captured events at RazorpayWebhookView, then drain the worker queue.
+
+USAGE:
+  python manage.py loadtest_razorpay_webhooks
+  python manage.py loadtest_razorpay_webhooks --events 5000 --users 50 --redeliver 0.2
+  python manage.py loadtest_razorpay_webhooks --i-know-this-is-not-production   # staging copy
+
+Requests go through the Django test client in this process (no server
+needed). A share of events is delivered twice (--redeliver): half reuse the
+event id, half send the same order under a new id, as Razorpay does on
+retries. Afterwards every order must be credited exactly once. It reports
+the ingest rate and the drain rate. Everything it created is deleted at the
+end.
+
+The drain only claims this run's webhook tasks, so other queued work (emails,
+OTPs, real payment events) is left to run_worker. The command still credits
+wallets and writes payment records, so it refuses to run outside a test
+database unless --i-know-this-is-not-production is passed (core/loadtest.py).
+"""
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.loadtest import add_production_guard, ensure_not_production
+from jobs.task_models import BackgroundTask
+from jobs.tasks import run_pending
+from wallet.models import PaymentRecord, RazorpayWebhookEvent, SubscriptionPackage, Wallet
+from wallet.webhooks import PROCESS_TASK
+
+User = get_user_model()
+
+WEBHOOK_URL = '/api/wallet/webhook/razorpay/'
+
+
+class Command(BaseCommand):
+    help = 'Fire signed synthetic Razorpay webhooks and check every order is credited once'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=2000, help='Distinct orders to send')
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--redeliver', type=float, default=0.1,
+                            help='Fraction of events delivered a second time (default: 0.1)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Worker batch size when draining')
+        add_production_guard(parser)
+
+    def handle(self, *args, **options):
+        ensure_not_production(options)
+        run = uuid.uuid4().hex[:8]
+        secret = f'loadtest-{run}'
+        try:
+            users = [User.objects.create(username=f'webhooktest_{run}_{i}', role='PARENT') for i in range(options['users'])]
+            package = SubscriptionPackage.objects.create(
+                name=f'webhooktest_{run}', price=100, credit_amount=2, target_role='PARENT', is_active=False,
+            )
+            deliveries = self._deliveries(run, users, package, options['events'], options['redeliver'])
+            # The test client's host is "testserver"
+            with override_settings(RAZORPAY_WEBHOOK_SECRET=secret, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                self._fire(deliveries, secret)
+            self._drain(run, options['batch_size'])
+            self._check(run, users, options['events'], package.credit_amount)
+        finally:
+            events = RazorpayWebhookEvent.objects.filter(razorpay_order_id__startswith=f'order_{run}_')
+            self._run_tasks(events).delete()
+            events.delete()
+            User.objects.filter(username__startswith=f'webhooktest_{run}_').delete()
+            SubscriptionPackage.objects.filter(name=f'webhooktest_{run}').delete()
+
+    def _deliveries(self, run, users, package, count, redeliver):
+        deliveries = []
+        for i in range(count):
+            body = json.dumps({
+                'event': 'payment.captured',
+                'payload': {'payment': {'entity': {
+                    'id': f'pay_{run}_{i}', 'order_id': f'order_{run}_{i}', 'amount': 10000,
+                    'notes': {'user_id': users[i % len(users)].id, 'package_id': package.id},
+                }}},
+            }).encode()
+            deliveries.append((f'evt_{run}_{i}', body))
+            if random.random() < redeliver:
+                retry_id = f'evt_{run}_{i}' if i % 2 else f'evt_{run}_{i}_retry'
+                deliveries.append((retry_id, body))
+        random.shuffle(deliveries)
+        return deliveries
+
+    def _fire(self, deliveries, secret):
+        client = Client()
+        statuses = Counter()
+        start = time.perf_counter()
+        for event_id, body in deliveries:
+            signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            response = client.post(WEBHOOK_URL, data=body, content_type='application/json',
+                                   HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=event_id)
+            statuses[response.status_code] += 1
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"Ingested {len(deliveries)} deliveries in {elapsed:.1f}s "
+                          f"({len(deliveries) / elapsed:.0f}/s), statuses {dict(statuses)}")
+        if set(statuses) != {200}:
+            raise CommandError(f"Non-200 webhook responses: {dict(statuses)}")
+
+    def _run_tasks(self, events):
+        return BackgroundTask.objects.filter(
+            name=PROCESS_TASK, payload__event_pk__in=list(events.values_list('pk', flat=True)),
+        )
+
+    def _drain(self, run, batch_size):
+        events = RazorpayWebhookEvent.objects.filter(razorpay_order_id__startswith=f'order_{run}_')
+        task_ids = list(self._run_tasks(events).values_list('pk', flat=True))
+        processed = 0
+        start = time.perf_counter()
+        while True:
+            succeeded, failed = run_pending(limit=batch_size, task_ids=task_ids)
+            if failed:
+                raise CommandError(f"{failed} webhook task(s) failed")
+            if not succeeded:
+                break
+            processed += succeeded
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"Worker processed {processed} event(s) in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.0f}/s)")
+
+    def _check(self, run, users, count, credits_per_order):
+        payments = PaymentRecord.objects.filter(razorpay_order_id__startswith=f'order_{run}_').count()
+        pending = RazorpayWebhookEvent.objects.filter(
+            razorpay_order_id__startswith=f'order_{run}_',
+        ).exclude(status=RazorpayWebhookEvent.Status.PROCESSED).count()
+        credited = sum(Wallet.objects.filter(user__in=users).values_list('balance', flat=True))
+        self.stdout.write(f"Orders: {count}, payment records: {payments}, credits: {credited}, unprocessed events: {pending}")
+        if payments != count or credited != count * credits_per_order or pending:
+            raise CommandError("Webhook processing lost or duplicated payments")
+        self.stdout.write(self.style.SUCCESS("Every order credited exactly once."))
@@ -0,0 +1,70 @@
+"""
+Requeue Razorpay webhook events that did not get processed (wallet/webhooks.py).
+
+USAGE:
+  python manage.py replay_webhook_events                  # FAILED, plus PENDING older than 10 minutes
+  python manage.py replay_webhook_events --status FAILED
+  python manage.py replay_webhook_events --id 42 --id 43 --inline
+
+Events are queued for run_worker again, or processed in this process with
+--inline. Replaying is safe: an order that was already credited is not
+credited again.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.tasks import enqueue
+from wallet.models import RazorpayWebhookEvent
+from wallet.webhooks import PROCESS_TASK, process_webhook_event
+
+Status = RazorpayWebhookEvent.Status
+
+
+class Command(BaseCommand):
+    help = 'Replay failed or stuck Razorpay webhook events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='append', choices=[Status.FAILED, Status.PENDING], default=None,
+                            help='Only replay events with this status (repeatable; default: both)')
+        parser.add_argument('--older-than-minutes', type=int, default=10,
+                            help='PENDING events younger than this are left to the queue (default: 10)')
+        parser.add_argument('--id', type=int, action='append', default=None, dest='ids',
+                            help='Replay this event id regardless of age (repeatable)')
+        parser.add_argument('--limit', type=int, default=1000)
+        parser.add_argument('--inline', action='store_true',
+                            help='Process in this process instead of queueing for run_worker')
+
+    def handle(self, *args, **options):
+        statuses = options['status'] or [Status.FAILED, Status.PENDING]
+        events = RazorpayWebhookEvent.objects.filter(status__in=statuses).order_by('received_at')
+        if options['ids']:
+            events = events.filter(pk__in=options['ids'])
+        elif Status.PENDING in statuses:
+            stale_before = timezone.now() - timedelta(minutes=options['older_than_minutes'])
+            events = events.exclude(status=Status.PENDING, received_at__gte=stale_before)
+        event_ids = list(events.values_list('pk', flat=True)[:options['limit']])
+
+        failed = 0
+        for event_pk in event_ids:
+            with transaction.atomic():
+                RazorpayWebhookEvent.objects.filter(pk=event_pk).update(status=Status.PENDING)
+                if not options['inline']:
+                    enqueue(PROCESS_TASK, event_pk=event_pk)
+            if options['inline']:
+                try:
+                    process_webhook_event(event_pk)
+                except Exception as exc:  # noqa: BLE001 - reported, left PENDING for the next replay
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"  event {event_pk}: {exc}"))
+
+        if not options['inline']:
+            self.stdout.write(self.style.SUCCESS(f"Queued {len(event_ids)} event(s) for run_worker."))
+            return
+        outcome = dict(Counter(
+            RazorpayWebhookEvent.objects.filter(pk__in=event_ids).values_list('status', flat=True)
+        ))
+        self.stdout.write(self.style.SUCCESS(f"Replayed {len(event_ids)} event(s): {outcome}; {failed} raised."))
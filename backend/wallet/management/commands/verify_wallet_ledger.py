@@ -0,0 +1,40 @@
+"""
+Check every wallet's balance against its ledger (wallet/ledger.py):
+balance == SUM(credits) - SUM(debits) over live and archived transactions.
+
+USAGE:
+  python manage.py verify_wallet_ledger
+  python manage.py verify_wallet_ledger --wallet-id 42
+
+Meant to run periodically (cron, e.g. nightly). Mismatches are logged as
+errors and the command exits non-zero, so the scheduler reports them.
+Nothing is repaired automatically; a mismatch means something changed a
+balance outside credit()/debit() and needs a look.
+"""
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wallet.ledger import ledger_mismatches
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Verify wallet balances against the sum of their transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wallet-id', type=int, action='append', default=None,
+                            help='Only check the given wallet id (repeatable)')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Wallets checked per query (default: 2000)')
+
+    def handle(self, *args, **options):
+        mismatched = 0
+        for wallet_id, balance, ledger in ledger_mismatches(options['wallet_id'], options['chunk_size']):
+            mismatched += 1
+            logger.error('Wallet %s balance %s does not match ledger sum %s', wallet_id, balance, ledger)
+            self.stdout.write(self.style.ERROR(f"  wallet {wallet_id}: balance={balance} ledger={ledger}"))
+        if mismatched:
+            raise CommandError(f"{mismatched} wallet(s) do not match their ledger")
+        self.stdout.write(self.style.SUCCESS("All wallet balances match their ledger."))
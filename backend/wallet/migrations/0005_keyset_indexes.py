@@ -0,0 +1,17 @@
+# Generated by Django 4.2.18 on 2026-10-18 09:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0004_alter_subscriptionpackage_target_role_paymentrecord'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['created_at', 'id'], name='transaction_created_id_idx'),
+        ),
+    ]
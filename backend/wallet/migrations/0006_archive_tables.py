@@ -0,0 +1,29 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0005_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('transaction_type', models.CharField(max_length=10)),
+                ('description', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('wallet', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='wallet.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wallet', 'created_at', 'id'], name='transaction_archive_wallet_idx')],
+            },
+        ),
+    ]
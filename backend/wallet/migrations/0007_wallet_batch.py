@@ -0,0 +1,30 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('wallet', '0006_archive_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_key', models.CharField(max_length=100, unique=True)),
+                ('rows', models.JSONField(default=list)),
+                ('results', models.JSONField(default=list)),
+                ('applied_rows', models.PositiveIntegerField(default=0)),
+                ('status', models.CharField(choices=[('RUNNING', 'Running'), ('DONE', 'Done')], default='RUNNING', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
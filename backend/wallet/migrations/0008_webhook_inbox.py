@@ -0,0 +1,31 @@
+# Generated by Django 4.2.18 on 2026-10-18 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wallet', '0007_wallet_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RazorpayWebhookEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(blank=True, max_length=64, null=True, unique=True)),
+                ('event', models.CharField(max_length=64)),
+                ('razorpay_order_id', models.CharField(blank=True, db_index=True, max_length=128)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSED', 'Processed'), ('IGNORED', 'Ignored'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'received_at'], name='webhook_status_received_idx')],
+            },
+        ),
+    ]
@@ -1,6 +1,5 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db import transaction
 from decimal import Decimal
 
 User = get_user_model()
@@ -13,54 +12,18 @@ class Wallet(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Wallet ({self.balance})"
 
-    @transaction.atomic
     def credit(self, amount, description=""):
-        """Add funds to wallet"""
-        from decimal import Decimal
-        amount = Decimal(str(amount))
-        
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
-        
-        # Ensure self.balance is Decimal
-        if not isinstance(self.balance, Decimal):
-            self.balance = Decimal(str(self.balance))
-
-        self.balance += amount
-        self.save()
-        
-        Transaction.objects.create(
-            wallet=self,
-            amount=amount,
-            transaction_type='CREDIT',
-            description=description
-        )
+        """Add funds to wallet (see wallet/ledger.py). Returns the new balance."""
+        from .ledger import credit
+
+        self.balance = credit(self.pk, amount, description)
         return self.balance
 
-    @transaction.atomic
     def debit(self, amount, description=""):
-        """Deduct funds from wallet"""
-        from decimal import Decimal
-        amount = Decimal(str(amount))
-        
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
-        
-        if not isinstance(self.balance, Decimal):
-            self.balance = Decimal(str(self.balance))
-
-        if self.balance < amount:
-            raise ValueError("Insufficient balance")
-        
-        self.balance -= amount
-        self.save()
-        
-        Transaction.objects.create(
-            wallet=self,
-            amount=amount,
-            transaction_type='DEBIT',
-            description=description
-        )
+        """Deduct funds from wallet; raises InsufficientFunds (a ValueError) rather than overdraw."""
+        from .ledger import debit
+
+        self.balance = debit(self.pk, amount, description)
         return self.balance
 
 
@@ -76,10 +39,56 @@ class Transaction(models.Model):
     description = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['created_at', 'id'], name='transaction_created_id_idx')]
+
     def __str__(self):
         return f"{self.transaction_type}: {self.amount} - {self.description}"
 
 
+class TransactionArchive(models.Model):
+    """
+    Transactions moved out of Transaction by ``archive_old_rows`` (core/archive.py).
+    Same columns and ids as the live row; the wallet key has no database constraint.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    wallet = models.ForeignKey(Wallet, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    transaction_type = models.CharField(max_length=10)
+    description = models.CharField(max_length=255)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['wallet', 'created_at', 'id'], name='transaction_archive_wallet_idx')]
+
+    def __str__(self):
+        return f"{self.transaction_type}: {self.amount} - {self.description} (archived)"
+
+
+class WalletBatch(models.Model):
+    """
+    One bulk grant/revocation run (wallet.ledger.apply_batch), keyed by
+    ``batch_key`` so resubmitting it never applies it twice. The submitted rows
+    are stored, so an interrupted run resumes at ``applied_rows``.
+    """
+    class Status(models.TextChoices):
+        RUNNING = 'RUNNING', 'Running'
+        DONE = 'DONE', 'Done'
+
+    batch_key = models.CharField(max_length=100, unique=True)
+    created_by = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    rows = models.JSONField(default=list)  # [{"user_id", "amount", "reason"}], amount < 0 revokes
+    results = models.JSONField(default=list)  # one entry per processed row, in row order
+    applied_rows = models.PositiveIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.RUNNING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.batch_key} [{self.status}] {self.applied_rows}/{len(self.rows)}"
+
+
 class SubscriptionPackage(models.Model):
     """Packages for purchasing credits"""
     ROLE_CHOICES = (
@@ -115,3 +124,31 @@ class PaymentRecord(models.Model):
 
     def __str__(self):
         return f"{self.razorpay_order_id} - {self.user.username}"
+
+
+class RazorpayWebhookEvent(models.Model):
+    """
+    Inbox of verified Razorpay webhook deliveries. RazorpayWebhookView stores
+    each one and returns; wallet/webhooks.py processes it in the worker.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        PROCESSED = 'PROCESSED', 'Processed'
+        IGNORED = 'IGNORED', 'Ignored'  # events we do not act on
+        FAILED = 'FAILED', 'Failed'  # can never succeed as sent; see last_error
+
+    event_id = models.CharField(max_length=64, unique=True, null=True, blank=True)  # X-Razorpay-Event-Id
+    event = models.CharField(max_length=64)
+    razorpay_order_id = models.CharField(max_length=128, blank=True, db_index=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'received_at'], name='webhook_status_received_idx')]
+
+    def __str__(self):
+        return f"{self.event} {self.razorpay_order_id} [{self.status}]"
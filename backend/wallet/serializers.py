@@ -1,17 +1,18 @@
 from rest_framework import serializers
-from .models import Wallet, Transaction
+from .models import Transaction
 
 class TransactionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Transaction
         fields = ['id', 'amount', 'transaction_type', 'description', 'created_at']
 
-class WalletSerializer(serializers.ModelSerializer):
-    transactions = TransactionSerializer(many=True, read_only=True)
-    
-    class Meta:
-        model = Wallet
-        fields = ['balance', 'updated_at', 'transactions']
+class WalletSerializer(serializers.Serializer):
+    """Renders a wallet snapshot (wallet/snapshot.py); ``transactions`` holds the most recent ones."""
+    balance = serializers.DecimalField(max_digits=10, decimal_places=2)
+    updated_at = serializers.DateTimeField(allow_null=True)
+    transactions = TransactionSerializer(source='recent', many=True)
+    total_credited = serializers.DecimalField(max_digits=14, decimal_places=2)
+    total_debited = serializers.DecimalField(max_digits=14, decimal_places=2)
 
 
 class SubscriptionPackageSerializer(serializers.ModelSerializer):
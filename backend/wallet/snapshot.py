@@ -0,0 +1,87 @@
+"""
+Per-user wallet snapshot in Django's cache: balance, the last RECENT_COUNT
+transactions and lifetime credited/debited totals (archived transactions
+included).
+
+WalletView, the parent dashboard and the credit checks before applying for a
+job or unlocking a contact read the snapshot instead of querying the wallet
+on every request. The ledger (wallet/ledger.py) deletes a user's snapshot
+when a change to their wallet commits.
+
+With a shared cache (CACHE_BACKEND=redis/memcached) that invalidation reaches
+every process. With the per-process default, another worker may serve a
+snapshot up to WALLET_SNAPSHOT_TIMEOUT seconds old. Credit checks therefore
+only trust a snapshot that says "enough": a refusal is re-checked against
+the database. Debits themselves never rely on it, since the ledger's
+conditional UPDATE refuses to overdraw.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q, Sum
+
+from .models import Transaction, TransactionArchive, Wallet
+
+RECENT_COUNT = 10
+TRANSACTION_FIELDS = ('id', 'amount', 'transaction_type', 'description', 'created_at')
+
+
+def snapshot_key(user_id):
+    return f'wallet:snapshot:{user_id}'
+
+
+def _lifetime_totals(model, wallet_id):
+    return model.objects.filter(wallet_id=wallet_id).aggregate(
+        credited=Sum('amount', filter=Q(transaction_type='CREDIT')),
+        debited=Sum('amount', filter=Q(transaction_type='DEBIT')),
+    )
+
+
+def build_wallet_snapshot(user_id):
+    wallet = Wallet.objects.filter(user_id=user_id).values('id', 'balance', 'updated_at').first()
+    snapshot = {
+        'wallet_id': None, 'balance': Decimal('0.00'), 'updated_at': None, 'recent': [],
+        'total_credited': Decimal('0.00'), 'total_debited': Decimal('0.00'),
+    }
+    if wallet is None:
+        return snapshot
+    snapshot.update(wallet_id=wallet['id'], balance=wallet['balance'], updated_at=wallet['updated_at'])
+    snapshot['recent'] = list(
+        Transaction.objects.filter(wallet_id=wallet['id']).order_by('-created_at', '-id')
+        .values(*TRANSACTION_FIELDS)[:RECENT_COUNT]
+    )
+    for model in (Transaction, TransactionArchive):
+        totals = _lifetime_totals(model, wallet['id'])
+        snapshot['total_credited'] += totals['credited'] or 0
+        snapshot['total_debited'] += totals['debited'] or 0
+    return snapshot
+
+
+def get_wallet_snapshot(user, refresh=False):
+    """The user's snapshot from cache, built on a miss (or when ``refresh``)."""
+    key = snapshot_key(user.pk)
+    snapshot = None if refresh else cache.get(key)
+    if snapshot is None:
+        snapshot = build_wallet_snapshot(user.pk)
+        cache.set(key, snapshot, settings.WALLET_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def invalidate_wallet_snapshots(user_ids):
+    """Drop the users' snapshots once the current transaction commits."""
+    keys = [snapshot_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def check_credits(user, amount):
+    """
+    (enough, snapshot) for spending ``amount``. A cached "enough" is trusted;
+    a refusal is confirmed against the database first.
+    """
+    snapshot = get_wallet_snapshot(user)
+    if snapshot['balance'] < amount:
+        snapshot = get_wallet_snapshot(user, refresh=True)
+    return snapshot['balance'] >= amount, snapshot
@@ -0,0 +1,261 @@
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from jobs.models import DailyMetric
+from users.models import ContactUnlock
+
+User = get_user_model()
+
+
+class WalletLedgerTestCase(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from wallet.models import Wallet
+
+        cache.clear()
+
+        self.user = User.objects.create(username='ledger_parent', role='PARENT')
+        self.wallet = Wallet.objects.create(user=self.user)
+        self.wallet.credit(2, 'Seed')
+
+    def test_stale_instances_cannot_overdraw(self):
+        from wallet.ledger import InsufficientFunds
+        from wallet.models import Wallet
+
+        first, second, third = (Wallet.objects.get(pk=self.wallet.pk) for _ in range(3))
+        self.assertEqual(first.debit(1, 'one'), 1)
+        self.assertEqual(second.debit(1, 'two'), 0)  # loaded with balance 2, still sees the first debit
+        with self.assertRaises(InsufficientFunds):
+            third.debit(1, 'three')
+        self.assertEqual(Wallet.objects.get(pk=self.wallet.pk).balance, 0)
+        self.assertEqual(self.wallet.transactions.filter(transaction_type='DEBIT').count(), 2)
+
+    def test_unlock_refused_when_balance_drained_after_check(self):
+        from wallet.models import Wallet
+        from wallet.snapshot import get_wallet_snapshot
+
+        tutor = User.objects.create(username='ledger_tutor', role='TEACHER').tutor_profile
+        get_wallet_snapshot(self.user)  # cached balance 2 passes the view's balance check
+        Wallet.objects.filter(pk=self.wallet.pk).update(balance=0)  # spent elsewhere, snapshot not invalidated
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(f'/api/users/tutor/{tutor.pk}/unlock/')
+        self.assertEqual(response.status_code, 402)
+        self.assertFalse(ContactUnlock.objects.exists())
+
+    def test_verify_counts_archived_transactions_and_flags_drift(self):
+        from datetime import timedelta
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from django.utils import timezone
+        from wallet.models import Transaction, Wallet
+
+        self.wallet.debit(1, 'Spend')
+        Transaction.objects.update(created_at=timezone.now() - timedelta(days=1000))
+        call_command('archive_old_rows', '--policy', 'transactions', stdout=StringIO())
+        self.assertFalse(Transaction.objects.exists())
+        call_command('verify_wallet_ledger', stdout=StringIO())
+
+        Wallet.objects.filter(pk=self.wallet.pk).update(balance=5)
+        with self.assertRaises(CommandError), self.assertLogs('wallet.management.commands.verify_wallet_ledger', 'ERROR'):
+            call_command('verify_wallet_ledger', stdout=StringIO())
+
+
+class WalletLedgerStressTestCase(TransactionTestCase):
+    def test_concurrent_credits_and_debits_lose_no_updates(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('loadtest_wallet_ledger', '--wallets', '2', '--operations', '240',
+                     '--workers', '8', '--balance', '30', stdout=out)
+        self.assertIn('No lost updates', out.getvalue())
+
+
+class BulkWalletBatchTestCase(TestCase):
+    def setUp(self):
+        self.superadmin = User.objects.create(username='bulk_boss', role='SUPERADMIN')
+        self.client = APIClient()
+        self.client.force_authenticate(self.superadmin)
+        self.tutors = [User.objects.create(username=f'bulk_tutor{i}', role='TEACHER') for i in range(3)]
+
+    def test_bulk_grants_and_revocations_report_rows_and_replay(self):
+        from decimal import Decimal
+        from wallet.models import Transaction, Wallet
+
+        first, second, third = (user.id for user in self.tutors)
+        rows = [
+            {'user_id': first, 'amount': 5, 'reason': 'Campaign'},
+            {'user_id': second, 'amount': '2.50'},
+            {'user_id': first, 'amount': -3, 'reason': 'Correction'},
+            {'user_id': third, 'amount': -1},  # no wallet yet, nothing to revoke
+            {'user_id': 999999, 'amount': 1},
+            {'user_id': first, 'amount': 'lots'},
+        ]
+        response = self.client.post('/api/wallet/admin/bulk/', {'batch_key': 'oct-campaign', 'rows': rows}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['applied', 'applied', 'applied', 'insufficient_funds', 'user_not_found', 'invalid'],
+        )
+        self.assertEqual(response.data['results'][2]['balance'], '2.00')
+        self.assertEqual(Wallet.objects.get(user_id=first).balance, 2)
+        self.assertEqual(Wallet.objects.get(user_id=second).balance, Decimal('2.50'))
+        self.assertEqual(Transaction.objects.count(), 3)
+        self.assertEqual(DailyMetric.objects.get(kind='CREDIT').amount, Decimal('7.50'))
+
+        replay = self.client.post('/api/wallet/admin/bulk/', {'batch_key': 'oct-campaign', 'rows': rows}, format='json')
+        self.assertEqual(replay.status_code, 200)
+        self.assertTrue(replay.data['replayed'])
+        self.assertEqual(Transaction.objects.count(), 3)
+
+    def test_queries_do_not_grow_with_rows(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def post(key, per_user):
+            rows = [{'user_id': user.id, 'amount': 1} for user in self.tutors for _ in range(per_user)]
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post('/api/wallet/admin/bulk/', {'batch_key': key, 'rows': rows}, format='json')
+            return len(queries)
+
+        post('warm-up', 1)  # creates the wallets and the CREDIT rollup row
+        self.assertEqual(post('small', 1), post('large', 50))
+
+    def test_command_grants_to_a_role(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from wallet.models import Wallet
+
+        out = StringIO()
+        call_command('apply_wallet_batch', '--role', 'TEACHER', '--amount', '3', '--reason', 'Welcome bonus',
+                     '--batch-key', 'welcome', '--chunk-size', '2', stdout=out)
+        self.assertIn('applied: 3', out.getvalue())
+        self.assertEqual(sorted(Wallet.objects.values_list('balance', flat=True)), [3, 3, 3])
+
+
+class RazorpayWebhookInboxTestCase(TestCase):
+    SECRET = 'webhook-test-secret'
+
+    def setUp(self):
+        from wallet.models import SubscriptionPackage
+
+        self.parent = User.objects.create(username='webhook_parent', role='PARENT')
+        self.package = SubscriptionPackage.objects.create(name='Pack', price=599, credit_amount=5, target_role='PARENT')
+        settings_override = self.settings(RAZORPAY_WEBHOOK_SECRET=self.SECRET)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def post(self, event_id, order_id, user_id=None):
+        import hashlib
+        import hmac
+        import json
+
+        body = json.dumps({'event': 'payment.captured', 'payload': {'payment': {'entity': {
+            'id': f'pay_{order_id}', 'order_id': order_id, 'amount': 59900,
+            'notes': {'user_id': user_id or self.parent.id, 'package_id': self.package.id},
+        }}}}).encode()
+        signature = hmac.new(self.SECRET.encode(), body, hashlib.sha256).hexdigest()
+        return self.client.post('/api/wallet/webhook/razorpay/', data=body, content_type='application/json',
+                                HTTP_X_RAZORPAY_SIGNATURE=signature, HTTP_X_RAZORPAY_EVENT_ID=event_id)
+
+    def balance(self):
+        from wallet.models import Wallet
+
+        return Wallet.objects.filter(user=self.parent).values_list('balance', flat=True).first() or 0
+
+    def test_webhook_is_stored_then_credited_once_by_worker(self):
+        from jobs.tasks import run_pending
+        from wallet.models import RazorpayWebhookEvent
+
+        self.assertEqual(self.post('evt_1', 'order_1').status_code, 200)
+        self.assertEqual(self.post('evt_1', 'order_1').data['message'], 'Event already received')
+        self.assertEqual(self.post('evt_1_retry', 'order_1').status_code, 200)  # same order, new event id
+        self.assertEqual(self.balance(), 0)  # nothing applied inside the request
+
+        self.assertEqual(run_pending(limit=10), (2, 0))
+        self.assertEqual(self.balance(), 5)
+        self.assertEqual(
+            sorted(RazorpayWebhookEvent.objects.values_list('status', 'last_error')),
+            [('PROCESSED', 'Payment already processed'), ('PROCESSED', 'Wallet credited')],
+        )
+
+    def test_failed_and_stuck_events_can_be_replayed(self):
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command
+        from jobs.tasks import run_pending
+        from wallet.models import RazorpayWebhookEvent
+
+        self.post('evt_ghost', 'order_ghost', user_id=999999)
+        self.post('evt_flaky', 'order_flaky')
+        with mock.patch('wallet.webhooks.Wallet.credit', side_effect=RuntimeError('db hiccup')):
+            self.assertEqual(run_pending(limit=10), (1, 1))  # ghost: FAILED for good; flaky: retried later
+        self.assertEqual(RazorpayWebhookEvent.objects.get(event_id='evt_ghost').status, 'FAILED')
+        flaky = RazorpayWebhookEvent.objects.get(event_id='evt_flaky')
+        self.assertEqual(flaky.status, 'PENDING')
+        self.assertIn('db hiccup', flaky.last_error)
+
+        call_command('replay_webhook_events', '--id', str(flaky.pk), '--inline', stdout=StringIO())
+        flaky.refresh_from_db()
+        self.assertEqual(flaky.status, 'PROCESSED')
+        self.assertEqual(self.balance(), 5)
+
+    def test_loadtest_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        from jobs.task_models import BackgroundTask
+        from jobs.tasks import enqueue
+
+        # Unrelated queued work must be left for run_worker
+        unrelated = enqueue('wallet.tests.unrelated_task')
+        out = StringIO()
+        call_command('loadtest_razorpay_webhooks', '--events', '300', '--users', '5', '--redeliver', '0.3', stdout=out)
+        self.assertIn('Every order credited exactly once', out.getvalue())
+        self.assertEqual(BackgroundTask.objects.get(pk=unrelated.pk).status, BackgroundTask.Status.PENDING)
+        self.assertEqual(list(BackgroundTask.objects.values_list('pk', flat=True)), [unrelated.pk])
+
+
+class WalletSnapshotTestCase(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        from wallet.models import Wallet
+
+        cache.clear()
+        self.tutor = User.objects.create(username='snapshot_tutor', role='TEACHER')
+        self.wallet = Wallet.objects.create(user=self.tutor)
+        self.client = APIClient()
+        self.client.force_authenticate(self.tutor)
+
+    def test_snapshot_is_cached_and_invalidated_by_ledger_writes(self):
+        from wallet.snapshot import get_wallet_snapshot
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.wallet.credit(5, 'Top-up')
+            self.wallet.debit(2, 'Spend')
+        snapshot = get_wallet_snapshot(self.tutor)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_wallet_snapshot(self.tutor), snapshot)
+        self.assertEqual((snapshot['balance'], snapshot['total_credited'], snapshot['total_debited']), (3, 5, 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.wallet.debit(1, 'Spend again')
+        response = self.client.get('/api/wallet/me/')
+        self.assertEqual(response.data['balance'], '2.00')
+        self.assertEqual(response.data['total_debited'], '3.00')
+        self.assertEqual([tx['description'] for tx in response.data['transactions']], ['Spend again', 'Spend', 'Top-up'])
+        with self.assertNumQueries(0):
+            self.client.get('/api/wallet/me/')
+
+    def test_stale_refusal_is_rechecked_against_the_database(self):
+        from wallet.models import Wallet
+        from wallet.snapshot import check_credits, get_wallet_snapshot
+
+        get_wallet_snapshot(self.tutor)  # cached with balance 0
+        Wallet.objects.filter(pk=self.wallet.pk).update(balance=4)  # e.g. credited by another process
+        enough, snapshot = check_credits(self.tutor, 1)
+        self.assertTrue(enough)
+        self.assertEqual(snapshot['balance'], 4)
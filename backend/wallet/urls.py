@@ -4,6 +4,7 @@ from django.urls import path
 
 from .views import (
     AddFundsView,
+    AdminBulkWalletView,
     AdminPackageView,
     AdminTransactionListView,
     CreateRazorpayOrderView,
@@ -23,5 +24,6 @@ urlpatterns = [
     path('packages/', SubscriptionPackageListView.as_view(), name='package-list'),
     path('admin/packages/', AdminPackageView.as_view(), name='admin-package-list'),
     path('admin/transactions/', AdminTransactionListView.as_view(), name='admin-transaction-list'),
+    path('admin/bulk/', AdminBulkWalletView.as_view(), name='admin-bulk-wallet'),
     path('admin/users/<int:pk>/revoke/', RevokeCreditsView.as_view(), name='admin-revoke-credits'),
 ]
@@ -4,53 +4,68 @@ import hashlib
 import hmac
 import json
 import logging
+from collections import Counter
 from decimal import Decimal
 
 import razorpay
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from core.archive import IncludeArchivedMixin
+from core.pagination import KeysetPagination
 from core.permissions import IsAdminRole
 from core.roles import SUPERADMIN
-from .models import PaymentRecord, SubscriptionPackage, Wallet
+from jobs.tasks import enqueue
+
+from .ledger import apply_batch
+from .models import RazorpayWebhookEvent, SubscriptionPackage, Transaction, TransactionArchive, Wallet
 from .serializers import (
     SubscriptionPackageSerializer,
     TransactionSerializer,
     WalletSerializer,
 )
+from .snapshot import get_wallet_snapshot
+from .webhooks import PROCESS_TASK, order_id_of
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
 class WalletView(generics.RetrieveAPIView):
-    """Get current user's wallet balance and transactions."""
+    """Get current user's wallet balance, recent transactions and lifetime totals (cached snapshot)."""
 
     serializer_class = WalletSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        wallet, created = Wallet.objects.get_or_create(user=self.request.user)
-        if created and settings.WELCOME_BONUS_CREDITS > 0:
-            wallet.credit(
-                Decimal(str(settings.WELCOME_BONUS_CREDITS)),
-                'Welcome Bonus',
-            )
-        return wallet
+        snapshot = get_wallet_snapshot(self.request.user)
+        if snapshot['wallet_id'] is None:
+            wallet, created = Wallet.objects.get_or_create(user=self.request.user)
+            if created and settings.WELCOME_BONUS_CREDITS > 0:
+                wallet.credit(
+                    Decimal(str(settings.WELCOME_BONUS_CREDITS)),
+                    'Welcome Bonus',
+                )
+            snapshot = get_wallet_snapshot(self.request.user, refresh=True)
+        return snapshot
 
 
-class TransactionListView(generics.ListAPIView):
-    """List transactions for current user wallet."""
+class TransactionListView(IncludeArchivedMixin, generics.ListAPIView):
+    """List transactions for current user wallet (``?include_archived=1`` adds archived ones)."""
 
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    archive_model = TransactionArchive
+
+    def scope(self, queryset):
+        return queryset.filter(wallet__user=self.request.user)
 
     def get_queryset(self):
         Wallet.objects.get_or_create(user=self.request.user)
@@ -88,12 +103,52 @@ class AddFundsView(APIView):
             return Response({'error': str(exc)}, status=400)
 
 
+class AdminBulkWalletView(APIView):
+    """
+    Superadmin: credit or revoke many wallets in one request.
+
+    Body: ``{"batch_key": "...", "rows": [{"user_id": 1, "amount": 5, "reason": "..."}]}``.
+    Negative amounts revoke. A key that was already submitted returns the stored
+    per-row results instead of applying the rows again.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_ROWS = 10000
+
+    def post(self, request):
+        if request.user.role != SUPERADMIN:
+            return Response({'error': 'Only Superadmin can apply bulk wallet operations.'}, status=403)
+
+        batch_key = str(request.data.get('batch_key') or '').strip()
+        rows = request.data.get('rows')
+        if not batch_key or len(batch_key) > 100:
+            return Response({'error': 'batch_key is required (max 100 characters)'}, status=400)
+        if not isinstance(rows, list) or not rows:
+            return Response({'error': 'rows must be a non-empty list'}, status=400)
+        if len(rows) > self.MAX_ROWS:
+            return Response({'error': f'At most {self.MAX_ROWS} rows per batch'}, status=400)
+
+        batch, created = apply_batch(batch_key, rows, created_by=request.user)
+        statuses = Counter(result['status'] for result in batch.results)
+        return Response({
+            'batch_key': batch.batch_key,
+            'replayed': not created,
+            'applied': statuses['applied'],
+            'failed': len(batch.results) - statuses['applied'],
+            'results': batch.results,
+        }, status=201 if created else 200)
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class RazorpayWebhookView(APIView):
-    """Consumes Razorpay webhooks and credits wallets on captured payments."""
+    """
+    Verifies Razorpay webhooks and stores them in the RazorpayWebhookEvent inbox;
+    captured payments are credited by the background worker (wallet/webhooks.py).
+    """
 
     permission_classes = [permissions.AllowAny]
     authentication_classes = []
+    throttle_classes = []  # authenticated by signature; payment bursts must not hit the anon rate
 
     def post(self, request):
         raw_body = request.body
@@ -109,67 +164,32 @@ class RazorpayWebhookView(APIView):
             logger.error(f"Razorpay webhook signature mismatch! Expected: {expected_signature}, Provided: {provided_signature}")
             return Response({'error': 'Invalid webhook signature'}, status=400)
 
-        logger.info(f"Razorpay webhook received: {raw_body.decode('utf-8')}")
-
         try:
             payload = json.loads(raw_body.decode('utf-8'))
         except json.JSONDecodeError:
             return Response({'error': 'Invalid JSON payload'}, status=400)
+        if not isinstance(payload, dict):
+            return Response({'error': 'Invalid JSON payload'}, status=400)
 
-        event = payload.get('event')
-        if event != 'payment.captured':
-            return Response({'message': 'Event ignored'}, status=200)
-
-        entity = payload.get('payload', {}).get('payment', {}).get('entity', {})
-        order_id = entity.get('order_id')
-        payment_id = entity.get('id')
-        amount_paise = entity.get('amount')
-
-        if not order_id or not payment_id or amount_paise is None:
-            return Response({'error': 'Incomplete payment payload'}, status=400)
-
-        notes = entity.get('notes', {}) or {}
-        user_id = notes.get('user_id')
-        package_id = notes.get('package_id')
-        if not user_id:
-            return Response({'error': 'Missing user_id in payment notes'}, status=400)
-
-        user = User.objects.filter(id=user_id).first()
-        if not user:
-            return Response({'error': 'User not found for payment'}, status=404)
-
-        # Determine credits to add from the package
-        credits_to_add = Decimal('0')
-        if package_id:
-            try:
-                package = SubscriptionPackage.objects.get(id=package_id)
-                credits_to_add = Decimal(str(package.credit_amount))
-            except SubscriptionPackage.DoesNotExist:
-                logger.warning(f'Package {package_id} not found for payment {payment_id}')
-        
-        logger.info(f"Processing payment for user_id: {user_id}, package_id: {package_id}, amount: {amount_paise}")
-        if credits_to_add <= 0:
-            # Fallback: treat amount as credits (should not happen with packages)
-            credits_to_add = Decimal(str(amount_paise)) / Decimal('100')
-
-        amount = Decimal(str(amount_paise)) / Decimal('100')
-
-        with transaction.atomic():
-            if PaymentRecord.objects.filter(razorpay_order_id=order_id).exists():
-                return Response({'message': 'Payment already processed'}, status=200)
-
-            wallet, _ = Wallet.objects.get_or_create(user=user)
-            wallet.credit(credits_to_add, f'Purchased {int(credits_to_add)} credits ({payment_id})')
-
-            PaymentRecord.objects.create(
-                user=user,
-                razorpay_order_id=order_id,
-                razorpay_payment_id=payment_id,
-                amount=amount,
-                status=event,
-            )
-
-        return Response({'message': 'Wallet credited successfully'}, status=200)
+        # Store and acknowledge; the worker applies it (wallet/webhooks.py)
+        event = payload.get('event') or ''
+        captured = event == 'payment.captured'
+        try:
+            with transaction.atomic():
+                inbox = RazorpayWebhookEvent.objects.create(
+                    event_id=request.headers.get('x-razorpay-event-id') or None,
+                    event=event[:64],
+                    razorpay_order_id=order_id_of(payload)[:128],
+                    payload=payload,
+                    status=RazorpayWebhookEvent.Status.PENDING if captured else RazorpayWebhookEvent.Status.IGNORED,
+                )
+                if captured:
+                    enqueue(PROCESS_TASK, event_pk=inbox.pk)
+        except IntegrityError:
+            return Response({'message': 'Event already received'}, status=200)
+
+        logger.info(f"Razorpay webhook {inbox.event_id or inbox.pk} stored: {event} {inbox.razorpay_order_id}")
+        return Response({'message': 'Event received' if captured else 'Event ignored'}, status=200)
 
 
 class CreateRazorpayOrderView(APIView):
@@ -249,17 +269,19 @@ class AdminPackageView(generics.ListCreateAPIView):
         return SubscriptionPackage.objects.all()
 
 
-class AdminTransactionListView(generics.ListAPIView):
-    """Admin view to see all wallet transactions."""
+class AdminTransactionListView(IncludeArchivedMixin, generics.ListAPIView):
+    """Admin view to see all wallet transactions (``?include_archived=1`` adds archived ones)."""
 
     serializer_class = TransactionSerializer
     permission_classes = [IsAdminRole]
+    pagination_class = KeysetPagination
+    archive_model = TransactionArchive
 
     def get_queryset(self):
-        from django.db.models import Q
-        from .models import Transaction
+        return self.scope(Transaction.objects.all()).select_related('wallet__user').order_by('-created_at')
 
-        queryset = Transaction.objects.all().select_related('wallet__user').order_by('-created_at')
+    def scope(self, queryset):
+        from django.db.models import Q
 
         user_role = self.request.query_params.get('role')
         if user_role:
@@ -0,0 +1,106 @@
+"""
+Processing of stored Razorpay webhook deliveries (RazorpayWebhookEvent).
+
+RazorpayWebhookView only verifies the signature, stores the event and queues
+``process_webhook_event`` on the background worker (jobs/tasks.py), so a
+burst of payment events never holds request workers. Processing is
+idempotent on the order id. The PaymentRecord insert claims it in the same
+transaction as the credit, so a duplicated or replayed event never credits
+twice.
+
+An event that can never succeed as sent (unknown user, incomplete payload)
+is marked FAILED straight away. Any other error propagates, and the task
+queue retries it with backoff; the event stays PENDING with ``last_error``
+set. ``replay_webhook_events`` requeues FAILED events and PENDING ones the
+queue gave up on.
+"""
+import logging
+import traceback
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import PaymentRecord, RazorpayWebhookEvent, SubscriptionPackage, Wallet
+
+logger = logging.getLogger(__name__)
+
+PROCESS_TASK = 'wallet.webhooks.process_webhook_event'
+
+
+class InvalidPayment(Exception):
+    """The event can never be applied as sent."""
+
+
+def order_id_of(payload):
+    entity = payload.get('payload', {}).get('payment', {}).get('entity', {})
+    return str(entity.get('order_id') or '')
+
+
+def credit_payment(payload):
+    """Credit the wallet for a ``payment.captured`` payload. Returns a short outcome message."""
+    entity = payload.get('payload', {}).get('payment', {}).get('entity', {})
+    order_id = entity.get('order_id')
+    payment_id = entity.get('id')
+    amount_paise = entity.get('amount')
+    if not order_id or not payment_id or amount_paise is None:
+        raise InvalidPayment('Incomplete payment payload')
+
+    notes = entity.get('notes', {}) or {}
+    user_id = notes.get('user_id')
+    package_id = notes.get('package_id')
+    if not user_id:
+        raise InvalidPayment('Missing user_id in payment notes')
+    user = get_user_model().objects.filter(id=user_id).first()
+    if not user:
+        raise InvalidPayment(f'User {user_id} not found for payment')
+
+    # Determine credits to add from the package
+    credits_to_add = Decimal('0')
+    if package_id:
+        package = SubscriptionPackage.objects.filter(id=package_id).first()
+        if package:
+            credits_to_add = Decimal(str(package.credit_amount))
+        else:
+            logger.warning(f'Package {package_id} not found for payment {payment_id}')
+    if credits_to_add <= 0:
+        # Fallback: treat amount as credits (should not happen with packages)
+        credits_to_add = Decimal(str(amount_paise)) / Decimal('100')
+
+    # Inserting the PaymentRecord first claims the order id (it is unique)
+    try:
+        with transaction.atomic():
+            PaymentRecord.objects.create(
+                user=user,
+                razorpay_order_id=order_id,
+                razorpay_payment_id=payment_id,
+                amount=Decimal(str(amount_paise)) / Decimal('100'),
+                status=payload.get('event', ''),
+            )
+            wallet, _ = Wallet.objects.get_or_create(user=user)
+            wallet.credit(credits_to_add, f'Purchased {int(credits_to_add)} credits ({payment_id})')
+    except IntegrityError:
+        return 'Payment already processed'
+    logger.info(f"Credited {credits_to_add} to user {user_id} for order {order_id}")
+    return 'Wallet credited'
+
+
+def process_webhook_event(event_pk):
+    """Background task: apply one stored webhook event."""
+    events = RazorpayWebhookEvent.objects.filter(pk=event_pk)
+    event = events.first()
+    if event is None or event.status in (RazorpayWebhookEvent.Status.PROCESSED, RazorpayWebhookEvent.Status.IGNORED):
+        return
+    events.update(attempts=F('attempts') + 1)
+    try:
+        outcome = credit_payment(event.payload)
+    except InvalidPayment as exc:
+        logger.warning('Webhook event %s failed: %s', event_pk, exc)
+        events.update(status=RazorpayWebhookEvent.Status.FAILED, last_error=str(exc), processed_at=timezone.now())
+        return
+    except Exception:
+        events.update(last_error=traceback.format_exc())
+        raise
+    events.update(status=RazorpayWebhookEvent.Status.PROCESSED, last_error=outcome, processed_at=timezone.now())